@@ -0,0 +1,294 @@
+"""
+REST endpoint benchmarks with query-count and latency budgets.
+
+Each entry in ENDPOINTS names a URL (with placeholders filled from a
+sample of the seeded data), the role that calls it, and its budgets:
+`max_queries` for the first (cold cache) request, including one-off work
+such as initializing the client's unread counter, and `max_ms` for the p95
+over repeated requests. Query counts are what catches N+1 regressions, so
+they are the budgets that matter; latency budgets are deliberately loose
+because they depend on the machine. The cold request also fails when it
+repeats one SQL template from one code location (metrics.inspector).
+
+Run through `manage.py benchmark_api`, which seeds a throwaway test
+database with admin_dashboard.seeding and fails when any budget is exceeded.
+
+SERIALIZERS lists the list serializers that have a column-projected fast
+path (client.projection); run_serializer_benchmarks() measures rows/sec
+for both paths and checks that they render byte-identical JSON
+(`manage.py benchmark_serializers`). run_renderer_benchmarks() renders and
+parses the same lists with DRF's JSONRenderer and with each available
+config.jsoncodec backend (`manage.py benchmark_renderers`).
+"""
+import contextlib
+import json
+import time
+
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from admin_dashboard.seeding import seed_fleet
+from admin_dashboard.serializers import ParcelRequestSerializer
+from client.models import Parcel
+from client.projection import get_projection
+from client.serializers import ParcelListSerializer
+from config.jsoncodec import FastJSONRenderer, available_backends, get_codec
+from metrics.inspector import QueryInspector, describe, get_setting as get_inspector_setting
+from track_driver.models import DriverAssignment
+from track_driver.serializers import DriverTaskSerializer
+
+ENDPOINTS = [
+    # client
+    {'name': 'client profile', 'role': 'client', 'path': '/api/client/profile/', 'max_queries': 2, 'max_ms': 100},
+    {'name': 'client parcel list', 'role': 'client', 'path': '/api/client/parcels/', 'max_queries': 3, 'max_ms': 250},
+    {'name': 'client parcel detail', 'role': 'client', 'path': '/api/client/parcels/{client_parcel}/', 'max_queries': 8, 'max_ms': 150},
+    {'name': 'client parcel tracking', 'role': 'client', 'path': '/api/client/parcels/{client_parcel}/track/', 'max_queries': 6, 'max_ms': 150},
+    {'name': 'client stats', 'role': 'client', 'path': '/api/client/stats/', 'max_queries': 7, 'max_ms': 150},
+    {'name': 'client notifications', 'role': 'client', 'path': '/api/client/notifications/', 'max_queries': 3, 'max_ms': 150},
+    {'name': 'pricing rules', 'role': 'client', 'path': '/api/client/pricing-rules/', 'max_queries': 2, 'max_ms': 100},
+    {'name': 'price calculation', 'role': 'client', 'path': '/api/client/pricing/calculate/?weight=4.5&distance_km=12', 'max_queries': 2, 'max_ms': 100},
+    # track_driver
+    {'name': 'driver tasks', 'role': 'driver', 'path': '/api/driver/tasks/', 'max_queries': 3, 'max_ms': 250},
+    {'name': 'driver route', 'role': 'driver', 'path': '/api/driver/route/{driver_parcel}/', 'max_queries': 3, 'max_ms': 100},
+    {'name': 'driver vehicle info', 'role': 'driver', 'path': '/api/driver/vehicle-info/', 'max_queries': 2, 'max_ms': 100},
+    {'name': 'driver client contact', 'role': 'driver', 'path': '/api/driver/parcel/{driver_parcel}/client-contact/', 'max_queries': 4, 'max_ms': 100},
+    # admin_dashboard
+    {'name': 'admin drivers', 'role': 'admin', 'path': '/api/admin/drivers/', 'max_queries': 2, 'max_ms': 500},
+    {'name': 'admin parcel requests', 'role': 'admin', 'path': '/api/admin/parcel-requests/', 'max_queries': 2, 'max_ms': 1000},
+    {'name': 'admin parcel requests page', 'role': 'admin', 'path': '/api/admin/parcel-requests/?limit=50', 'max_queries': 3, 'max_ms': 100},
+    {'name': 'admin parcel requests filtered', 'role': 'admin', 'path': '/api/admin/parcel-requests/?status=requested&limit=50&offset=50', 'max_queries': 3, 'max_ms': 100},
+    {'name': 'admin live drivers', 'role': 'admin', 'path': '/api/admin/live-drivers/', 'max_queries': 2, 'max_ms': 1000},
+    {'name': 'admin live parcels', 'role': 'admin', 'path': '/api/admin/live-parcels/', 'max_queries': 2, 'max_ms': 3000},
+    {'name': 'admin parcel route', 'role': 'admin', 'path': '/api/admin/parcel/{driver_parcel}/route/', 'max_queries': 4, 'max_ms': 100},
+]
+
+SERIALIZERS = [
+    {
+        'name': 'ParcelListSerializer',
+        'serializer': ParcelListSerializer,
+        'queryset': lambda: Parcel.objects.select_related('client').order_by('-created_at'),
+    },
+    {
+        'name': 'DriverTaskSerializer',
+        'serializer': DriverTaskSerializer,
+        'queryset': lambda: Parcel.objects.filter(driver_assignment__isnull=False)
+        .select_related('client').order_by('-created_at'),
+    },
+    {
+        'name': 'ParcelRequestSerializer',
+        'serializer': ParcelRequestSerializer,
+        'queryset': lambda: Parcel.objects.exclude(current_status__in=['cancelled', 'completed'])
+        .select_related('client', 'admin_assignment__driver').order_by('-created_at'),
+    },
+]
+
+
+@contextlib.contextmanager
+def seeded_test_database(keepdb=False, log=None, **seed_options):
+    """Create (or reuse with keepdb) a test database, seed it unless it has data, and drop it afterwards."""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        if not (keepdb and Parcel.objects.exists()):
+            started = time.perf_counter()
+            counts = seed_fleet(**seed_options)
+            if log:
+                log(f"Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def sample_context():
+    """Pick representative principals and objects from the seeded data."""
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+
+    busiest_client = (
+        User.objects.filter(role='client')
+        .annotate(parcel_count=Count('parcels'))
+        .order_by('-parcel_count', 'id')
+        .first()
+    )
+    busiest_driver_id = (
+        DriverAssignment.objects.values('driver_id')
+        .annotate(total=Count('id'))
+        .order_by('-total', 'driver_id')
+        .values_list('driver_id', flat=True)
+        .first()
+    )
+    if busiest_client is None or busiest_driver_id is None:
+        raise ValueError('No seeded clients or driver assignments found')
+    driver = User.objects.get(id=busiest_driver_id)
+
+    admin = User.objects.filter(role='admin').first()
+    if admin is None:
+        admin = User.objects.create_user(
+            email='benchmark-admin@fleet.local',
+            full_name='Benchmark Admin',
+            phone_number='5000000000',
+            role='admin',
+        )
+
+    return {
+        'users': {'client': busiest_client, 'driver': driver, 'admin': admin},
+        'client_parcel': Parcel.objects.filter(client=busiest_client).order_by('-id').values_list('id', flat=True).first(),
+        'driver_parcel': DriverAssignment.objects.filter(driver=driver).order_by('-id').values_list('parcel_id', flat=True).first(),
+    }
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmarks(iterations=5, endpoints=None, context=None):
+    """Request every endpoint `iterations` times and return one result dict per endpoint."""
+    context = context or sample_context()
+    clients = {
+        role: Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        for role, user in context['users'].items()
+    }
+
+    results = []
+    for endpoint in endpoints or ENDPOINTS:
+        path = endpoint['path'].format(**context)
+        client = clients[endpoint['role']]
+        # Measure the cold path; later iterations may be served from the response cache
+        caches['default'].clear()
+
+        timings = []
+        cold = None
+        status_code = None
+        for _ in range(iterations):
+            # Unlike connection.queries, the inspector has no 9000 query cap
+            inspector = QueryInspector()
+            with connection.execute_wrapper(inspector):
+                started = time.perf_counter()
+                response = client.get(path)
+                timings.append((time.perf_counter() - started) * 1000)
+            if cold is None:
+                cold = inspector
+                status_code = response.status_code
+        cold_queries = cold.count
+
+        timings.sort()
+        p95 = percentile(timings, 95)
+        failures = []
+        if status_code >= 400:
+            failures.append(f'status {status_code}')
+        if cold_queries > endpoint['max_queries']:
+            failures.append(f"{cold_queries} queries > {endpoint['max_queries']}")
+        if endpoint.get('max_ms') is not None and p95 > endpoint['max_ms']:
+            failures.append(f"p95 {p95:.1f}ms > {endpoint['max_ms']}ms")
+        for group in cold.repeated(get_inspector_setting('THRESHOLD')):
+            failures.append(f'repeated query: {describe(group)}')
+
+        results.append({
+            'name': endpoint['name'],
+            'path': path,
+            'status': status_code,
+            'queries': cold_queries,
+            'max_queries': endpoint['max_queries'],
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(p95, 2),
+            'max_ms': endpoint.get('max_ms'),
+            'failures': failures,
+        })
+    return results
+
+
+def run_serializer_benchmarks(iterations=3, rows=None, serializers=None):
+    """Serialize each queryset with DRF and with its projection; return rows/sec and whether the JSON matches."""
+    renderer = JSONRenderer()
+    results = []
+    for entry in serializers or SERIALIZERS:
+        queryset = entry['queryset']()
+        if rows:
+            queryset = queryset[:rows]
+        projection = get_projection(entry['serializer'])
+
+        timings = {'drf': [], 'projected': []}
+        rendered = {}
+        for _ in range(iterations):
+            # Both timings include the query, since the projection also changes what is fetched
+            started = time.perf_counter()
+            data = entry['serializer'](queryset.all(), many=True).data
+            timings['drf'].append(time.perf_counter() - started)
+            rendered['drf'] = renderer.render(data)
+
+            started = time.perf_counter()
+            data = projection.data(queryset.all())
+            timings['projected'].append(time.perf_counter() - started)
+            rendered['projected'] = renderer.render(data)
+
+        count = len(data)
+        drf_rate = count / min(timings['drf']) if count else 0
+        projected_rate = count / min(timings['projected']) if count else 0
+        results.append({
+            'name': entry['name'],
+            'rows': count,
+            'drf_rows_per_s': round(drf_rate),
+            'projected_rows_per_s': round(projected_rate),
+            'speedup': round(projected_rate / drf_rate, 2) if drf_rate else None,
+            'identical': rendered['drf'] == rendered['projected'],
+        })
+    return results
+
+
+def _fastest(function, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run_renderer_benchmarks(iterations=5, rows=None, serializers=None, backends=None):
+    """
+    Render each serializer's list (as its view would) with DRF's JSONRenderer
+    and with FastJSONRenderer per codec backend, then parse the body back;
+    return rows/sec for both directions and whether the bytes match DRF's.
+    """
+    drf_renderer = JSONRenderer()
+    results = []
+    for entry in serializers or SERIALIZERS:
+        queryset = entry['queryset']()
+        if rows:
+            queryset = queryset[:rows]
+        data = get_projection(entry['serializer']).data(queryset)
+        count = len(data)
+
+        drf_seconds, expected = _fastest(lambda: drf_renderer.render(data), iterations)
+        drf_parse_seconds, _ = _fastest(lambda: json.loads(expected), iterations)
+        result = {
+            'name': entry['name'],
+            'rows': count,
+            'bytes': len(expected),
+            'drf_render_rows_per_s': round(count / drf_seconds) if count else 0,
+            'drf_parse_rows_per_s': round(count / drf_parse_seconds) if count else 0,
+            'backends': [],
+        }
+        for backend in backends or available_backends():
+            renderer = type('BenchmarkRenderer', (FastJSONRenderer,), {'json_backend': backend})()
+            codec = get_codec(backend)
+            render_seconds, body = _fastest(lambda: renderer.render(data), iterations)
+            parse_seconds, parsed = _fastest(lambda: codec.loads(body), iterations)
+            result['backends'].append({
+                'backend': backend,
+                'render_rows_per_s': round(count / render_seconds) if count else 0,
+                'render_speedup': round(drf_seconds / render_seconds, 2),
+                'parse_rows_per_s': round(count / parse_seconds) if count else 0,
+                'parse_speedup': round(drf_parse_seconds / parse_seconds, 2),
+                'identical': body == expected and parsed == json.loads(expected),
+            })
+        results.append(result)
+    return results
@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_dashboard.benchmarks import ENDPOINTS, run_benchmarks, seeded_test_database
+
+
+class Command(BaseCommand):
+    help = 'Benchmark REST endpoints on a seeded test database and enforce query/latency budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=2000)
+        parser.add_argument('--drivers', type=int, default=500)
+        parser.add_argument('--parcels', type=int, default=10000)
+        parser.add_argument('--locations', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=5, help='Requests per endpoint')
+        parser.add_argument('--only', action='append', default=[],
+                            help='Only run endpoints whose name contains this text (repeatable)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database between runs and skip seeding if it has data')
+        parser.add_argument('--no-latency-budgets', action='store_true',
+                            help='Only enforce query-count budgets (for noisy CI machines)')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        endpoints = [
+            endpoint for endpoint in ENDPOINTS
+            if not options['only'] or any(text in endpoint['name'] for text in options['only'])
+        ]
+        if options['no_latency_budgets']:
+            endpoints = [{**endpoint, 'max_ms': None} for endpoint in endpoints]
+
+        with seeded_test_database(
+            keepdb=options['keepdb'],
+            log=self.stderr.write,
+            clients=options['clients'],
+            drivers=options['drivers'],
+            parcels=options['parcels'],
+            locations=options['locations'],
+            seed=options['seed'],
+        ):
+            results = run_benchmarks(iterations=options['iterations'], endpoints=endpoints)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.print_table(results)
+
+        failed = [result for result in results if result['failures']]
+        if failed:
+            raise CommandError(f'{len(failed)} endpoint(s) over budget: ' + ', '.join(r['name'] for r in failed))
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} endpoints within budget'))
+
+    def print_table(self, results):
+        self.stdout.write(f"{'endpoint':<32} {'status':>6} {'queries':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for result in results:
+            line = (
+                f"{result['name']:<32} {result['status']:>6} "
+                f"{result['queries']:>4}/{result['max_queries']:<4} "
+                f"{result['p50_ms']:>9} {result['p95_ms']:>9}"
+            )
+            if result['failures']:
+                self.stdout.write(self.style.ERROR(f"{line}  {'; '.join(result['failures'])}"))
+            else:
+                self.stdout.write(line)
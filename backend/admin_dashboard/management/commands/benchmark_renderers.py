@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_dashboard.benchmarks import run_renderer_benchmarks, seeded_test_database
+from config.jsoncodec import BACKENDS, available_backends
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF JSONRenderer with config.jsoncodec backends on large parcel lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=2000)
+        parser.add_argument('--drivers', type=int, default=500)
+        parser.add_argument('--parcels', type=int, default=10000)
+        parser.add_argument('--locations', type=int, default=0, help='GPS points (not used by these lists)')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=5, help='Runs per renderer; the fastest is reported')
+        parser.add_argument('--rows', type=int, default=None, help='Limit rows per list')
+        parser.add_argument('--backend', action='append', choices=list(BACKENDS), default=[],
+                            help='Only benchmark this codec backend (repeatable)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database between runs and skip seeding if it has data')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        missing = set(options['backend']) - set(available_backends())
+        if missing:
+            raise CommandError(f"Not installed: {', '.join(sorted(missing))}")
+
+        with seeded_test_database(
+            keepdb=options['keepdb'],
+            log=self.stderr.write,
+            clients=options['clients'],
+            drivers=options['drivers'],
+            parcels=options['parcels'],
+            locations=options['locations'],
+            seed=options['seed'],
+        ):
+            results = run_renderer_benchmarks(
+                iterations=options['iterations'],
+                rows=options['rows'],
+                backends=options['backend'] or None,
+            )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.stdout.write(
+                f"{'list':<26} {'rows':>7} {'renderer':<8} {'render rows/s':>14} {'speedup':>8} "
+                f"{'parse rows/s':>13} {'speedup':>8}  output"
+            )
+            for result in results:
+                self.stdout.write(
+                    f"{result['name']:<26} {result['rows']:>7} {'drf':<8} "
+                    f"{result['drf_render_rows_per_s']:>14,} {'':>8} {result['drf_parse_rows_per_s']:>13,}"
+                )
+                for backend in result['backends']:
+                    line = (
+                        f"{'':<26} {'':>7} {backend['backend']:<8} {backend['render_rows_per_s']:>14,} "
+                        f"{backend['render_speedup']:>7}x {backend['parse_rows_per_s']:>13,} "
+                        f"{backend['parse_speedup']:>7}x  {'identical' if backend['identical'] else 'DIFFERS'}"
+                    )
+                    self.stdout.write(line if backend['identical'] else self.style.ERROR(line))
+
+        differing = [
+            f"{result['name']} ({backend['backend']})"
+            for result in results for backend in result['backends'] if not backend['identical']
+        ]
+        if differing:
+            raise CommandError('Output differs from DRF JSONRenderer for: ' + ', '.join(differing))
+        self.stdout.write(self.style.SUCCESS('All backends render byte-identical JSON'))
@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_dashboard.benchmarks import run_serializer_benchmarks, seeded_test_database
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF and column-projected list serialization (rows/sec) on a seeded test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=2000)
+        parser.add_argument('--drivers', type=int, default=500)
+        parser.add_argument('--parcels', type=int, default=10000)
+        parser.add_argument('--locations', type=int, default=0, help='GPS points (not used by these serializers)')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=3, help='Runs per path; the fastest is reported')
+        parser.add_argument('--rows', type=int, default=None, help='Limit rows per serializer')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the test database between runs and skip seeding if it has data')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        with seeded_test_database(
+            keepdb=options['keepdb'],
+            log=self.stderr.write,
+            clients=options['clients'],
+            drivers=options['drivers'],
+            parcels=options['parcels'],
+            locations=options['locations'],
+            seed=options['seed'],
+        ):
+            results = run_serializer_benchmarks(iterations=options['iterations'], rows=options['rows'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.stdout.write(f"{'serializer':<26} {'rows':>7} {'DRF rows/s':>12} {'projected rows/s':>17} {'speedup':>8}  output")
+            for result in results:
+                line = (
+                    f"{result['name']:<26} {result['rows']:>7} {result['drf_rows_per_s']:>12,} "
+                    f"{result['projected_rows_per_s']:>17,} {result['speedup']:>7}x  "
+                    f"{'identical' if result['identical'] else 'DIFFERS'}"
+                )
+                self.stdout.write(line if result['identical'] else self.style.ERROR(line))
+
+        differing = [result['name'] for result in results if not result['identical']]
+        if differing:
+            raise CommandError('Projected output differs from DRF for: ' + ', '.join(differing))
+        self.stdout.write(self.style.SUCCESS('Projected output is byte-identical for all serializers'))
@@ -0,0 +1,311 @@
+"""
+Bulk synthetic fleet data for benchmarks and capacity tests.
+
+seed_fleet() generates client and driver users, driver profiles, parcels
+with their status histories, admin/driver assignments and GPS trails using
+bulk_create in large batches. Every user shares one pre-hashed password,
+so no per-user hashing happens. Output depends only on the seed and the
+anchor time: the same arguments always produce the same rows.
+
+Seeded accounts use the FLEET_EMAIL_DOMAIN address domain and tracking
+numbers start with the prefix, so clear_fleet() can remove them again.
+"""
+import contextlib
+import random
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from client.models import Parcel, ParcelStatusHistory
+from track_driver.models import DriverAssignment, DriverLocation as TrackDriverLocation
+from .models import AdminAssignment, Driver, DriverLocation
+
+FLEET_EMAIL_DOMAIN = 'fleet.local'
+DEFAULT_PASSWORD = 'fleetpass123'
+
+# Roughly Bengaluru; parcels stay within ~25 km of the centre
+CENTER_LAT = 12.9716
+CENTER_LNG = 77.5946
+SPREAD_DEGREES = 0.22
+
+STATUS_FLOW = ['requested', 'accepted', 'assigned', 'picked_up', 'in_transit', 'out_for_delivery', 'delivered']
+STATUS_WEIGHTS = {
+    'requested': 10,
+    'accepted': 10,
+    'assigned': 10,
+    'picked_up': 5,
+    'in_transit': 20,
+    'out_for_delivery': 10,
+    'delivered': 30,
+    'cancelled': 5,
+}
+# Statuses from which a parcel has a driver and a GPS trail
+TRACKED_STATUSES = {'picked_up', 'in_transit', 'out_for_delivery', 'delivered'}
+VEHICLE_TYPES = [choice for choice, _ in Driver.VEHICLE_TYPE_CHOICES]
+
+User = get_user_model()
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@contextlib.contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create store given values in auto_now/auto_now_add fields."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _quantize(value):
+    return Decimal(value).quantize(Decimal('0.0000001'))
+
+
+def default_anchor():
+    """Midnight UTC today, so repeated runs on one day produce identical rows."""
+    return datetime.combine(datetime.now(dt_timezone.utc).date(), dt_time.min, tzinfo=dt_timezone.utc)
+
+
+def clear_fleet(prefix='FLT'):
+    """Delete seeded users, driver profiles and parcels (dependent rows cascade)."""
+    Parcel.objects.filter(tracking_number__startswith=prefix).delete()
+    Driver.objects.filter(email__endswith=f'@{FLEET_EMAIL_DOMAIN}').delete()
+    User.objects.filter(email__endswith=f'@{FLEET_EMAIL_DOMAIN}').delete()
+
+
+def seed_fleet(clients=2000, drivers=500, parcels=10000, locations=1_000_000, seed=1,
+               batch_size=5000, password=DEFAULT_PASSWORD, anchor=None, prefix='FLT', progress=None):
+    """Generate a synthetic fleet and return the number of rows created per table.
+
+    `locations` is the total number of GPS points, spread across the trails
+    of parcels that have been picked up. `progress(table, count)` is called
+    after each table is written.
+    """
+    rng = random.Random(seed)
+    anchor = anchor or default_anchor()
+    hashed = make_password(password)
+    report = progress or (lambda table, count: None)
+    counts = {}
+
+    with explicit_timestamps(User, Driver, Parcel, ParcelStatusHistory, AdminAssignment,
+                             DriverAssignment, TrackDriverLocation, DriverLocation):
+        client_users = _bulk(User, (
+            User(
+                email=f'client{i}@{FLEET_EMAIL_DOMAIN}',
+                full_name=f'Fleet Client {i}',
+                phone_number=f'7{i:09d}',
+                role='client',
+                password=hashed,
+                created_at=anchor - timedelta(days=90),
+            )
+            for i in range(clients)
+        ), batch_size)
+        counts['client_users'] = len(client_users)
+        report('client users', len(client_users))
+
+        driver_users = _bulk(User, (
+            User(
+                email=f'driver{i}@{FLEET_EMAIL_DOMAIN}',
+                full_name=f'Fleet Driver {i}',
+                phone_number=f'6{i:09d}',
+                role='driver',
+                password=hashed,
+                created_at=anchor - timedelta(days=90),
+            )
+            for i in range(drivers)
+        ), batch_size)
+        counts['driver_users'] = len(driver_users)
+        report('driver users', len(driver_users))
+
+        profiles = _bulk(Driver, (
+            Driver(
+                name=user.full_name,
+                email=user.email,
+                password=hashed,
+                phone_number=user.phone_number,
+                vehicle_type=rng.choice(VEHICLE_TYPES),
+                vehicle_number=f'KA{rng.randint(1, 99):02d}-{rng.randint(1000, 9999)}',
+                current_location='Bengaluru',
+                rating=round(rng.uniform(3.0, 5.0), 1),
+                is_available=rng.random() < 0.7,
+                user=user,
+                created_at=anchor - timedelta(days=90),
+            )
+            for user in driver_users
+        ), batch_size)
+        counts['drivers'] = len(profiles)
+        report('driver profiles', len(profiles))
+
+        plans = [_plan_parcel(rng, i, anchor) for i in range(parcels)]
+        parcel_rows = _bulk(Parcel, (
+            Parcel(
+                client=client_users[rng.randrange(len(client_users))],
+                tracking_number=f'{prefix}{i:010d}',
+                from_location=f'Pickup point {i}',
+                to_location=f'Drop point {i}',
+                pickup_lat=_quantize(plan['pickup'][0]),
+                pickup_lng=_quantize(plan['pickup'][1]),
+                drop_lat=_quantize(plan['drop'][0]),
+                drop_lng=_quantize(plan['drop'][1]),
+                weight=Decimal(rng.randint(10, 5000)) / 100,
+                height=Decimal(rng.randint(5, 100)),
+                width=Decimal(rng.randint(5, 100)),
+                breadth=Decimal(rng.randint(5, 100)),
+                price=Decimal(rng.randint(5000, 200000)) / 100,
+                distance_km=Decimal(str(round(plan['distance_km'], 2))),
+                current_status=plan['status'],
+                created_at=plan['created_at'],
+                updated_at=plan['history'][-1][1],
+            )
+            for i, plan in enumerate(plans)
+        ), batch_size)
+        counts['parcels'] = len(parcel_rows)
+        report('parcels', len(parcel_rows))
+
+        # Every parcel past 'accepted' gets a driver, in both assignment tables
+        for plan in plans:
+            plan['driver'] = rng.randrange(len(profiles)) if plan['assigned_at'] else None
+
+        counts['status_history'] = _bulk_count(ParcelStatusHistory, (
+            ParcelStatusHistory(parcel=parcel, status=status, created_at=at, notes='Seeded')
+            for parcel, plan in zip(parcel_rows, plans)
+            for status, at in plan['history']
+        ), batch_size)
+        report('status history', counts['status_history'])
+
+        assigned = [(parcel, plan) for parcel, plan in zip(parcel_rows, plans) if plan['driver'] is not None]
+        counts['admin_assignments'] = _bulk_count(AdminAssignment, (
+            AdminAssignment(parcel=parcel, driver=profiles[plan['driver']], assigned_at=plan['assigned_at'])
+            for parcel, plan in assigned
+        ), batch_size)
+        counts['driver_assignments'] = _bulk_count(DriverAssignment, (
+            DriverAssignment(
+                parcel=parcel,
+                driver=driver_users[plan['driver']],
+                assigned_at=plan['assigned_at'],
+                started_at=plan['started_at'],
+                completed_at=plan['completed_at'],
+            )
+            for parcel, plan in assigned
+        ), batch_size)
+        report('assignments', counts['driver_assignments'])
+
+        tracked = [(parcel, plan) for parcel, plan in assigned if plan['started_at']]
+        counts['locations'] = _bulk_count(
+            TrackDriverLocation,
+            _trail_points(rng, tracked, driver_users, locations, anchor),
+            batch_size
+        )
+        report('driver locations', counts['locations'])
+
+        # One admin-side "last known position" per driver
+        counts['admin_locations'] = _bulk_count(DriverLocation, (
+            DriverLocation(
+                driver=profile,
+                latitude=_quantize(CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)),
+                longitude=_quantize(CENTER_LNG + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)),
+                speed=Decimal(rng.randint(0, 6000)) / 100,
+                updated_at=anchor,
+            )
+            for profile in profiles
+        ), batch_size)
+        report('admin driver locations', counts['admin_locations'])
+
+    return counts
+
+
+def _bulk(model, objects, batch_size):
+    """bulk_create in batches and return the created objects (with primary keys)."""
+    created = []
+    for batch in chunked(objects, batch_size):
+        with transaction.atomic():
+            created.extend(model.objects.bulk_create(batch, batch_size=batch_size))
+    return created
+
+
+def _bulk_count(model, objects, batch_size):
+    """bulk_create in batches without keeping the objects; return the row count."""
+    total = 0
+    for batch in chunked(objects, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size)
+        total += len(batch)
+    return total
+
+
+def _plan_parcel(rng, index, anchor):
+    """Pick a status, coordinates and a consistent timeline for one parcel."""
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    pickup = (CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+              CENTER_LNG + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+    drop = (CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            CENTER_LNG + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+    distance_km = (((pickup[0] - drop[0]) * 111) ** 2 + ((pickup[1] - drop[1]) * 108) ** 2) ** 0.5
+
+    created_at = anchor - timedelta(days=rng.uniform(0, 60))
+    if status == 'cancelled':
+        steps = ['requested', 'cancelled']
+    else:
+        steps = STATUS_FLOW[:STATUS_FLOW.index(status) + 1]
+
+    history = []
+    at = created_at
+    for step in steps:
+        history.append((step, at))
+        at += timedelta(minutes=rng.uniform(5, 90))
+
+    times = dict(history)
+    return {
+        'status': status,
+        'pickup': pickup,
+        'drop': drop,
+        'distance_km': distance_km,
+        'created_at': created_at,
+        'history': history,
+        'assigned_at': times.get('assigned'),
+        'started_at': times.get('picked_up'),
+        'completed_at': times.get('delivered'),
+    }
+
+
+def _trail_points(rng, tracked, driver_users, total, anchor):
+    """Yield `total` GPS points spread evenly over the tracked parcels' routes."""
+    if not tracked or total <= 0:
+        return
+    per_parcel, extra = divmod(total, len(tracked))
+    for index, (parcel, plan) in enumerate(tracked):
+        count = per_parcel + (1 if index < extra else 0)
+        if not count:
+            continue
+        driver = driver_users[plan['driver']]
+        start = plan['started_at']
+        end = plan['completed_at'] or anchor
+        step = max((end - start) / count, timedelta(seconds=1))
+        (lat1, lng1), (lat2, lng2) = plan['pickup'], plan['drop']
+        # Delivered trails end at the drop point; open ones stop part-way
+        reach = 1.0 if plan['completed_at'] else rng.uniform(0.2, 0.9)
+        for n in range(count):
+            fraction = reach * (n + 1) / count
+            yield TrackDriverLocation(
+                driver=driver,
+                parcel=parcel,
+                latitude=_quantize(lat1 + (lat2 - lat1) * fraction + rng.uniform(-0.0003, 0.0003)),
+                longitude=_quantize(lng1 + (lng2 - lng1) * fraction + rng.uniform(-0.0003, 0.0003)),
+                address='',
+                timestamp=start + step * (n + 1),
+            )
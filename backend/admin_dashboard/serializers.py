@@ -80,6 +80,8 @@ class ParcelRequestSerializer(serializers.ModelSerializer):
             'from_location', 'to_location', 'pickup_lat', 'pickup_lng', 'drop_lat', 'drop_lng',
             'weight', 'description', 'current_status', 'driver_name', 'created_at'
         ]
+        # Column lookups for client.projection
+        projections = {'driver_name': 'admin_assignment__driver__name'}
     
     def get_driver_name(self, obj):
         """Return the driver name if parcel is assigned to a driver."""
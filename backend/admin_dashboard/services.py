@@ -1,7 +1,14 @@
+import logging
+
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 from client.models import Parcel, ParcelStatusHistory
+from client.cache import bump, parcel_scope
+from client.notifications import create_notification
 from .models import AdminAssignment, Driver, DriverLocation
-from track_driver.models import DriverAssignment as TrackDriverAssignment
+from track_driver.models import DriverAssignment as TrackDriverAssignment, DriverLocation as TrackDriverLocation
+
+logger = logging.getLogger(__name__)
 
 
 def accept_parcel(parcel: Parcel, actor=None):
@@ -11,10 +18,10 @@ def accept_parcel(parcel: Parcel, actor=None):
     parcel.current_status = 'accepted'
     parcel.save(update_fields=['current_status', 'updated_at'])
     ParcelStatusHistory.objects.create(parcel=parcel, status='accepted', created_by=actor)
+    bump(parcel_scope(parcel.id))
     
     # Create notification for client
-    from client.models import Notification
-    Notification.objects.create(
+    create_notification(
         client=parcel.client,
         parcel=parcel,
         notification_type='status_update',
@@ -29,6 +36,7 @@ def reject_parcel(parcel: Parcel, actor=None, notes=None):
     parcel.current_status = 'cancelled'
     parcel.save(update_fields=['current_status', 'updated_at'])
     ParcelStatusHistory.objects.create(parcel=parcel, status='cancelled', notes=notes, created_by=actor)
+    bump(parcel_scope(parcel.id))
     return parcel
 
 
@@ -47,24 +55,22 @@ def assign_driver_to_parcel(parcel: Parcel, driver: Driver, actor=None):
     parcel.current_status = 'assigned'
     parcel.save(update_fields=['current_status', 'updated_at'])
     ParcelStatusHistory.objects.create(parcel=parcel, status='assigned', created_by=actor)
+    bump(parcel_scope(parcel.id))
 
     # Always create/update TrackDriverAssignment if driver has user account
-    print(f"[DEBUG] Assigning driver {driver.name} (ID: {driver.id}) to parcel {parcel.tracking_number}")
-    print(f"[DEBUG] Driver has user account: {driver.user is not None}")
-    
     if driver.user:
         track_assignment, track_created = TrackDriverAssignment.objects.update_or_create(
             parcel=parcel, 
             defaults={'driver': driver.user}
         )
-        print(f"[DEBUG] TrackDriverAssignment {'created' if track_created else 'updated'} - ID: {track_assignment.id}")
+        logger.debug('Assigned driver %s to parcel %s (tracking assignment %s %s)',
+                     driver.id, parcel.id, track_assignment.id, 'created' if track_created else 'updated')
     else:
-        print(f"[DEBUG] WARNING: Driver {driver.name} has no linked user account!")
+        logger.warning('Driver %s has no linked user account; matching by email', driver.id)
         # Try to find user by email match
         from authapp.models import User
         try:
             user = User.objects.get(email=driver.email, role='driver')
-            print(f"[DEBUG] Found matching user by email: {user.email}")
             # Link the user to the driver
             driver.user = user
             driver.save(update_fields=['user'])
@@ -73,13 +79,19 @@ def assign_driver_to_parcel(parcel: Parcel, driver: Driver, actor=None):
                 parcel=parcel, 
                 defaults={'driver': user}
             )
-            print(f"[DEBUG] TrackDriverAssignment created with matched user - ID: {track_assignment.id}")
+            logger.debug('Assigned driver %s to parcel %s via matched user %s (tracking assignment %s)',
+                         driver.id, parcel.id, user.id, track_assignment.id)
         except User.DoesNotExist:
-            print(f"[DEBUG] ERROR: No user account found for driver email {driver.email}")
+            logger.error('No user account found for driver %s; parcel %s has no tracking assignment',
+                         driver.id, parcel.id)
+
+    # The driver has a new active parcel, so their geofences must be rebuilt
+    if driver.user_id:
+        from track_driver.geofence import get_geofence_engine
+        get_geofence_engine().invalidate_driver(driver.user_id)
 
     # Create notification for client
-    from client.models import Notification
-    Notification.objects.create(
+    create_notification(
         client=parcel.client,
         parcel=parcel,
         notification_type='status_update',
@@ -90,44 +102,74 @@ def assign_driver_to_parcel(parcel: Parcel, driver: Driver, actor=None):
     return assignment
 
 
-def get_latest_driver_location_for_driver(driver: Driver):
-    # Prefer track_driver locations if driver is linked to a user
-    if driver.user:
-        from track_driver.models import DriverLocation as TrackDriverLocation
-        loc = TrackDriverLocation.objects.filter(driver=driver.user).order_by('-timestamp').first()
-        if loc:
-            return {
-                'latitude': loc.latitude,
-                'longitude': loc.longitude,
-                'speed': None,
-                'timestamp': loc.timestamp,
-                'parcel': getattr(loc, 'parcel', None),
-            }
-
-    # Fallback to admin stored locations
-    loc = DriverLocation.objects.filter(driver=driver).order_by('-updated_at').first()
-    if loc:
-        return {
-            'latitude': loc.latitude,
-            'longitude': loc.longitude,
-            'speed': loc.speed,
-            'timestamp': loc.updated_at,
-            'parcel': loc.parcel,
-        }
-
-    return None
-
-
-def get_latest_location_for_parcel(parcel: Parcel):
-    # Check track_driver locations first
-    from track_driver.models import DriverLocation as TrackDriverLocation
-    loc = TrackDriverLocation.objects.filter(parcel=parcel).order_by('-timestamp').first()
-    if loc:
-        return {'latitude': loc.latitude, 'longitude': loc.longitude, 'driver': getattr(loc.driver, 'id', None), 'timestamp': loc.timestamp}
-
-    # Fallback to admin locations
-    loc = DriverLocation.objects.filter(parcel=parcel).order_by('-updated_at').first()
-    if loc:
-        return {'latitude': loc.latitude, 'longitude': loc.longitude, 'driver': getattr(loc.driver, 'id', None), 'timestamp': loc.updated_at}
-
-    return None
+LIVE_PARCEL_STATUSES = ['accepted', 'assigned', 'in_transit', 'picked_up', 'out_for_delivery']
+
+
+def _latest(queryset, field):
+    return Subquery(queryset.values(field)[:1])
+
+
+def get_live_drivers():
+    """Return every driver with their latest position and current assignment in one query.
+
+    Positions from the tracking socket (track_driver) win over the admin-side
+    DriverLocation table, which only fills in drivers without one.
+    """
+    track_locations = TrackDriverLocation.objects.filter(driver_id=OuterRef('user_id')).order_by('-timestamp')
+    admin_locations = DriverLocation.objects.filter(driver=OuterRef('pk')).order_by('-updated_at')
+    assignments = AdminAssignment.objects.filter(driver=OuterRef('pk')).order_by('-assigned_at')
+
+    drivers = Driver.objects.annotate(
+        track_lat=_latest(track_locations, 'latitude'),
+        track_lng=_latest(track_locations, 'longitude'),
+        admin_lat=_latest(admin_locations, 'latitude'),
+        admin_lng=_latest(admin_locations, 'longitude'),
+        admin_speed=_latest(admin_locations, 'speed'),
+        assigned_parcel=_latest(assignments, 'parcel_id'),
+        parcel_status=_latest(assignments, 'parcel__current_status'),
+    ).values(
+        'id', 'track_lat', 'track_lng', 'admin_lat', 'admin_lng', 'admin_speed',
+        'assigned_parcel', 'parcel_status'
+    )
+
+    results = []
+    for d in drivers:
+        from_track = d['track_lat'] is not None
+        results.append({
+            'driver_id': d['id'],
+            'latitude': d['track_lat'] if from_track else d['admin_lat'],
+            'longitude': d['track_lng'] if from_track else d['admin_lng'],
+            'speed': None if from_track else d['admin_speed'],
+            'assigned_parcel': d['assigned_parcel'],
+            'parcel_status': d['parcel_status'],
+        })
+    return results
+
+
+def get_live_parcels():
+    """Return active parcels with their latest position and assigned driver in one query."""
+    track_locations = TrackDriverLocation.objects.filter(parcel=OuterRef('pk')).order_by('-timestamp')
+    admin_locations = DriverLocation.objects.filter(parcel=OuterRef('pk')).order_by('-updated_at')
+
+    parcels = Parcel.objects.filter(current_status__in=LIVE_PARCEL_STATUSES).annotate(
+        track_lat=_latest(track_locations, 'latitude'),
+        track_lng=_latest(track_locations, 'longitude'),
+        admin_lat=_latest(admin_locations, 'latitude'),
+        admin_lng=_latest(admin_locations, 'longitude'),
+    ).values(
+        'id', 'tracking_number', 'current_status', 'admin_assignment__driver_id',
+        'track_lat', 'track_lng', 'admin_lat', 'admin_lng'
+    )
+
+    results = []
+    for p in parcels:
+        from_track = p['track_lat'] is not None
+        results.append({
+            'parcel_id': p['id'],
+            'tracking_number': p['tracking_number'],
+            'latitude': p['track_lat'] if from_track else p['admin_lat'],
+            'longitude': p['track_lng'] if from_track else p['admin_lng'],
+            'driver_id': p['admin_assignment__driver_id'],
+            'parcel_status': p['current_status'],
+        })
+    return results
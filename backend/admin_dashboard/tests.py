@@ -0,0 +1,189 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from client.models import Parcel
+from client.tests import make_client, make_parcel
+from track_driver.models import DriverLocation as TrackDriverLocation
+
+from .models import AdminAssignment, Driver, DriverLocation
+from .views import ParcelRequestPagination
+
+URL = '/api/admin/parcel-requests/'
+
+
+def make_driver(index=1, **fields):
+    values = {
+        'name': f'Driver {index}',
+        'email': f'driver{index}@test.com',
+        'phone_number': f'91000000{index:02d}',
+        'vehicle_number': f'MH12AB{index:04d}',
+        'current_location': 'Pune',
+    }
+    values.update(fields)
+    return Driver.objects.create(**values)
+
+
+class ParcelRequestListTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        client = make_client()
+        now = timezone.now()
+        statuses = ['requested', 'accepted', 'assigned', 'in_transit', 'cancelled', 'completed']
+        self.parcels = {}
+        for index, current_status in enumerate(statuses, start=1):
+            parcel = make_parcel(client, index, current_status=current_status)
+            # One parcel per day, the first one oldest
+            created_at = now - timedelta(days=len(statuses) - index)
+            Parcel.objects.filter(pk=parcel.pk).update(created_at=created_at)
+            self.parcels[current_status] = parcel
+        self.driver = make_driver()
+        AdminAssignment.objects.create(parcel=self.parcels['assigned'], driver=self.driver)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        rows = body['results'] if isinstance(body, dict) else body
+        return [row['id'] for row in rows]
+
+    def expected(self, *statuses):
+        return [self.parcels[current_status].id for current_status in statuses]
+
+    def test_lists_open_parcels_newest_first(self):
+        response = self.api.get(URL)
+        self.assertEqual(self.ids(response), self.expected('in_transit', 'assigned', 'accepted', 'requested'))
+
+    def test_status_filter(self):
+        response = self.api.get(URL, {'status': 'requested,assigned'})
+        self.assertEqual(self.ids(response), self.expected('assigned', 'requested'))
+
+    def test_status_filter_keeps_closed_parcels_out(self):
+        response = self.api.get(URL, {'status': 'cancelled'})
+        self.assertEqual(self.ids(response), [])
+
+    def test_created_range_filters(self):
+        created = Parcel.objects.get(pk=self.parcels['accepted'].pk).created_at
+        response = self.api.get(URL, {
+            'created_after': created.isoformat(),
+            'created_before': (created + timedelta(days=2)).date().isoformat(),
+        })
+        self.assertEqual(self.ids(response), self.expected('assigned', 'accepted'))
+
+    def test_driver_filter(self):
+        response = self.api.get(URL, {'driver': self.driver.id})
+        self.assertEqual(self.ids(response), self.expected('assigned'))
+        self.assertEqual(self.ids(self.api.get(URL, {'driver': self.driver.id + 1})), [])
+
+    def test_limit_and_offset(self):
+        response = self.api.get(URL, {'limit': 2, 'offset': 1})
+        self.assertEqual(response.json()['count'], 4)
+        self.assertEqual(self.ids(response), self.expected('assigned', 'accepted'))
+
+    def test_limit_is_capped_at_max_limit(self):
+        with mock.patch.object(ParcelRequestPagination, 'max_limit', 3):
+            response = self.api.get(URL, {'limit': 100})
+        self.assertEqual(len(self.ids(response)), 3)
+
+    def test_invalid_filters_return_400_keyed_by_field(self):
+        cases = [
+            ({'status': 'requested,lost'}, 'status'),
+            ({'created_after': 'yesterday'}, 'created_after'),
+            ({'created_before': '2026-13-01'}, 'created_before'),
+            ({'driver': 'abc'}, 'driver'),
+        ]
+        for params, field in cases:
+            with self.subTest(params=params):
+                response = self.api.get(URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [field])
+
+
+class LiveTrackingTests(TestCase):
+    """Positions from the tracking socket win over admin-side DriverLocation rows."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.now = timezone.now()
+        self.client_user = make_client()
+        self.driver_user = make_client(2)
+
+    def track_location(self, lat, minutes_ago, parcel=None):
+        location = TrackDriverLocation.objects.create(
+            driver=self.driver_user, parcel=parcel, latitude=lat, longitude='73.8500000'
+        )
+        TrackDriverLocation.objects.filter(pk=location.pk).update(timestamp=self.now - timedelta(minutes=minutes_ago))
+
+    def admin_location(self, driver, lat, minutes_ago, parcel=None, speed='30.00'):
+        location = DriverLocation.objects.create(
+            driver=driver, parcel=parcel, latitude=lat, longitude='73.8500000', speed=speed
+        )
+        DriverLocation.objects.filter(pk=location.pk).update(updated_at=self.now - timedelta(minutes=minutes_ago))
+
+    def assign(self, parcel, driver, minutes_ago):
+        assignment = AdminAssignment.objects.create(parcel=parcel, driver=driver)
+        AdminAssignment.objects.filter(pk=assignment.pk).update(assigned_at=self.now - timedelta(minutes=minutes_ago))
+
+    def test_live_drivers(self):
+        tracked = make_driver(1, user=self.driver_user)
+        admin_only = make_driver(2)
+        idle = make_driver(3)
+        self.track_location('18.5100000', 10)
+        self.track_location('18.5200000', 1)
+        self.admin_location(tracked, '18.9000000', 0)
+        self.admin_location(admin_only, '18.6000000', 5, speed='12.50')
+        self.admin_location(admin_only, '18.6100000', 2, speed='20.00')
+        older = make_parcel(self.client_user, 1, current_status='in_transit')
+        newer = make_parcel(self.client_user, 2, current_status='assigned')
+        self.assign(older, tracked, 30)
+        self.assign(newer, tracked, 3)
+
+        response = self.api.get('/api/admin/live-drivers/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'driver_id': idle.id, 'latitude': None, 'longitude': None, 'speed': None,
+             'assigned_parcel': None, 'parcel_status': None},
+            {'driver_id': admin_only.id, 'latitude': '18.6100000', 'longitude': '73.8500000', 'speed': '20.00',
+             'assigned_parcel': None, 'parcel_status': None},
+            {'driver_id': tracked.id, 'latitude': '18.5200000', 'longitude': '73.8500000', 'speed': None,
+             'assigned_parcel': newer.id, 'parcel_status': 'assigned'},
+        ])
+
+    def test_live_parcels(self):
+        driver = make_driver()
+        tracked = make_parcel(self.client_user, 1, current_status='in_transit')
+        admin_only = make_parcel(self.client_user, 2, current_status='accepted')
+        make_parcel(self.client_user, 3, current_status='delivered')
+        self.track_location('18.5100000', 10, parcel=tracked)
+        self.track_location('18.5200000', 1, parcel=tracked)
+        self.admin_location(driver, '18.9000000', 0, parcel=tracked)
+        self.admin_location(driver, '18.6000000', 2, parcel=admin_only)
+        self.assign(tracked, driver, 5)
+
+        response = self.api.get('/api/admin/live-parcels/')
+
+        self.assertEqual(response.status_code, 200)
+        rows = {row['parcel_id']: row for row in response.json()}
+        self.assertEqual(set(rows), {tracked.id, admin_only.id})
+        self.assertEqual(rows[tracked.id], {
+            'parcel_id': tracked.id, 'tracking_number': tracked.tracking_number, 'latitude': '18.5200000',
+            'longitude': '73.8500000', 'driver_id': driver.id, 'parcel_status': 'in_transit',
+        })
+        self.assertEqual(rows[admin_only.id], {
+            'parcel_id': admin_only.id, 'tracking_number': admin_only.tracking_number, 'latitude': '18.6000000',
+            'longitude': '73.8500000', 'driver_id': None, 'parcel_status': 'accepted',
+        })
+
+    def test_live_endpoints_use_one_query(self):
+        for index in range(1, 4):
+            driver = make_driver(index)
+            parcel = make_parcel(self.client_user, index, current_status='in_transit')
+            self.assign(parcel, driver, index)
+            self.admin_location(driver, '18.6000000', index, parcel=parcel)
+
+        for url in ('/api/admin/live-drivers/', '/api/admin/live-parcels/'):
+            with self.subTest(url=url), self.assertNumQueries(1):
+                self.assertEqual(len(self.api.get(url).json()), 3)
@@ -1,8 +1,14 @@
+from datetime import datetime, time
+
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from .models import Driver, DriverLocation
 from .serializers import (
@@ -10,18 +16,74 @@ from .serializers import (
     LiveDriverSerializer, LiveParcelSerializer
 )
 from client.models import Parcel
+from client.projection import ProjectedListMixin
 from . import services
 
 
+class ParcelRequestPagination(LimitOffsetPagination):
+    max_limit = 500
+
+
+def parse_timestamp(value, name):
+    """Parse a date (midnight, current timezone) or ISO datetime query parameter."""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        day = parse_date(value) if parsed is None else None
+    except ValueError:
+        # Well formed but out of range, e.g. month 13
+        parsed = day = None
+    if parsed is None:
+        if day is None:
+            raise ValidationError({name: 'Must be a date (YYYY-MM-DD) or ISO datetime.'})
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
 class DriverViewSet(viewsets.ModelViewSet):
     queryset = Driver.objects.all()
     serializer_class = DriverSerializer
 
 
-class ParcelRequestListView(generics.ListAPIView):
-    # Return all parcels except cancelled/completed - admin needs to see accepted, assigned, in-transit, etc.
-    queryset = Parcel.objects.exclude(current_status__in=['cancelled', 'completed']).order_by('-created_at')
+class ParcelRequestListView(ProjectedListMixin, generics.ListAPIView):
+    """
+    GET /api/admin/parcel-requests/
+    Parcels in the admin queue, newest first. Optional filters:
+    ?status=requested,accepted  ?created_after=/created_before= (date or datetime)
+    ?driver=<driver id>. Paginated with ?limit=&offset= (unpaginated without limit).
+    """
     serializer_class = ParcelRequestSerializer
+    pagination_class = ParcelRequestPagination
+    
+    def get_queryset(self):
+        # Return all parcels except cancelled/completed - admin needs to see accepted, assigned, in-transit, etc.
+        queryset = Parcel.objects.exclude(current_status__in=['cancelled', 'completed'])
+        params = self.request.query_params
+        
+        statuses = [value for value in params.get('status', '').split(',') if value]
+        if statuses:
+            unknown = set(statuses) - {choice for choice, _ in Parcel.STATUS_CHOICES}
+            if unknown:
+                raise ValidationError({'status': f"Unknown status: {', '.join(sorted(unknown))}."})
+            queryset = queryset.filter(current_status__in=statuses)
+        
+        created_after = parse_timestamp(params.get('created_after'), 'created_after')
+        if created_after:
+            queryset = queryset.filter(created_at__gte=created_after)
+        created_before = parse_timestamp(params.get('created_before'), 'created_before')
+        if created_before:
+            queryset = queryset.filter(created_at__lt=created_before)
+        
+        driver = params.get('driver')
+        if driver:
+            if not driver.isdigit():
+                raise ValidationError({'driver': 'Must be a driver id.'})
+            queryset = queryset.filter(admin_assignment__driver_id=int(driver))
+        
+        return queryset.select_related('client', 'admin_assignment__driver').order_by('-created_at')
 
 
 class AcceptParcelAPIView(APIView):
@@ -59,55 +121,13 @@ class AssignDriverAPIView(APIView):
 
 class LiveDriversAPIView(APIView):
     def get(self, request):
-        drivers = Driver.objects.all()
-        results = []
-        for d in drivers:
-            loc = services.get_latest_driver_location_for_driver(d)
-            assigned_parcel = None
-            parcel_status = None
-            # check admin assignment
-            assignment = getattr(d.assignments.first(), 'parcel', None)
-            if assignment:
-                assigned_parcel = assignment.id
-                parcel_status = assignment.current_status
-
-            entry = {
-                'driver_id': d.id,
-                'latitude': loc['latitude'] if loc else None,
-                'longitude': loc['longitude'] if loc else None,
-                'speed': loc.get('speed') if loc else None,
-                'assigned_parcel': assigned_parcel,
-                'parcel_status': parcel_status,
-            }
-            results.append(entry)
-
-        serializer = LiveDriverSerializer(results, many=True)
+        serializer = LiveDriverSerializer(services.get_live_drivers(), many=True)
         return Response(serializer.data)
 
 
 class LiveParcelsAPIView(APIView):
     def get(self, request):
-        # Find parcels that have admin assignments or track assignments
-        parcels = Parcel.objects.filter(current_status__in=['accepted', 'assigned', 'in_transit', 'picked_up', 'out_for_delivery'])
-        results = []
-        for p in parcels:
-            loc = services.get_latest_location_for_parcel(p)
-            driver_id = None
-            # prefer admin assignment
-            if hasattr(p, 'admin_assignment') and p.admin_assignment:
-                driver_id = p.admin_assignment.driver.id
-
-            entry = {
-                'parcel_id': p.id,
-                'tracking_number': p.tracking_number,
-                'latitude': loc['latitude'] if loc else None,
-                'longitude': loc['longitude'] if loc else None,
-                'driver_id': driver_id,
-                'parcel_status': p.current_status,
-            }
-            results.append(entry)
-
-        serializer = LiveParcelSerializer(results, many=True)
+        serializer = LiveParcelSerializer(services.get_live_parcels(), many=True)
         return Response(serializer.data)
 
 
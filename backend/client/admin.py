@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Parcel, ParcelStatusHistory, Notification, PricingRule
+from .models import Parcel, ParcelStatusHistory, Notification, PricingRule, NotificationOutbox
+from .notifications import create_notification, sync_unread_counters
+from .cache import bump, parcel_scope, PRICING_RULES_SCOPE
 
 
 @admin.register(PricingRule)
@@ -34,6 +36,18 @@ class PricingRuleAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump(PRICING_RULES_SCOPE)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump(PRICING_RULES_SCOPE)
+    
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump(PRICING_RULES_SCOPE)
 
 
 class ParcelStatusHistoryInline(admin.TabularInline):
@@ -119,6 +133,7 @@ class ParcelAdmin(admin.ModelAdmin):
             if old_obj.weight != obj.weight or old_obj.distance_km != obj.distance_km:
                 obj.calculate_price()
         super().save_model(request, obj, form, change)
+        bump(parcel_scope(obj.pk))
 
 
 @admin.register(ParcelStatusHistory)
@@ -162,10 +177,11 @@ class ParcelStatusHistoryAdmin(admin.ModelAdmin):
         parcel = obj.parcel
         parcel.current_status = obj.status
         parcel.save()
+        bump(parcel_scope(parcel.id))
         
         # Create notification for status update
         if obj.status != 'pending':
-            Notification.objects.create(
+            create_notification(
                 client=parcel.client,
                 parcel=parcel,
                 notification_type='status_update',
@@ -218,11 +234,30 @@ class NotificationAdmin(admin.ModelAdmin):
     def mark_as_read(self, request, queryset):
         """Mark selected notifications as read."""
         updated = queryset.update(is_read=True)
+        sync_unread_counters(queryset.values_list('client_id', flat=True))
         self.message_user(request, f'{updated} notification(s) marked as read.')
     mark_as_read.short_description = 'Mark selected notifications as read'
     
     def mark_as_unread(self, request, queryset):
         """Mark selected notifications as unread."""
         updated = queryset.update(is_read=False)
+        sync_unread_counters(queryset.values_list('client_id', flat=True))
         self.message_user(request, f'{updated} notification(s) marked as unread.')
     mark_as_unread.short_description = 'Mark selected notifications as unread'
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    """Admin interface for the notification delivery outbox."""
+    
+    list_display = [
+        'notification',
+        'channel',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'delivered_at'
+    ]
+    list_filter = ['status', 'channel']
+    readonly_fields = ['created_at', 'claimed_by', 'claimed_at', 'delivered_at', 'last_error']
+    raw_id_fields = ['notification']
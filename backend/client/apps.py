@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 
 
 class ClientConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'client'
+
+    def ready(self):
+        from .models import Notification
+        from .notifications import notification_deleted
+
+        post_delete.connect(notification_deleted, sender=Notification, dispatch_uid='client.notification_deleted')
@@ -0,0 +1,169 @@
+"""
+Versioned read-through cache for hot client endpoints.
+
+Cached payloads are keyed on the endpoint name plus the current version of
+every scope they depend on (e.g. `parcel:12`, `client:7`, `pricing_rules`).
+Write paths call bump() on the scopes they change, which makes every key
+built from the old version unreachable; stale entries simply age out.
+Nothing is ever deleted or scanned.
+
+The same versioned key doubles as a strong ETag, so a matching
+If-None-Match is answered with 304 without touching the database. Parcel
+endpoints also fold a database validator into the key (parcel_validator():
+updated_at plus the latest status-history and location ids, read in one
+indexed query), so the ETag stays correct even for writes that bypass
+bump().
+
+Versions start from a millisecond timestamp rather than 1 so a version key
+evicted from the cache can never be re-created at a value an old payload
+was stored under.
+
+Versions live in the RESPONSE_CACHE_ALIAS cache, so every process that
+writes or serves these endpoints must share it. The default LocMemCache is
+only correct with a single server process; set CACHE_REDIS_URL otherwise.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_PREFIX = 'routex:ver:'
+PAYLOAD_PREFIX = 'routex:resp:'
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def parcel_scope(parcel_id):
+    return f'parcel:{parcel_id}'
+
+
+def client_scope(client_id):
+    return f'client:{client_id}'
+
+
+PRICING_RULES_SCOPE = 'pricing_rules'
+
+
+def get_versions(scopes):
+    """Return {scope: version}, initializing missing versions."""
+    cache = _cache()
+    keys = {VERSION_PREFIX + scope: scope for scope in scopes}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, scope in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, int(time.time() * 1000), None)
+            version = cache.get(key)
+        versions[scope] = version
+    return versions
+
+
+def bump(*scopes):
+    """Invalidate every cached payload that depends on any of `scopes`.
+
+    Runs once the current transaction commits, so a concurrent reader can't
+    cache pre-commit data under the new version.
+    """
+    def apply():
+        cache = _cache()
+        for scope in scopes:
+            key = VERSION_PREFIX + scope
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Missing version: start a fresh, never-used one
+                cache.set(key, int(time.time() * 1000), None)
+
+    transaction.on_commit(apply)
+
+
+def cache_key(name, scopes):
+    versions = get_versions(scopes)
+    return PAYLOAD_PREFIX + name + ':' + ':'.join(f'{s}={versions[s]}' for s in scopes)
+
+
+def etag_for(key):
+    return '"' + hashlib.md5(key.encode(), usedforsecurity=False).hexdigest() + '"'
+
+
+def parcel_validator(parcel_id, client_id, with_location=False):
+    """Return a change token for a client's parcel, or None if it isn't theirs.
+
+    One query: the parcel row by primary key with the latest status-history
+    id (and optionally latest driver-location id) as indexed subqueries.
+    """
+    from track_driver.models import DriverLocation
+    from .models import Parcel, ParcelStatusHistory
+
+    queryset = Parcel.objects.filter(id=parcel_id, client_id=client_id).annotate(
+        last_history_id=Subquery(
+            ParcelStatusHistory.objects.filter(parcel=OuterRef('pk')).order_by('-id').values('id')[:1]
+        )
+    )
+    fields = ['updated_at', 'last_history_id']
+    if with_location:
+        queryset = queryset.annotate(
+            last_location_id=Subquery(
+                DriverLocation.objects.filter(parcel=OuterRef('pk')).order_by('-id').values('id')[:1]
+            )
+        )
+        fields.append('last_location_id')
+
+    row = queryset.values_list(*fields).first()
+    if row is None:
+        return None
+    return ':'.join([row[0].isoformat(), *(str(value) for value in row[1:])])
+
+
+def not_modified(request, etag):
+    """True if the request's If-None-Match matches `etag`."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+
+def cached_response(request, name, scopes, build, validator=None):
+    """Serve `build()`'s payload through the versioned cache with ETag/304 support.
+
+    `name` must identify the endpoint *and* the requesting principal (e.g.
+    include the client id) so payloads are never shared across users.
+    `validator` is an optional change token (see parcel_validator()) mixed
+    into the key. A matching If-None-Match returns an empty 304 before the
+    payload is read or built. `build` runs the full DB/serializer path and
+    may return a Response for errors, which is passed through uncached.
+    """
+    key = cache_key(name, scopes)
+    if validator is not None:
+        key = f'{key}:{validator}'
+    etag = etag_for(key)
+
+    if not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        cache = _cache()
+        data = cache.get(key)
+        if data is None:
+            data = build()
+            if isinstance(data, Response):
+                return data
+            cache.set(key, data, _timeout())
+        response = Response(data, status=status.HTTP_200_OK)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
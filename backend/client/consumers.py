@@ -0,0 +1,85 @@
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+
+from metrics.instruments import WS_CONNECTIONS
+from .notifications import notification_group_name, get_unread_count
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """WebSocket consumer pushing a user's notifications and unread count."""
+    
+    async def connect(self):
+        """Join the user's notification group and send the initial unread count."""
+        self.user = self.scope.get('user')
+        
+        if not self.user or not self.user.is_authenticated:
+            await self.close()
+            return
+        
+        # Read the counter once, before joining the group; afterwards it is
+        # maintained from events. Reading after the join would count a
+        # notification created in between twice: once in the counter and
+        # again when its event is handled.
+        self.unread_count = await database_sync_to_async(get_unread_count)(self.user.id)
+        
+        self.group_name = notification_group_name(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        WS_CONNECTIONS.inc(consumer='notifications', role=self.user.role)
+        await self.send_unread_count()
+    
+    async def disconnect(self, close_code):
+        """Leave the notification group."""
+        if hasattr(self, 'group_name'):
+            WS_CONNECTIONS.dec(consumer='notifications', role=self.user.role)
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+    
+    async def receive(self, text_data):
+        """Clients only listen on this socket; answer pings so they can check liveness."""
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            return
+        if data.get('type') == 'ping':
+            await self.send(text_data=json.dumps({'type': 'pong'}))
+    
+    async def notification_created(self, event):
+        """Push a new notification (handler for channel layer)."""
+        if not event['notification'].get('is_read'):
+            self.unread_count += 1
+        await self.send(text_data=json.dumps({
+            'type': 'notification',
+            'notification': event['notification'],
+            'unread_count': self.unread_count
+        }))
+    
+    async def notifications_read(self, event):
+        """Apply a read-state delta (handler for channel layer)."""
+        if event.get('all_read'):
+            self.unread_count = 0
+        else:
+            self.unread_count = max(self.unread_count - event.get('count', 0), 0)
+        await self.send_unread_count()
+    
+    async def notifications_unread(self, event):
+        """Apply an unread-state delta (handler for channel layer)."""
+        self.unread_count += event.get('count', 0)
+        await self.send_unread_count()
+    
+    async def notifications_deleted(self, event):
+        """Drop deleted unread notifications from the count (handler for channel layer)."""
+        self.unread_count = max(self.unread_count - event.get('count', 0), 0)
+        await self.send_unread_count()
+    
+    async def unread_count_reset(self, event):
+        """Replace the count after a bulk recount (handler for channel layer)."""
+        self.unread_count = event['unread_count']
+        await self.send_unread_count()
+    
+    async def send_unread_count(self):
+        await self.send(text_data=json.dumps({
+            'type': 'unread_count',
+            'unread_count': self.unread_count
+        }))
+
@@ -0,0 +1,140 @@
+"""
+Notification delivery channels used by the outbox workers.
+
+A channel delivers one notification and raises on failure; the outbox
+takes care of retries. Channels are listed by dotted path in
+NOTIFICATION_OUTBOX['CHANNELS'] and looked up by their `name`.
+
+Channel-layer sends from worker threads go through group_send(). The
+in-process InMemoryChannelLayer keeps its queues on the ASGI server's event
+loop and is not thread-safe, so once ServerLoopBinding has seen that loop
+the send is scheduled on it; without a server loop (the separate
+`run_notification_workers` process with a shared layer such as Redis) it
+runs on a private loop.
+"""
+import asyncio
+import concurrent.futures
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.mail import send_mail
+
+
+SEND_TIMEOUT_SECONDS = 10
+
+# Event loop of the ASGI server running in this process, if any
+_server_loop = None
+
+
+class DeliveryError(Exception):
+    """Raised by a channel when a delivery attempt fails."""
+
+
+def bind_server_loop(loop):
+    """Run worker-thread channel-layer sends on `loop` (None to unbind)."""
+    global _server_loop
+    _server_loop = loop
+
+
+class ServerLoopBinding:
+    """ASGI wrapper recording the server's event loop on the first call.
+
+    `on_start`, if given, runs once on that first call too. Work that needs
+    the server running goes there instead of at import time.
+    """
+
+    def __init__(self, application, on_start=None):
+        self.application = application
+        self.on_start = on_start
+        self._started = False
+
+    async def __call__(self, scope, receive, send):
+        if _server_loop is None:
+            bind_server_loop(asyncio.get_running_loop())
+        if not self._started:
+            self._started = True
+            if self.on_start is not None:
+                self.on_start()
+        return await self.application(scope, receive, send)
+
+
+def group_send(group, message):
+    """Send to a channel-layer group from a (non-event-loop) worker thread."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        raise DeliveryError('No channel layer configured')
+    loop = _server_loop
+    if loop is None or not loop.is_running():
+        async_to_sync(channel_layer.group_send)(group, message)
+        return
+    future = asyncio.run_coroutine_threadsafe(channel_layer.group_send(group, message), loop)
+    try:
+        future.result(timeout=SEND_TIMEOUT_SECONDS)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise DeliveryError(f'Channel layer send to {group} timed out')
+
+
+class BaseDeliveryChannel:
+    """Interface every delivery channel implements."""
+
+    name = 'base'
+
+    def deliver(self, notification):
+        raise NotImplementedError
+
+
+class WebSocketChannel(BaseDeliveryChannel):
+    """Push the notification to the owner's notification socket group."""
+
+    name = 'websocket'
+
+    def deliver(self, notification):
+        from .notifications import notification_group_name
+        from .serializers import NotificationSerializer
+
+        group_send(
+            notification_group_name(notification.client_id),
+            {
+                'type': 'notification_created',
+                'notification': dict(NotificationSerializer(notification).data),
+            }
+        )
+
+
+class EmailChannel(BaseDeliveryChannel):
+    """Send the notification to the client's email address."""
+
+    name = 'email'
+
+    def deliver(self, notification):
+        if not notification.client.email:
+            return
+        send_mail(
+            subject=notification.title,
+            message=notification.message,
+            from_email=None,
+            recipient_list=[notification.client.email],
+        )
+
+
+class FakeChannel(BaseDeliveryChannel):
+    """In-memory channel for tests and local runs.
+
+    Delivered notifications are recorded in `delivered`; the first
+    `fail_times` attempts raise DeliveryError so retry handling can be
+    exercised.
+    """
+
+    name = 'fake'
+
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.attempts = 0
+        self.delivered = []
+
+    def deliver(self, notification):
+        self.attempts += 1
+        if self.attempts <= self.fail_times:
+            raise DeliveryError(f'Simulated failure {self.attempts}')
+        self.delivered.append(notification.id)
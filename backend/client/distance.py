@@ -0,0 +1,90 @@
+"""
+Server-side distance computation for parcels.
+
+Distances are great-circle (haversine) distances between pickup and drop
+coordinates, optionally scaled by a road-distance factor table configured
+in settings. Results are memoized on coordinates rounded to
+DISTANCE_COORD_PRECISION decimal places, so repeated lanes between the
+same hubs are computed once per process.
+"""
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+from django.conf import settings
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _coord_precision():
+    return getattr(settings, 'DISTANCE_COORD_PRECISION', 4)
+
+
+def road_factor(straight_km):
+    """Return the road-distance factor for a straight-line distance.
+
+    DISTANCE_ROAD_FACTORS is a list of (max_km, factor) bands ordered by
+    max_km; a max_km of None matches everything. An empty table means no
+    scaling.
+    """
+    for max_km, factor in getattr(settings, 'DISTANCE_ROAD_FACTORS', []):
+        if max_km is None or straight_km <= max_km:
+            return factor
+    return 1.0
+
+
+def haversine_km_many(segments):
+    """Compute haversine distances in km for many segments at once.
+
+    `segments` is an iterable of (lat1, lng1, lat2, lng2) tuples. Degree to
+    radian conversion and trig constants are hoisted out of the loop so a
+    batch costs one pass over plain floats.
+    """
+    radians = math.pi / 180.0
+    sin = math.sin
+    cos = math.cos
+    asin = math.asin
+    sqrt = math.sqrt
+    diameter = 2.0 * EARTH_RADIUS_KM
+
+    results = []
+    for lat1, lng1, lat2, lng2 in segments:
+        phi1 = float(lat1) * radians
+        phi2 = float(lat2) * radians
+        half_dphi = (phi2 - phi1) * 0.5
+        half_dlambda = (float(lng2) - float(lng1)) * radians * 0.5
+        a = sin(half_dphi) ** 2 + cos(phi1) * cos(phi2) * sin(half_dlambda) ** 2
+        results.append(diameter * asin(sqrt(min(1.0, a))))
+    return results
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Haversine distance in km between two points."""
+    return haversine_km_many([(lat1, lng1, lat2, lng2)])[0]
+
+
+@lru_cache(maxsize=4096)
+def _cached_road_distance_km(lat1, lng1, lat2, lng2):
+    straight_km = haversine_km(lat1, lng1, lat2, lng2)
+    return straight_km * road_factor(straight_km)
+
+
+def road_distance_km(pickup_lat, pickup_lng, drop_lat, drop_lng):
+    """Return the billable distance between pickup and drop as a Decimal.
+
+    The lane is keyed on rounded coordinates so nearby repeat requests share
+    a cache entry. The result is quantized to 2 decimal places to match
+    Parcel.distance_km.
+    """
+    precision = _coord_precision()
+    key = tuple(
+        round(float(value), precision)
+        for value in (pickup_lat, pickup_lng, drop_lat, drop_lng)
+    )
+    distance = _cached_road_distance_km(*key)
+    return Decimal(str(distance)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def clear_distance_cache():
+    """Drop all memoized lanes (e.g. after changing the factor table)."""
+    _cached_road_distance_km.cache_clear()
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from client.retention import archive_read_notifications, get_setting
+
+
+class Command(BaseCommand):
+    help = 'Archive read notifications older than N days in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=get_setting('DAYS'),
+                            help='Archive read notifications older than this many days')
+        parser.add_argument('--batch-size', type=int, default=get_setting('BATCH_SIZE'),
+                            help='Rows moved per transaction')
+        parser.add_argument('--pause', type=float, default=get_setting('PAUSE_SECONDS'),
+                            help='Seconds to sleep between batches')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many notifications would be archived')
+
+    def handle(self, *args, **options):
+        count = archive_read_notifications(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            max_batches=options['max_batches'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{count} notification(s) would be archived'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Archived {count} notification(s)'))
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from client.cache import bump, PRICING_RULES_SCOPE
 from client.models import PricingRule
 from decimal import Decimal
 
@@ -65,6 +66,8 @@ class Command(BaseCommand):
                 )
             )
         
+        bump(PRICING_RULES_SCOPE)
+        
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nSuccessfully created {created_count} pricing rules!'
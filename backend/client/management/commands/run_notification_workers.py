@@ -0,0 +1,50 @@
+import time
+
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from client.delivery import WebSocketChannel
+from client.outbox import OutboxWorkerPool, get_channels, process_batch, get_setting
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued notifications from the notification outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=get_setting('WORKERS'),
+                            help='Number of worker threads')
+        parser.add_argument('--batch-size', type=int, default=get_setting('BATCH_SIZE'),
+                            help='Rows claimed per batch')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain due rows once and exit instead of running forever')
+
+    def handle(self, *args, **options):
+        websocket = any(isinstance(channel, WebSocketChannel) for channel in get_channels().values())
+        if websocket and isinstance(get_channel_layer(), InMemoryChannelLayer):
+            # The sockets live in the server process; an in-memory layer here never reaches them
+            raise CommandError(
+                'WebSocket delivery from a separate process needs a shared channel layer (Redis); '
+                "with InMemoryChannelLayer keep NOTIFICATION_OUTBOX['RUN_IN_PROCESS'] on"
+            )
+
+        if options['once']:
+            total = 0
+            while True:
+                handled = process_batch('manage-once', options['batch_size'])
+                total += handled
+                if handled < options['batch_size']:
+                    break
+            self.stdout.write(self.style.SUCCESS(f'Processed {total} outbox entries'))
+            return
+
+        pool = OutboxWorkerPool(workers=options['workers'], batch_size=options['batch_size'])
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(
+            f"Started {options['workers']} notification outbox worker(s). Press Ctrl+C to stop."
+        ))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping workers...'))
+            pool.stop(timeout=10)
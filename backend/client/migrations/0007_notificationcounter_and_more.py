@@ -0,0 +1,52 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_unread_counters(apps, schema_editor):
+    Notification = apps.get_model('client', 'Notification')
+    NotificationCounter = apps.get_model('client', 'NotificationCounter')
+    rows = (
+        Notification.objects.filter(is_read=False)
+        .values('client_id')
+        .annotate(unread=models.Count('id'))
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(client_id=row['client_id'], unread_count=row['unread']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0006_notificationoutbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Notification Counter',
+                'verbose_name_plural': 'Notification Counters',
+                'db_table': 'notification_counters',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notificatio_is_read_3f8c44_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['client', 'is_read', '-created_at'], name='notificatio_client__d3394e_idx'),
+        ),
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
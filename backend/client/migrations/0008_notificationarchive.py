@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0007_notificationcounter_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Original notification id', primary_key=True, serialize=False)),
+                ('parcel_id', models.BigIntegerField(blank=True, null=True)),
+                ('notification_type', models.CharField(choices=[('parcel_created', 'Parcel Created'), ('status_update', 'Status Update'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('general', 'General')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Notification',
+                'verbose_name_plural': 'Archived Notifications',
+                'db_table': 'notifications_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['client', '-created_at'], name='notificatio_client__9bdac8_idx')],
+            },
+        ),
+    ]
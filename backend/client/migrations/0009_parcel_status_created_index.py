@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 08:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('client', '0008_notificationarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='parcel',
+            name='parcels_current_db533e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='parcel',
+            index=models.Index(fields=['current_status', '-created_at'], name='parcels_current_c75987_idx'),
+        ),
+    ]
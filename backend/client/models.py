@@ -166,7 +166,8 @@ class Parcel(models.Model):
         indexes = [
             models.Index(fields=['client', '-created_at']),
             models.Index(fields=['tracking_number']),
-            models.Index(fields=['current_status']),
+            # Admin queue: status filter, newest first (also serves plain status lookups)
+            models.Index(fields=['current_status', '-created_at']),
         ]
     
     def __str__(self):
@@ -266,8 +267,114 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['client', '-created_at']),
-            models.Index(fields=['is_read']),
+            models.Index(fields=['client', 'is_read', '-created_at']),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.client.email}"
+
+
+class NotificationCounter(models.Model):
+    """Per-client unread notification count.
+
+    Maintained with F-expression updates wherever notifications are created
+    or change read state (client/notifications.py), so unread badges never
+    need a COUNT over the notifications table.
+    """
+    
+    client = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter'
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'notification_counters'
+        verbose_name = 'Notification Counter'
+        verbose_name_plural = 'Notification Counters'
+    
+    def __str__(self):
+        return f"{self.client_id}: {self.unread_count} unread"
+
+
+class NotificationOutbox(models.Model):
+    """Pending delivery of a notification through one delivery channel.
+
+    Rows are written in the same transaction as the notification and
+    drained by the outbox workers (client/outbox.py).
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('delivered', 'Delivered'),
+        ('failed', 'Failed'),
+    ]
+    
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.CASCADE,
+        related_name='outbox_entries'
+    )
+    channel = models.CharField(max_length=50)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    claimed_by = models.CharField(max_length=64, blank=True, null=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'notification_outbox'
+        verbose_name = 'Notification Outbox Entry'
+        verbose_name_plural = 'Notification Outbox Entries'
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['claimed_by']),
+        ]
+    
+    def __str__(self):
+        return f"{self.channel} - notification {self.notification_id} ({self.status})"
+
+
+class NotificationArchive(models.Model):
+    """Read notifications moved out of the live table by the retention job.
+
+    Keeps only what the archive API returns; parcel is stored as a plain id
+    so archived rows never block parcel deletion.
+    """
+    
+    id = models.BigIntegerField(primary_key=True, help_text="Original notification id")
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notifications'
+    )
+    parcel_id = models.BigIntegerField(null=True, blank=True)
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'notifications_archive'
+        verbose_name = 'Archived Notification'
+        verbose_name_plural = 'Archived Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['client', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} - {self.client_id} (archived)"
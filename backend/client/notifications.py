@@ -0,0 +1,159 @@
+"""
+Notification creation and real-time delivery.
+
+All notifications are created through create_notification(), which also
+queues them in the delivery outbox (client/outbox.py) within the same
+transaction; the outbox workers push them to the owner's
+`notifications_<user_id>` channel group and any other configured channels.
+Unread counts live in NotificationCounter and are adjusted atomically with
+F-expressions; read-state changes also publish a delta so connected
+sockets keep their count without re-querying. Deleting an unread
+notification (directly, in bulk or by cascade from its parcel) decrements
+the counter through a post_delete receiver connected in ClientConfig.ready().
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import Notification, NotificationCounter
+
+logger = logging.getLogger(__name__)
+
+
+def notification_group_name(user_id):
+    return f'notifications_{user_id}'
+
+
+def _publish(user_id, event):
+    """Send an event to a user's notification group once the transaction commits."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    def send():
+        try:
+            async_to_sync(channel_layer.group_send)(notification_group_name(user_id), event)
+        except Exception as e:
+            # Delivery is best-effort; the row is already stored
+            logger.warning('Failed to publish notification event to user %s: %s', user_id, e)
+
+    transaction.on_commit(send)
+
+
+def create_notification(client, parcel=None, notification_type='general', title='', message=''):
+    """Create a notification and queue it for delivery."""
+    from .outbox import enqueue
+
+    with transaction.atomic():
+        notification = Notification.objects.create(
+            client=client,
+            parcel=parcel,
+            notification_type=notification_type,
+            title=title,
+            message=message
+        )
+        _adjust_unread(client.id, 1)
+        enqueue(notification)
+    return notification
+
+
+def _adjust_unread(user_id, delta):
+    """Atomically add `delta` to a client's unread counter, creating it on first use."""
+    if delta >= 0:
+        value = F('unread_count') + delta
+    else:
+        value = Greatest(F('unread_count') + delta, 0)
+    if not NotificationCounter.objects.filter(client_id=user_id).update(unread_count=value):
+        _initialize_counter(user_id)
+
+
+def _initialize_counter(user_id):
+    """Create a missing counter from the current unread rows (one COUNT, once per client)."""
+    unread = Notification.objects.filter(client_id=user_id, is_read=False).count()
+    counter, _ = NotificationCounter.objects.get_or_create(
+        client_id=user_id,
+        defaults={'unread_count': unread}
+    )
+    return counter.unread_count
+
+
+def get_unread_count(user_id):
+    """Return a client's unread notification count without scanning notifications."""
+    unread = NotificationCounter.objects.filter(client_id=user_id).values_list('unread_count', flat=True).first()
+    if unread is None:
+        unread = _initialize_counter(user_id)
+    return unread
+
+
+def sync_unread_counters(user_ids):
+    """Recompute counters for clients whose notifications changed in bulk (e.g. admin actions)."""
+    for user_id in set(user_ids):
+        unread = Notification.objects.filter(client_id=user_id, is_read=False).count()
+        NotificationCounter.objects.update_or_create(
+            client_id=user_id,
+            defaults={'unread_count': unread}
+        )
+        _publish(user_id, {'type': 'unread_count_reset', 'unread_count': unread})
+
+
+def notification_deleted(sender, instance, **kwargs):
+    """post_delete receiver: take a deleted unread notification off its client's count."""
+    if instance.is_read:
+        return
+    # Update only: recreating the counter could race a cascade deleting the client
+    NotificationCounter.objects.filter(client_id=instance.client_id).update(
+        unread_count=Greatest(F('unread_count') - 1, 0)
+    )
+    _publish(instance.client_id, {'type': 'notifications_deleted', 'count': 1})
+
+
+def set_notification_read_state(notification, is_read):
+    """Mark one notification read/unread, keeping the counter and sockets in step.
+
+    Uses a conditional UPDATE of the is_read column only, so repeated calls
+    are cheap no-ops. Returns True if the state changed.
+    """
+    with transaction.atomic():
+        changed = Notification.objects.filter(
+            id=notification.id,
+            is_read=not is_read
+        ).update(is_read=is_read)
+        if changed:
+            _adjust_unread(notification.client_id, -changed if is_read else changed)
+    notification.is_read = is_read
+    if changed:
+        _publish(notification.client_id, {
+            'type': 'notifications_read' if is_read else 'notifications_unread',
+            'count': changed,
+        })
+    return bool(changed)
+
+
+def mark_notifications_read(user_id, ids=None):
+    """Mark a client's unread notifications as read, all of them or only `ids`.
+
+    Returns the number of notifications that changed state.
+    """
+    queryset = Notification.objects.filter(client_id=user_id, is_read=False)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+
+    with transaction.atomic():
+        updated = queryset.update(is_read=True)
+        if ids is None:
+            if not NotificationCounter.objects.filter(client_id=user_id).update(unread_count=0):
+                _initialize_counter(user_id)
+        elif updated:
+            _adjust_unread(user_id, -updated)
+
+    if updated or ids is None:
+        _publish(user_id, {
+            'type': 'notifications_read',
+            'count': updated,
+            'all_read': ids is None,
+        })
+    return updated
@@ -0,0 +1,191 @@
+"""
+Transactional outbox for notification delivery.
+
+create_notification() writes one NotificationOutbox row per configured
+channel in the same transaction as the notification itself, so request
+handlers never wait on delivery. Workers claim due rows in batches with a
+conditional UPDATE (portable across SQLite and Postgres), deliver them,
+and reschedule failures with exponential backoff until MAX_ATTEMPTS.
+Rows left in 'processing' by a crashed worker are reclaimed after
+CLAIM_TIMEOUT_SECONDS.
+"""
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CHANNELS': ['client.delivery.WebSocketChannel'],
+    'BATCH_SIZE': 100,
+    'WORKERS': 2,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE_SECONDS': 5,
+    'BACKOFF_MAX_SECONDS': 3600,
+    'CLAIM_TIMEOUT_SECONDS': 300,
+    'RUN_IN_PROCESS': True,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'NOTIFICATION_OUTBOX', {}).get(name, DEFAULTS[name])
+
+
+_channels = None
+
+# Set after commit of newly queued rows so in-process workers skip the poll wait
+_wakeup = threading.Event()
+
+
+def get_channels():
+    """Return {name: channel instance} for the configured delivery channels."""
+    global _channels
+    if _channels is None:
+        instances = [import_string(path)() for path in get_setting('CHANNELS')]
+        _channels = {channel.name: channel for channel in instances}
+    return _channels
+
+
+def set_channels(channels):
+    """Replace the configured channels (e.g. with a FakeChannel in tests)."""
+    global _channels
+    _channels = {channel.name: channel for channel in channels}
+
+
+def enqueue(notification):
+    """Queue a notification for delivery on every configured channel."""
+    now = timezone.now()
+    NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(notification=notification, channel=name, next_attempt_at=now)
+        for name in get_channels()
+    ])
+    transaction.on_commit(_wakeup.set)
+
+
+def backoff_delay(attempts):
+    delay = get_setting('BACKOFF_BASE_SECONDS') * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(delay, get_setting('BACKOFF_MAX_SECONDS')))
+
+
+def claim_batch(worker_id, batch_size=None):
+    """Atomically claim up to batch_size due rows for worker_id and return them."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=get_setting('CLAIM_TIMEOUT_SECONDS'))
+    candidate_ids = list(
+        NotificationOutbox.objects.filter(
+            Q(status='pending', next_attempt_at__lte=now) |
+            Q(status='processing', claimed_at__lt=stale)
+        ).order_by('next_attempt_at').values_list('id', flat=True)[:batch_size or get_setting('BATCH_SIZE')]
+    )
+    if not candidate_ids:
+        return []
+
+    # Only rows still unclaimed (or stale) when the UPDATE runs are ours
+    NotificationOutbox.objects.filter(id__in=candidate_ids).filter(
+        Q(status='pending') | Q(status='processing', claimed_at__lt=stale)
+    ).update(status='processing', claimed_by=worker_id, claimed_at=now)
+
+    return list(
+        NotificationOutbox.objects.filter(
+            id__in=candidate_ids,
+            status='processing',
+            claimed_by=worker_id
+        ).select_related('notification', 'notification__client', 'notification__parcel')
+    )
+
+
+def process_batch(worker_id, batch_size=None):
+    """Claim and deliver one batch. Returns the number of rows handled."""
+    entries = claim_batch(worker_id, batch_size)
+    channels = get_channels()
+    delivered_ids = []
+    for entry in entries:
+        channel = channels.get(entry.channel)
+        try:
+            if channel is None:
+                raise LookupError(f'Unknown delivery channel {entry.channel!r}')
+            channel.deliver(entry.notification)
+        except Exception as e:
+            entry.attempts += 1
+            entry.last_error = str(e)[:1000]
+            entry.claimed_by = None
+            if entry.attempts >= get_setting('MAX_ATTEMPTS'):
+                entry.status = 'failed'
+            else:
+                entry.status = 'pending'
+                entry.next_attempt_at = timezone.now() + backoff_delay(entry.attempts)
+            entry.save(update_fields=['attempts', 'last_error', 'claimed_by', 'status', 'next_attempt_at'])
+        else:
+            delivered_ids.append(entry.id)
+
+    if delivered_ids:
+        NotificationOutbox.objects.filter(id__in=delivered_ids).update(
+            status='delivered',
+            delivered_at=timezone.now(),
+            claimed_by=None,
+            attempts=F('attempts') + 1
+        )
+    return len(entries)
+
+
+class OutboxWorkerPool:
+    """Pool of threads draining the outbox."""
+
+    def __init__(self, workers=None, batch_size=None, poll_interval=None):
+        self.workers = workers or get_setting('WORKERS')
+        self.batch_size = batch_size or get_setting('BATCH_SIZE')
+        self.poll_interval = poll_interval if poll_interval is not None else get_setting('POLL_INTERVAL')
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f'notification-outbox-{index}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        worker_id = f'{threading.current_thread().name}-{uuid.uuid4().hex[:8]}'
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                handled = process_batch(worker_id, self.batch_size)
+            except Exception:
+                logger.exception('Notification outbox worker %s failed', worker_id)
+                handled = 0
+            # Keep draining while there is a backlog, otherwise poll
+            if handled < self.batch_size and _wakeup.wait(self.poll_interval):
+                _wakeup.clear()
+        close_old_connections()
+
+
+_pool = None
+
+
+def start_in_process_workers():
+    """Start the outbox pool inside the ASGI server process (once)."""
+    global _pool
+    if _pool is None and get_setting('RUN_IN_PROCESS'):
+        _pool = OutboxWorkerPool()
+        _pool.start()
+    return _pool
@@ -0,0 +1,170 @@
+"""
+Column-projected serialization for read-only list endpoints.
+
+A ModelSerializer's list output is fully determined by a handful of
+columns, yet DRF builds a model instance per row and walks every field's
+get_attribute/to_representation. Projection derives a column plan from the
+serializer's own fields instead:
+
+- `source='client.full_name'` becomes the lookup `client__full_name`;
+- `source='get_<field>_display'` reads <field> and maps it through the
+  field's choices;
+- SerializerMethodFields must be declared in `Meta.projections`
+  ({field name: lookup yielding the method's return value}) or the
+  plan is rejected.
+
+Rows are fetched with values_list() and turned into dicts by converters
+that are precomputed per field. Decimals and datetimes are formatted
+exactly as DRF formats them and plain values pass through, so the JSON
+is byte-identical to `serializer_class(queryset, many=True).data`.
+Unknown field types fall back to the field's own to_representation.
+
+    projection = get_projection(DriverTaskSerializer)
+    return Response(projection.data(parcels))
+"""
+import decimal
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.encoding import force_str
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+_DISPLAY_SOURCE = re.compile(r'^get_(\w+)_display$')
+
+# Fields whose to_representation returns database values unchanged
+_PASSTHROUGH = (
+    drf_fields.CharField,
+    drf_fields.IntegerField,
+    drf_fields.BooleanField,
+    drf_fields.ChoiceField,
+    relations.PrimaryKeyRelatedField,
+)
+
+_projections = {}
+
+
+def get_projection(serializer_class):
+    projection = _projections.get(serializer_class)
+    if projection is None:
+        projection = _projections[serializer_class] = Projection(serializer_class)
+    return projection
+
+
+class Projection:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        serializer = serializer_class()
+        meta = serializer_class.Meta
+        model = meta.model
+        declared = getattr(meta, 'projections', {})
+
+        self.columns = []
+        # (field name, column index, kind, field, extra)
+        self.plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            kind, extra = 'value', None
+            if name in declared:
+                kind, lookup = 'declared', declared[name]
+            elif isinstance(field, drf_fields.SerializerMethodField) or field.source == '*':
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} can't be projected; add it to Meta.projections"
+                )
+            else:
+                attrs = field.source_attrs
+                match = _DISPLAY_SOURCE.match(attrs[-1])
+                if match and model._meta.get_field(match.group(1)).choices:
+                    kind, extra = 'display', model._meta.get_field(match.group(1))
+                    attrs = attrs[:-1] + [match.group(1)]
+                lookup = '__'.join(attrs)
+
+            if lookup not in self.columns:
+                self.columns.append(lookup)
+            self.plan.append((name, self.columns.index(lookup), kind, field, extra))
+
+    def converters(self):
+        """Per-field (name, index, converter or None); built per call for the active timezone/language."""
+        return [(name, index, _converter(kind, field, extra)) for name, index, kind, field, extra in self.plan]
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def to_representation(self, rows):
+        converters = self.converters()
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert in converters:
+                value = row[index]
+                item[name] = value if value is None or convert is None else convert(value)
+            data.append(item)
+        return data
+
+    def data(self, queryset):
+        return self.to_representation(self.rows(queryset))
+
+
+def _converter(kind, field, extra):
+    if kind == 'declared':
+        # The lookup yields the final value, e.g. what a SerializerMethodField returns
+        return None
+    if kind == 'display':
+        labels = {value: force_str(label, strings_only=True) for value, label in extra.flatchoices}
+        represent = field.to_representation
+        return lambda value: represent(labels.get(value, value))
+    if isinstance(field, drf_fields.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, drf_fields.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, _PASSTHROUGH):
+        return None
+    return field.to_representation
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.decimal_places is None or field.normalize_output or field.localize:
+        return field.to_representation
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    zone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or zone is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        text = value.astimezone(zone).isoformat()
+        if text.endswith('+00:00'):
+            text = text[:-6] + 'Z'
+        return text
+    return convert
+
+
+class ProjectedListMixin:
+    """ListAPIView mixin serving list() through the serializer's projection (pagination included)."""
+
+    def list(self, request, *args, **kwargs):
+        projection = get_projection(self.get_serializer_class())
+        rows = projection.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(projection.to_representation(page))
+        return Response(projection.to_representation(rows))
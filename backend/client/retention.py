@@ -0,0 +1,124 @@
+"""
+Retention for the notifications table.
+
+Read notifications older than NOTIFICATION_RETENTION['DAYS'] are deleted from
+the live table and copied into notifications_archive in bounded batches.
+Each batch is its own short transaction, keyed on the primary key so the
+job makes a single forward pass and never holds long locks. A batch is
+locked and re-checked before the delete, and only rows that were actually
+deleted are archived, so a notification marked unread mid-run is neither
+removed nor duplicated into the archive. Archived rows remain available
+through the archive API.
+
+The job runs from `manage.py archive_notifications` or, when enabled, from
+a daily scheduler thread inside the ASGI process.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'DAYS': 90,
+    'BATCH_SIZE': 500,
+    'PAUSE_SECONDS': 0.05,
+    'SCHEDULE_ENABLED': False,
+    'INTERVAL_HOURS': 24,
+}
+
+ARCHIVE_FIELDS = ['id', 'client_id', 'parcel_id', 'notification_type', 'title', 'message', 'created_at']
+
+
+def get_setting(name):
+    return getattr(settings, 'NOTIFICATION_RETENTION', {}).get(name, DEFAULTS[name])
+
+
+def archive_read_notifications(days=None, batch_size=None, pause=None, max_batches=None, dry_run=False):
+    """Archive read notifications older than `days`. Returns the number archived."""
+    days = days if days is not None else get_setting('DAYS')
+    batch_size = batch_size or get_setting('BATCH_SIZE')
+    pause = pause if pause is not None else get_setting('PAUSE_SECONDS')
+    cutoff = timezone.now() - timedelta(days=days)
+
+    candidates = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by('id')
+    if dry_run:
+        return candidates.count()
+
+    archived = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(candidates.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        with transaction.atomic():
+            # Lock the batch and re-check is_read so a row marked unread since
+            # it was listed stays live
+            rows = list(
+                Notification.objects.select_for_update().filter(id__in=ids, is_read=True).values(*ARCHIVE_FIELDS)
+            )
+            locked_ids = [row['id'] for row in rows]
+            Notification.objects.filter(id__in=locked_ids, is_read=True).delete()
+            # Archive only what was actually deleted
+            survivors = set(Notification.objects.filter(id__in=locked_ids).values_list('id', flat=True))
+            deleted = [row for row in rows if row['id'] not in survivors]
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in deleted],
+                ignore_conflicts=True
+            )
+            archived += len(deleted)
+
+        batches += 1
+        if pause:
+            time.sleep(pause)
+    return archived
+
+
+class RetentionScheduler:
+    """Background thread running the archive job every INTERVAL_HOURS."""
+
+    def __init__(self, interval_hours=None):
+        self.interval = (interval_hours or get_setting('INTERVAL_HOURS')) * 3600
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='notification-retention', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            close_old_connections()
+            try:
+                archived = archive_read_notifications()
+                logger.info('Notification retention archived %s notification(s)', archived)
+            except Exception:
+                logger.exception('Notification retention run failed')
+            close_old_connections()
+
+
+_scheduler = None
+
+
+def start_retention_scheduler():
+    """Start the retention scheduler inside the ASGI server process (once, if enabled)."""
+    global _scheduler
+    if _scheduler is None and get_setting('SCHEDULE_ENABLED'):
+        _scheduler = RetentionScheduler()
+        _scheduler.start()
+    return _scheduler
@@ -1,10 +1,14 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Parcel, ParcelStatusHistory, Notification, PricingRule
+from .models import Parcel, ParcelStatusHistory, Notification, NotificationArchive, PricingRule
+from .distance import road_distance_km
+from .notifications import create_notification, set_notification_read_state
 from decimal import Decimal
+import logging
 import uuid
 
 Client = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class ClientProfileSerializer(serializers.ModelSerializer):
@@ -83,8 +87,8 @@ class ParcelDetailSerializer(serializers.ModelSerializer):
                     'address': last_location.address,
                     'timestamp': last_location.timestamp.isoformat(),
                 }
-        except Exception as e:
-            print(f"Error getting driver location: {e}")
+        except Exception:
+            logger.exception('Failed to load driver location for parcel %s', obj.pk)
         return None
     
     class Meta:
@@ -179,6 +183,13 @@ class ParcelCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Distance cannot be negative.")
         return value
     
+    def validate(self, attrs):
+        """Compute distance_km from coordinates instead of trusting the client."""
+        coords = [attrs.get(f) for f in ('pickup_lat', 'pickup_lng', 'drop_lat', 'drop_lng')]
+        if all(c is not None for c in coords):
+            attrs['distance_km'] = road_distance_km(*coords)
+        return attrs
+    
     def create(self, validated_data):
         """Create a new parcel with automatic price calculation and tracking number."""
         # Get the client from the request context
@@ -216,7 +227,7 @@ class ParcelCreateSerializer(serializers.ModelSerializer):
         )
         
         # Create notification for parcel creation
-        Notification.objects.create(
+        create_notification(
             client=client,
             parcel=parcel,
             notification_type='parcel_created',
@@ -273,11 +284,34 @@ class NotificationSerializer(serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         """Update notification (mainly for marking as read)."""
-        instance.is_read = validated_data.get('is_read', instance.is_read)
-        instance.save()
+        if 'is_read' in validated_data:
+            set_notification_read_state(instance, validated_data['is_read'])
         return instance
 
 
+class NotificationArchiveSerializer(serializers.ModelSerializer):
+    """Serializer for archived (read, expired) notifications."""
+    
+    notification_type_display = serializers.CharField(
+        source='get_notification_type_display',
+        read_only=True
+    )
+    
+    class Meta:
+        model = NotificationArchive
+        fields = [
+            'id',
+            'parcel_id',
+            'notification_type',
+            'notification_type_display',
+            'title',
+            'message',
+            'created_at',
+            'archived_at'
+        ]
+        read_only_fields = fields
+
+
 class PricingRuleSerializer(serializers.ModelSerializer):
     """Serializer for pricing rules (read-only for clients)."""
     
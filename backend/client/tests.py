@@ -1,3 +1,764 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import io
+import uuid
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from admin_dashboard.benchmarks import SERIALIZERS
+from admin_dashboard.seeding import seed_fleet
+from config.jsoncodec import FastJSONParser, FastJSONRenderer, available_backends, get_codec
+
+from . import delivery, outbox, retention
+from .cache import PRICING_RULES_SCOPE, VERSION_PREFIX, bump, get_versions
+from .consumers import NotificationConsumer
+from .delivery import FakeChannel, WebSocketChannel
+from .distance import (
+    _cached_road_distance_km, clear_distance_cache, haversine_km, haversine_km_many, road_distance_km, road_factor,
+)
+from .models import (
+    Notification, NotificationArchive, NotificationCounter, NotificationOutbox, Parcel, ParcelStatusHistory,
+    PricingRule,
+)
+from .notifications import (
+    create_notification, get_unread_count, mark_notifications_read, notification_group_name,
+    set_notification_read_state, sync_unread_counters,
+)
+from .projection import Projection, get_projection
+from .retention import archive_read_notifications
+from .serializers import ParcelDetailSerializer, ParcelStatusHistorySerializer
+
+User = get_user_model()
+
+
+def make_client(index=1):
+    return User.objects.create_user(
+        email=f'client{index}@test.com',
+        full_name=f'Test Client {index}',
+        phone_number=f'90000000{index:02d}',
+        password='testpass123'
+    )
+
+
+def make_parcel(client, index=1, **fields):
+    values = {
+        'tracking_number': f'TST{index:06d}',
+        'from_location': 'Shivajinagar, Pune',
+        'to_location': 'Kothrud, Pune',
+        'pickup_lat': Decimal('18.5308000'),
+        'pickup_lng': Decimal('73.8475000'),
+        'drop_lat': Decimal('18.5074000'),
+        'drop_lng': Decimal('73.8077000'),
+        'weight': Decimal('2.50'),
+        'height': Decimal('10.00'),
+        'width': Decimal('20.00'),
+        'breadth': Decimal('30.00'),
+        'price': Decimal('150.00'),
+        'distance_km': Decimal('4.92'),
+    }
+    values.update(fields)
+    return Parcel.objects.create(client=client, **values)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(outbox, '_channels', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.channel = FakeChannel()
+        outbox.set_channels([self.channel])
+        self.client_user = make_client()
+
+    def notify(self):
+        return create_notification(self.client_user, title='Parcel update', message='Out for delivery')
+
+    def make_due(self):
+        NotificationOutbox.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_enqueue_writes_one_pending_row_per_channel(self):
+        notification = self.notify()
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.notification_id, notification.id)
+        self.assertEqual(entry.channel, 'fake')
+        self.assertEqual(entry.status, 'pending')
+
+    def test_claimed_rows_belong_to_one_worker(self):
+        self.notify()
+        claimed = outbox.claim_batch('worker-a')
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claimed[0].status, 'processing')
+        self.assertEqual(outbox.claim_batch('worker-b'), [])
+
+    def test_stale_claims_are_reclaimed(self):
+        self.notify()
+        outbox.claim_batch('worker-a')
+        NotificationOutbox.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        claimed = outbox.claim_batch('worker-b')
+        self.assertEqual([entry.claimed_by for entry in claimed], ['worker-b'])
+
+    def test_process_batch_delivers(self):
+        notification = self.notify()
+        self.assertEqual(outbox.process_batch('worker-a'), 1)
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, 'delivered')
+        self.assertEqual(entry.attempts, 1)
+        self.assertIsNotNone(entry.delivered_at)
+        self.assertIsNone(entry.claimed_by)
+        self.assertEqual(self.channel.delivered, [notification.id])
+        self.assertEqual(outbox.process_batch('worker-a'), 0)
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        with override_settings(NOTIFICATION_OUTBOX={'BACKOFF_BASE_SECONDS': 5, 'BACKOFF_MAX_SECONDS': 30}):
+            delays = [outbox.backoff_delay(attempts).total_seconds() for attempts in range(1, 6)]
+        self.assertEqual(delays, [5, 10, 20, 30, 30])
+
+    def test_failed_delivery_is_retried_after_backoff(self):
+        self.channel.fail_times = 1
+        notification = self.notify()
+
+        before = timezone.now()
+        outbox.process_batch('worker-a')
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, 'pending')
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn('Simulated failure 1', entry.last_error)
+        self.assertGreaterEqual(entry.next_attempt_at, before + outbox.backoff_delay(1))
+
+        # Not due yet
+        self.assertEqual(outbox.process_batch('worker-a'), 0)
+
+        self.make_due()
+        self.assertEqual(outbox.process_batch('worker-a'), 1)
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'delivered')
+        self.assertEqual(entry.attempts, 2)
+        self.assertEqual(self.channel.delivered, [notification.id])
+
+    @override_settings(NOTIFICATION_OUTBOX={'MAX_ATTEMPTS': 3})
+    def test_rows_are_dead_lettered_after_max_attempts(self):
+        self.channel.fail_times = 10
+        self.notify()
+
+        for _ in range(3):
+            self.make_due()
+            outbox.process_batch('worker-a')
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, 'failed')
+        self.assertEqual(entry.attempts, 3)
+        self.assertEqual(self.channel.delivered, [])
+
+        self.make_due()
+        self.assertEqual(outbox.process_batch('worker-a'), 0)
+        self.assertEqual(self.channel.attempts, 3)
+
+    def test_unknown_channel_is_recorded_as_failure(self):
+        self.notify()
+        NotificationOutbox.objects.update(channel='carrier-pigeon')
+        outbox.process_batch('worker-a')
+
+        entry = NotificationOutbox.objects.get()
+        self.assertEqual(entry.status, 'pending')
+        self.assertIn('carrier-pigeon', entry.last_error)
+        self.assertTrue(Notification.objects.exists())
+
+    def test_worker_command_drains_once(self):
+        self.notify()
+        call_command('run_notification_workers', '--once', stdout=mock.Mock())
+        self.assertEqual(NotificationOutbox.objects.get().status, 'delivered')
+
+    def test_worker_command_refuses_websocket_delivery_over_in_memory_layer(self):
+        outbox.set_channels([WebSocketChannel()])
+        with self.assertRaises(CommandError):
+            call_command('run_notification_workers', '--once')
+
+
+class ServerLoopSendTests(SimpleTestCase):
+    def tearDown(self):
+        delivery.bind_server_loop(None)
+
+    def test_worker_thread_send_runs_on_the_server_loop(self):
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            delivery.bind_server_loop(loop)
+            layer = get_channel_layer()
+            channel = await layer.new_channel()
+            await layer.group_add('notifications_loop_test', channel)
+            await loop.run_in_executor(None, delivery.group_send, 'notifications_loop_test', {'type': 'ping'})
+            return await asyncio.wait_for(layer.receive(channel), 1)
+
+        self.assertEqual(asyncio.run(scenario()), {'type': 'ping'})
+
+    def test_binding_runs_on_start_once_on_the_first_call(self):
+        on_start = mock.Mock()
+        scopes = []
+
+        async def application(scope, receive, send):
+            scopes.append(scope)
+
+        binding = delivery.ServerLoopBinding(application, on_start=on_start)
+        on_start.assert_not_called()
+
+        async def scenario():
+            await binding({'type': 'http'}, None, None)
+            await binding({'type': 'websocket'}, None, None)
+
+        asyncio.run(scenario())
+        on_start.assert_called_once_with()
+        self.assertEqual(len(scopes), 2)
+
+    def test_importing_the_asgi_module_starts_no_threads(self):
+        import config.asgi
+
+        with mock.patch.object(outbox, 'OutboxWorkerPool') as pool, \
+                mock.patch.object(retention, 'RetentionScheduler') as scheduler:
+            importlib.reload(config.asgi)
+
+        pool.assert_not_called()
+        scheduler.assert_not_called()
+        self.assertIs(config.asgi.application.on_start, config.asgi.start_background_services)
+
+
+ROAD_FACTORS = [(5, 1.4), (50, 1.3), (None, 1.2)]
+
+
+class DistanceTests(SimpleTestCase):
+    def setUp(self):
+        clear_distance_cache()
+        self.addCleanup(clear_distance_cache)
+
+    def test_haversine_one_degree_of_latitude(self):
+        self.assertAlmostEqual(haversine_km(0, 0, 1, 0), 111.195, places=3)
+        self.assertEqual(haversine_km(18.52, 73.85, 18.52, 73.85), 0.0)
+
+    def test_batch_matches_single_segments(self):
+        segments = [(18.5308, 73.8475, 18.5074, 73.8077), (18.52, 73.85, 19.076, 72.8777)]
+        self.assertEqual(haversine_km_many(segments), [haversine_km(*segment) for segment in segments])
+
+    def test_accepts_decimals(self):
+        self.assertEqual(
+            haversine_km(Decimal('18.5308'), Decimal('73.8475'), Decimal('18.5074'), Decimal('73.8077')),
+            haversine_km(18.5308, 73.8475, 18.5074, 73.8077)
+        )
+
+    @override_settings(DISTANCE_ROAD_FACTORS=ROAD_FACTORS)
+    def test_road_factor_bands(self):
+        self.assertEqual(road_factor(0.5), 1.4)
+        self.assertEqual(road_factor(5), 1.4)
+        self.assertEqual(road_factor(5.01), 1.3)
+        self.assertEqual(road_factor(50), 1.3)
+        self.assertEqual(road_factor(500), 1.2)
+
+    @override_settings(DISTANCE_ROAD_FACTORS=[(5, 1.4)])
+    def test_road_factor_without_catch_all_band(self):
+        self.assertEqual(road_factor(20), 1.0)
+
+    @override_settings(DISTANCE_ROAD_FACTORS=[])
+    def test_road_distance_is_quantized_haversine_without_factors(self):
+        distance = road_distance_km(18.5308, 73.8475, 18.5074, 73.8077)
+        self.assertEqual(distance, Decimal(str(haversine_km(18.5308, 73.8475, 18.5074, 73.8077))).quantize(Decimal('0.01')))
+        self.assertEqual(distance.as_tuple().exponent, -2)
+
+    def test_road_distance_applies_the_band_factor(self):
+        with override_settings(DISTANCE_ROAD_FACTORS=[]):
+            straight = road_distance_km(18.52, 73.85, 19.076, 72.8777)
+        clear_distance_cache()
+        with override_settings(DISTANCE_ROAD_FACTORS=ROAD_FACTORS):
+            scaled = road_distance_km(18.52, 73.85, 19.076, 72.8777)
+        self.assertGreater(straight, 50)
+        self.assertAlmostEqual(float(scaled), float(straight) * 1.2, delta=0.01)
+
+    @override_settings(DISTANCE_ROAD_FACTORS=[], DISTANCE_COORD_PRECISION=4)
+    def test_nearby_requests_share_a_lane(self):
+        road_distance_km(18.53081, 73.84751, 18.5074, 73.8077)
+        road_distance_km(18.53084, 73.84749, 18.5074, 73.8077)
+        self.assertEqual(_cached_road_distance_km.cache_info().misses, 1)
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.client_user = make_client()
+        self.parcel = make_parcel(self.client_user)
+
+    def notify(self, parcel=None):
+        return create_notification(self.client_user, parcel=parcel, title='Parcel update')
+
+    def counter(self):
+        return NotificationCounter.objects.get(client=self.client_user).unread_count
+
+    def test_create_increments(self):
+        for _ in range(3):
+            self.notify()
+        self.assertEqual(self.counter(), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.client_user.id), 3)
+
+    def test_missing_counter_is_initialized_from_unread_rows(self):
+        self.notify()
+        self.notify()
+        NotificationCounter.objects.all().delete()
+        self.assertEqual(get_unread_count(self.client_user.id), 2)
+        self.assertEqual(self.counter(), 2)
+
+    def test_read_state_changes_are_idempotent(self):
+        notification = self.notify()
+        self.notify()
+
+        self.assertTrue(set_notification_read_state(notification, True))
+        self.assertFalse(set_notification_read_state(notification, True))
+        self.assertEqual(self.counter(), 1)
+
+        self.assertTrue(set_notification_read_state(notification, False))
+        self.assertEqual(self.counter(), 2)
+
+    def test_counter_never_goes_negative(self):
+        notification = self.notify()
+        NotificationCounter.objects.update(unread_count=0)
+        set_notification_read_state(notification, True)
+        self.assertEqual(self.counter(), 0)
+
+    def test_mark_selected_and_all_read(self):
+        notifications = [self.notify() for _ in range(4)]
+        self.assertEqual(mark_notifications_read(self.client_user.id, ids=[n.id for n in notifications[:2]]), 2)
+        self.assertEqual(self.counter(), 2)
+        self.assertEqual(mark_notifications_read(self.client_user.id), 2)
+        self.assertEqual(self.counter(), 0)
+
+    def test_deleting_unread_notifications_decrements(self):
+        read = self.notify()
+        set_notification_read_state(read, True)
+        unread = self.notify()
+        self.notify()
+
+        read.delete()
+        self.assertEqual(self.counter(), 2)
+        unread.delete()
+        self.assertEqual(self.counter(), 1)
+        Notification.objects.all().delete()
+        self.assertEqual(self.counter(), 0)
+
+    def test_parcel_cascade_decrements(self):
+        self.notify(parcel=self.parcel)
+        self.notify(parcel=self.parcel)
+        self.notify()
+        self.parcel.delete()
+        self.assertEqual(self.counter(), 1)
+
+    def test_deleting_the_client_leaves_no_counter(self):
+        self.notify()
+        self.client_user.delete()
+        self.assertFalse(NotificationCounter.objects.exists())
+
+    def test_sync_recomputes_after_bulk_updates(self):
+        for _ in range(3):
+            self.notify()
+        Notification.objects.filter(client=self.client_user).update(is_read=True)
+        self.assertEqual(self.counter(), 3)
+        sync_unread_counters([self.client_user.id, self.client_user.id])
+        self.assertEqual(self.counter(), 0)
+
+
+class NotificationConsumerTests(TestCase):
+    def setUp(self):
+        self.client_user = make_client()
+        for _ in range(2):
+            create_notification(self.client_user, title='Parcel update')
+        self.group = notification_group_name(self.client_user.id)
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        communicator.scope['user'] = self.client_user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def publish(self, event):
+        await get_channel_layer().group_send(self.group, event)
+
+    def created_event(self, is_read=False):
+        return {'type': 'notification_created', 'notification': {'id': 0, 'title': 'New', 'is_read': is_read}}
+
+    async def test_initial_count_and_increments(self):
+        communicator = await self.connect()
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'unread_count': 2})
+
+        await self.publish(self.created_event())
+        message = await communicator.receive_json_from()
+        self.assertEqual((message['type'], message['unread_count']), ('notification', 3))
+
+        await self.publish(self.created_event(is_read=True))
+        self.assertEqual((await communicator.receive_json_from())['unread_count'], 3)
+
+        await self.publish({'type': 'notifications_read', 'count': 2})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'unread_count': 1})
+
+        await self.publish({'type': 'notifications_read', 'count': 0, 'all_read': True})
+        self.assertEqual((await communicator.receive_json_from())['unread_count'], 0)
+        await communicator.disconnect()
+
+    async def test_notification_created_while_connecting_is_counted_once(self):
+        def count_after_concurrent_notification(user_id):
+            # Another request creates a notification and its event is published
+            create_notification(self.client_user, title='Parcel update')
+            async_to_sync(self.publish)(self.created_event())
+            return get_unread_count(user_id)
+
+        with mock.patch('client.consumers.get_unread_count', side_effect=count_after_concurrent_notification):
+            communicator = await self.connect()
+
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'unread_count': 3})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_anonymous_connection_is_rejected(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.client_user = make_client()
+        self.old = timezone.now() - timedelta(days=120)
+
+    def notification(self, is_read=True, created_at=None, client=None):
+        notification = Notification.objects.create(
+            client=client or self.client_user, title='Parcel update', message='Delivered', is_read=is_read
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at or self.old)
+        return notification
+
+    def test_archives_only_old_read_notifications(self):
+        archived = self.notification()
+        unread = self.notification(is_read=False)
+        recent = self.notification(created_at=timezone.now())
+
+        self.assertEqual(archive_read_notifications(days=90, pause=0), 1)
+
+        self.assertEqual(list(NotificationArchive.objects.values_list('id', flat=True)), [archived.id])
+        self.assertEqual(
+            set(Notification.objects.values_list('id', flat=True)), {unread.id, recent.id}
+        )
+        row = NotificationArchive.objects.get()
+        self.assertEqual((row.client_id, row.title, row.created_at), (self.client_user.id, 'Parcel update', self.old))
+
+    def test_batches_and_max_batches(self):
+        for _ in range(5):
+            self.notification()
+
+        self.assertEqual(archive_read_notifications(days=90, batch_size=2, pause=0, max_batches=2), 4)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(archive_read_notifications(days=90, batch_size=2, pause=0), 1)
+        self.assertEqual(NotificationArchive.objects.count(), 5)
+
+    def test_dry_run_changes_nothing(self):
+        self.notification()
+        self.notification()
+
+        self.assertEqual(archive_read_notifications(days=90, dry_run=True), 2)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    def test_notification_marked_unread_mid_run_stays_live_and_unarchived(self):
+        archived = self.notification()
+        reopened = self.notification()
+        atomic = retention.transaction.atomic
+
+        def reader_marks_unread_first(*args, **kwargs):
+            Notification.objects.filter(pk=reopened.pk).update(is_read=False)
+            return atomic(*args, **kwargs)
+
+        with mock.patch.object(retention.transaction, 'atomic', side_effect=reader_marks_unread_first):
+            self.assertEqual(archive_read_notifications(days=90, pause=0), 1)
+
+        self.assertEqual(list(NotificationArchive.objects.values_list('id', flat=True)), [archived.id])
+        self.assertTrue(Notification.objects.filter(pk=reopened.pk, is_read=False).exists())
+
+    def test_management_command(self):
+        self.notification()
+        self.notification()
+        out = io.StringIO()
+
+        call_command('archive_notifications', '--days', '90', '--pause', '0', '--dry-run', stdout=out)
+        self.assertIn('2 notification(s) would be archived', out.getvalue())
+        self.assertEqual(Notification.objects.count(), 2)
+
+        call_command('archive_notifications', '--days', '90', '--pause', '0', '--batch-size', '1', stdout=out)
+        self.assertIn('Archived 2 notification(s)', out.getvalue())
+        self.assertEqual(NotificationArchive.objects.count(), 2)
+
+    def test_archive_endpoint_lists_only_own_notifications(self):
+        other = make_client(2)
+        own = self.notification()
+        self.notification(client=other)
+        archive_read_notifications(days=90, pause=0)
+
+        api = APIClient()
+        self.assertEqual(api.get('/api/client/notifications/archived/').status_code, 401)
+        api.force_authenticate(self.client_user)
+        response = api.get('/api/client/notifications/archived/', {'limit': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual([row['id'] for row in response.json()['results']], [own.id])
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.client_user = make_client()
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def add_rule(self, min_weight):
+        return PricingRule.objects.create(
+            min_weight=min_weight, max_weight=min_weight + 5, base_price=50, price_per_km=10
+        )
+
+    def test_bump_applies_on_commit(self):
+        before = get_versions([PRICING_RULES_SCOPE])[PRICING_RULES_SCOPE]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump(PRICING_RULES_SCOPE)
+            self.assertEqual(get_versions([PRICING_RULES_SCOPE])[PRICING_RULES_SCOPE], before)
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(get_versions([PRICING_RULES_SCOPE])[PRICING_RULES_SCOPE], before + 1)
+
+    def test_bump_recreates_an_evicted_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bump(PRICING_RULES_SCOPE)
+        self.assertIsNotNone(caches['default'].get(VERSION_PREFIX + PRICING_RULES_SCOPE))
+
+    def test_cached_until_a_write_bumps_the_scope(self):
+        self.add_rule(1)
+        first = self.api.get('/api/client/pricing-rules/')
+        self.assertEqual(len(first.json()), 1)
+
+        # A write that doesn't bump keeps serving the cached payload
+        self.add_rule(10)
+        self.assertEqual(self.api.get('/api/client/pricing-rules/').json(), first.json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump(PRICING_RULES_SCOPE)
+        second = self.api.get('/api/client/pricing-rules/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()), 2)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        third = self.api.get('/api/client/pricing-rules/', HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, 304)
+        self.assertEqual(third.content, b'')
+
+    def test_profile_update_invalidates_cached_parcel_detail(self):
+        parcel = make_parcel(self.client_user)
+        url = f'/api/client/parcels/{parcel.id}/'
+        etag = self.api.get(url)['ETag']
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.patch('/api/client/profile/', {'full_name': 'Renamed Client'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class ConditionalParcelReadTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.client_user = make_client()
+        self.parcel = make_parcel(self.client_user)
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+        self.detail_url = f'/api/client/parcels/{self.parcel.id}/'
+        self.track_url = f'/api/client/parcels/{self.parcel.id}/track/'
+
+    def test_detail_matching_etag_returns_304_before_serializing(self):
+        first = self.api.get(self.detail_url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with mock.patch.object(ParcelDetailSerializer, 'to_representation') as to_representation, \
+                self.assertNumQueries(1):
+            response = self.api.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        to_representation.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_detail_weak_and_listed_etags_match(self):
+        etag = self.api.get(self.detail_url)['ETag']
+        response = self.api.get(self.detail_url, HTTP_IF_NONE_MATCH=f'"stale", W/{etag}')
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_detail_is_served_from_cache(self):
+        first = self.api.get(self.detail_url)
+        with mock.patch.object(ParcelDetailSerializer, 'to_representation') as to_representation:
+            second = self.api.get(self.detail_url)
+        to_representation.assert_not_called()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+
+    def test_status_change_changes_the_etag(self):
+        etag = self.api.get(self.detail_url)['ETag']
+        ParcelStatusHistory.objects.create(parcel=self.parcel, status='assigned')
+
+        response = self.api.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_tracking_matching_etag_returns_304_before_serializing(self):
+        ParcelStatusHistory.objects.create(parcel=self.parcel, status='requested')
+        etag = self.api.get(self.track_url)['ETag']
+
+        with mock.patch.object(ParcelStatusHistorySerializer, 'to_representation') as to_representation:
+            response = self.api.get(self.track_url, HTTP_IF_NONE_MATCH=etag)
+
+        to_representation.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_clients_get_404_not_304(self):
+        etag = self.api.get(self.detail_url)['ETag']
+        other = APIClient()
+        other.force_authenticate(make_client(2))
+        response = other.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+
+
+class ProjectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_fleet(clients=6, drivers=3, parcels=60, locations=60, seed=7)
+        # Nulls and unusual decimals exercise the converters' edge cases
+        Parcel.objects.filter(id=Parcel.objects.order_by('id').values('id')[:1]).update(
+            description=None, pickup_lat=None, drop_lng=None, price=Decimal('1234567.5')
+        )
+
+    def test_projection_matches_serializer_output(self):
+        renderer = JSONRenderer()
+        for entry in SERIALIZERS:
+            with self.subTest(serializer=entry['name']):
+                queryset = entry['queryset']()
+                expected = entry['serializer'](queryset, many=True).data
+                projected = get_projection(entry['serializer']).data(queryset.all())
+
+                self.assertGreater(len(expected), 0)
+                self.assertEqual(projected, list(expected))
+                self.assertEqual(renderer.render(projected), renderer.render(expected))
+
+    def test_projection_is_one_query(self):
+        for entry in SERIALIZERS:
+            with self.subTest(serializer=entry['name']), self.assertNumQueries(1):
+                get_projection(entry['serializer']).data(entry['queryset']())
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_projection_follows_the_active_timezone(self):
+        entry = SERIALIZERS[0]
+        queryset = entry['queryset']()
+        self.assertEqual(
+            get_projection(entry['serializer']).data(queryset.all()),
+            list(entry['serializer'](queryset, many=True).data)
+        )
+
+    def test_undeclared_method_field_is_rejected(self):
+        class UnprojectableSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Parcel
+                fields = ['id', 'label']
+
+            def get_label(self, parcel):
+                return parcel.tracking_number
+
+        with self.assertRaises(ImproperlyConfigured):
+            Projection(UnprojectableSerializer)
+
+
+class JSONCodecTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_fleet(clients=4, drivers=2, parcels=30, locations=30, seed=3)
+
+    def setUp(self):
+        self.renderer = JSONRenderer()
+        self.samples = [
+            {'name': 'Zoë 配送', 'separators': 'line\u2028para\u2029', 'quote': '"\\/</script>'},
+            [None, True, False, 0, -1, 2 ** 53, 1.5, 0.1 + 0.2, 18.5204321, '', []],
+            {
+                'at': datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+                'at_whole': datetime(2026, 3, 1, 12, 30, tzinfo=dt_timezone.utc),
+                'on': date(2026, 3, 1),
+                'clock': time(9, 15),
+                'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            },
+        ]
+
+    def test_backends_render_the_same_bytes_as_drf(self):
+        self.assertIn('stdlib', available_backends())
+        for backend in available_backends():
+            codec = get_codec(backend)
+            for sample in self.samples:
+                with self.subTest(backend=backend, sample=sample):
+                    self.assertEqual(codec.dumps(sample), self.renderer.render(sample))
+
+    def test_exponent_floats_keep_their_value(self):
+        data = [1e-7, 1.5e16, -2.5e-5]
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(get_codec(backend).loads(get_codec(backend).dumps(data)), data)
+
+    def test_backends_render_serialized_lists_like_drf(self):
+        for entry in SERIALIZERS:
+            data = entry['serializer'](entry['queryset'](), many=True).data
+            expected = self.renderer.render(data)
+            for backend in available_backends():
+                with self.subTest(backend=backend, serializer=entry['name']):
+                    self.assertEqual(get_codec(backend).dumps(data), expected)
+
+    def test_renderer_indent_matches_drf(self):
+        data = self.samples[0]
+        for backend in available_backends():
+            renderer = type('PinnedRenderer', (FastJSONRenderer,), {'json_backend': backend})()
+            for media_type in ('application/json', 'application/json; indent=2', 'application/json; indent=4'):
+                with self.subTest(backend=backend, media_type=media_type):
+                    self.assertEqual(
+                        renderer.render(data, media_type, {}),
+                        self.renderer.render(data, media_type, {})
+                    )
+
+    def test_decimals_render_like_decimal_fields(self):
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(get_codec(backend).dumps({'price': Decimal('12.50')}), b'{"price":"12.50"}')
+
+    def test_parser_round_trips(self):
+        body = self.renderer.render(self.samples[0])
+        for backend in available_backends():
+            parser = type('PinnedParser', (FastJSONParser,), {'json_backend': backend})()
+            with self.subTest(backend=backend):
+                self.assertEqual(parser.parse(io.BytesIO(body)), self.samples[0])
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_codec('yaml')
@@ -6,9 +6,11 @@ from .views import (
     ClientParcelDetailView,
     ParcelTrackingView,
     ClientNotificationListView,
+    ArchivedNotificationListView,
     NotificationDetailView,
     MarkNotificationAsReadView,
     MarkAllNotificationsAsReadView,
+    BulkMarkNotificationsAsReadView,
     PricingRuleListView,
     ParcelStatsView,
     ParcelDriverContactView,
@@ -33,9 +35,11 @@ urlpatterns = [
     
     # Notifications
     path('notifications/', ClientNotificationListView.as_view(), name='notification-list'),
+    path('notifications/archived/', ArchivedNotificationListView.as_view(), name='notification-archived-list'),
     path('notifications/<int:id>/', NotificationDetailView.as_view(), name='notification-detail'),
     path('notifications/<int:notification_id>/mark-read/', MarkNotificationAsReadView.as_view(), name='notification-mark-read'),
     path('notifications/mark-all-read/', MarkAllNotificationsAsReadView.as_view(), name='notification-mark-all-read'),
+    path('notifications/mark-read/', BulkMarkNotificationsAsReadView.as_view(), name='notification-bulk-mark-read'),
     
     # Pricing Rules
     path('pricing-rules/', PricingRuleListView.as_view(), name='pricing-rules'),
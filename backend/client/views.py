@@ -2,11 +2,13 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.http import Http404
+from django.db.models import Count, Q
 
-from .models import Parcel, ParcelStatusHistory, Notification, PricingRule
+from .models import Parcel, ParcelStatusHistory, Notification, NotificationArchive, PricingRule
 from .serializers import (
     ClientProfileSerializer,
     ParcelCreateSerializer,
@@ -14,9 +16,14 @@ from .serializers import (
     ParcelDetailSerializer,
     ParcelStatusHistorySerializer,
     NotificationSerializer,
+    NotificationArchiveSerializer,
     PricingRuleSerializer
 )
 from .permissions import IsOwnerOrReadOnly, IsParcelOwner
+from .distance import road_distance_km
+from .projection import ProjectedListMixin
+from .cache import cached_response, bump, parcel_scope, parcel_validator, client_scope, PRICING_RULES_SCOPE
+from .notifications import get_unread_count, mark_notifications_read, set_notification_read_state
 from decimal import Decimal, InvalidOperation
 
 
@@ -42,6 +49,7 @@ class ClientProfileView(APIView):
         )
         if serializer.is_valid():
             serializer.save()
+            bump(client_scope(request.user.id))
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -54,6 +62,7 @@ class ClientProfileView(APIView):
         )
         if serializer.is_valid():
             serializer.save()
+            bump(client_scope(request.user.id))
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -84,7 +93,7 @@ class CreateParcelView(generics.CreateAPIView):
         )
 
 
-class ClientParcelListView(generics.ListAPIView):
+class ClientParcelListView(ProjectedListMixin, generics.ListAPIView):
     """
     GET: List all parcels for the authenticated client
     Supports filtering by status and search by tracking number
@@ -130,6 +139,28 @@ class ClientParcelDetailView(generics.RetrieveAPIView):
             'status_history',
             'status_history__created_by'
         )
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the parcel through the versioned response cache.
+        
+        Unchanged polls (matching If-None-Match) cost one indexed lookup
+        and an empty 304.
+        """
+        parcel_id = kwargs[self.lookup_field]
+        validator = parcel_validator(parcel_id, request.user.id, with_location=True)
+        if validator is None:
+            raise Http404
+        
+        def build():
+            return super(ClientParcelDetailView, self).retrieve(request, *args, **kwargs).data
+        
+        return cached_response(
+            request,
+            f'parcel_detail:{request.user.id}:{parcel_id}',
+            [parcel_scope(parcel_id), client_scope(request.user.id)],
+            build,
+            validator=validator
+        )
 
 
 class ParcelTrackingView(APIView):
@@ -142,6 +173,19 @@ class ParcelTrackingView(APIView):
     
     def get(self, request, parcel_id):
         """Get status history for a specific parcel."""
+        validator = parcel_validator(parcel_id, request.user.id)
+        if validator is None:
+            raise Http404
+        
+        return cached_response(
+            request,
+            f'parcel_tracking:{request.user.id}:{parcel_id}',
+            [parcel_scope(parcel_id)],
+            lambda: self.build_tracking(request, parcel_id),
+            validator=validator
+        )
+    
+    def build_tracking(self, request, parcel_id):
         # Verify the parcel belongs to the authenticated user
         parcel = get_object_or_404(
             Parcel, 
@@ -159,13 +203,13 @@ class ParcelTrackingView(APIView):
         
         serializer = ParcelStatusHistorySerializer(status_history, many=True)
         
-        return Response({
+        return {
             'parcel_id': parcel.id,
             'tracking_number': parcel.tracking_number,
             'current_status': parcel.current_status,
             'status_display': parcel.get_current_status_display(),
             'status_history': serializer.data
-        }, status=status.HTTP_200_OK)
+        }
 
 
 class ClientNotificationListView(generics.ListAPIView):
@@ -190,6 +234,21 @@ class ClientNotificationListView(generics.ListAPIView):
         return queryset.select_related('parcel')
 
 
+class ArchivedNotificationListView(generics.ListAPIView):
+    """
+    GET: List archived notifications for the authenticated client
+    Paginated with ?limit=&offset= since archives can be large
+    """
+    serializer_class = NotificationArchiveSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = LimitOffsetPagination
+    
+    def get_queryset(self):
+        """Return archived notifications only for the authenticated client."""
+        return NotificationArchive.objects.filter(client=self.request.user).order_by('-created_at')
+
+
 class NotificationDetailView(generics.RetrieveUpdateAPIView):
     """
     GET: Retrieve a specific notification
@@ -224,13 +283,12 @@ class MarkNotificationAsReadView(APIView):
     def post(self, request, notification_id):
         """Mark a specific notification as read."""
         notification = get_object_or_404(
-            Notification,
+            Notification.objects.select_related('parcel'),
             id=notification_id,
             client=request.user
         )
         
-        notification.is_read = True
-        notification.save()
+        set_notification_read_state(notification, True)
         
         serializer = NotificationSerializer(notification)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -245,10 +303,7 @@ class MarkAllNotificationsAsReadView(APIView):
     
     def post(self, request):
         """Mark all notifications as read for the current user."""
-        updated_count = Notification.objects.filter(
-            client=request.user,
-            is_read=False
-        ).update(is_read=True)
+        updated_count = mark_notifications_read(request.user.id)
         
         return Response({
             'message': f'{updated_count} notification(s) marked as read',
@@ -256,6 +311,33 @@ class MarkAllNotificationsAsReadView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class BulkMarkNotificationsAsReadView(APIView):
+    """
+    POST: Mark a list of notifications as read
+    Body: {"ids": [1, 2, 3]}
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """Mark the given notifications of the current user as read."""
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        updated_count = mark_notifications_read(request.user.id, ids=ids)
+        
+        return Response({
+            'message': f'{updated_count} notification(s) marked as read',
+            'count': updated_count,
+            'unread_count': get_unread_count(request.user.id)
+        }, status=status.HTTP_200_OK)
+
+
 class PricingRuleListView(generics.ListAPIView):
     """
     GET: List all active pricing rules
@@ -268,6 +350,14 @@ class PricingRuleListView(generics.ListAPIView):
     def get_queryset(self):
         """Return only active pricing rules."""
         return PricingRule.objects.filter(is_active=True).order_by('min_weight')
+    
+    def list(self, request, *args, **kwargs):
+        """Serve the rule list through the versioned response cache (same for every client)."""
+        
+        def build():
+            return super(PricingRuleListView, self).list(request, *args, **kwargs).data
+        
+        return cached_response(request, 'pricing_rules', [PRICING_RULES_SCOPE], build)
 
 
 class CalculatePriceView(APIView):
@@ -277,6 +367,8 @@ class CalculatePriceView(APIView):
     Request params (GET) or JSON body (POST):
       - weight: required, numeric (kg)
       - distance_km: optional, numeric (km)
+      - pickup_lat/pickup_lng/drop_lat/drop_lng: optional; when all four are
+        given the distance is computed server-side and distance_km is ignored
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -288,6 +380,14 @@ class CalculatePriceView(APIView):
             raise ValueError(f"Invalid decimal for {name}")
         return dec
 
+    def _coordinate_distance(self, params):
+        names = ('pickup_lat', 'pickup_lng', 'drop_lat', 'drop_lng')
+        values = [params.get(name) for name in names]
+        if any(v in (None, '') for v in values):
+            return None
+        coords = [self._parse_decimal(v, name) for v, name in zip(values, names)]
+        return road_distance_km(*coords)
+
     def _calculate(self, weight, distance_km):
         # Create an in-memory Parcel instance and reuse its pricing logic
         parcel = Parcel(weight=weight, distance_km=distance_km)
@@ -303,7 +403,9 @@ class CalculatePriceView(APIView):
 
         try:
             weight_dec = self._parse_decimal(weight, 'weight')
-            distance_dec = self._parse_decimal(distance, 'distance_km')
+            distance_dec = self._coordinate_distance(request.query_params)
+            if distance_dec is None:
+                distance_dec = self._parse_decimal(distance, 'distance_km')
         except ValueError as exc:
             return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -329,7 +431,9 @@ class CalculatePriceView(APIView):
 
         try:
             weight_dec = self._parse_decimal(weight, 'weight')
-            distance_dec = self._parse_decimal(distance, 'distance_km')
+            distance_dec = self._coordinate_distance(request.data)
+            if distance_dec is None:
+                distance_dec = self._parse_decimal(distance, 'distance_km')
         except ValueError as exc:
             return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -356,29 +460,19 @@ class ParcelStatsView(APIView):
     
     def get(self, request):
         """Get parcel statistics for the authenticated client."""
-        parcels = Parcel.objects.filter(client=request.user)
-        
-        total_parcels = parcels.count()
-        requested = parcels.filter(current_status='requested').count()
-        accepted = parcels.filter(current_status='accepted').count()
-        assigned = parcels.filter(current_status='assigned').count()
-        in_transit = parcels.filter(current_status='in_transit').count()
-        delivered = parcels.filter(current_status='delivered').count()
-        cancelled = parcels.filter(current_status='cancelled').count()
+        # One conditional aggregate instead of a COUNT per status
+        counts = Parcel.objects.filter(client=request.user).aggregate(
+            total_parcels=Count('id'),
+            **{
+                name: Count('id', filter=Q(current_status=name))
+                for name in ('requested', 'accepted', 'assigned', 'in_transit', 'delivered', 'cancelled')
+            }
+        )
         
-        unread_notifications = Notification.objects.filter(
-            client=request.user,
-            is_read=False
-        ).count()
+        unread_notifications = get_unread_count(request.user.id)
         
         return Response({
-            'total_parcels': total_parcels,
-            'requested': requested,
-            'accepted': accepted,
-            'assigned': assigned,
-            'in_transit': in_transit,
-            'delivered': delivered,
-            'cancelled': cancelled,
+            **counts,
             'unread_notifications': unread_notifications
         }, status=status.HTTP_200_OK)
 
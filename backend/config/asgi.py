@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
+from django.urls import re_path
 from channels.security.websocket import AllowedHostsOriginValidator
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -20,18 +21,39 @@ django_asgi_app = get_asgi_application()
 
 # Import routing and JWT middleware after Django setup
 from track_driver import routing
+from client import routing as client_routing
 from track_driver.middleware import JWTAuthMiddlewareStack
+from client.delivery import ServerLoopBinding
+from client.outbox import start_in_process_workers
+from client.retention import start_retention_scheduler
 
-application = ProtocolTypeRouter({
-    # Django's ASGI application to handle traditional HTTP requests
-    "http": django_asgi_app,
+
+def start_background_services():
+    """Start the in-process background threads, each gated by its own setting.
+
+    Outbox workers drain the notification outbox unless a separate
+    `run_notification_workers` process is used (NOTIFICATION_OUTBOX['RUN_IN_PROCESS']);
+    the retention scheduler runs when NOTIFICATION_RETENTION['SCHEDULE_ENABLED'].
+    """
+    start_in_process_workers()
+    start_retention_scheduler()
+
+
+# ServerLoopBinding lets the in-process outbox workers send on the server's loop.
+# It calls start_background_services() on the server's first ASGI event, so
+# importing this module (tooling, tests) starts no threads.
+application = ServerLoopBinding(ProtocolTypeRouter({
+    # Server-Sent Events tracking streams, everything else goes to Django
+    "http": URLRouter(
+        routing.http_urlpatterns + [re_path(r'', django_asgi_app)]
+    ),
     
     # WebSocket handler with JWT authentication
     "websocket": AllowedHostsOriginValidator(
         JWTAuthMiddlewareStack(
             URLRouter(
-                routing.websocket_urlpatterns
+                routing.websocket_urlpatterns + client_routing.websocket_urlpatterns
             )
         )
     ),
-})
+}), on_start=start_background_services)
@@ -0,0 +1,105 @@
+"""
+Database profile chosen by environment variables.
+
+DB_ENGINE selects the backend; without it the project runs on SQLite in
+BASE_DIR/db.sqlite3 (DB_NAME overrides the path). A variable set to an
+empty string counts as unset and gets its default.
+
+SQLite (single node). With DB_SQLITE_TUNED on (the default):
+- journal_mode=WAL: readers keep reading while a write commits;
+- synchronous=NORMAL: fsync at WAL checkpoints instead of every commit;
+  a power loss can lose the latest commits but never corrupts the file;
+- busy timeout DB_SQLITE_TIMEOUT (seconds): a writer waits for the lock
+  instead of failing with "database is locked";
+- transactions start IMMEDIATE: an atomic() block takes the write lock
+  when it begins. Upgrading a read transaction later can fail at once,
+  whatever the timeout;
+- mmap_size DB_SQLITE_MMAP_SIZE (bytes): reads come from mapped memory.
+DB_SQLITE_TUNED=0 gives Django's stock SQLite settings, for comparison.
+WAL mode is stored in the database file header, so the first tuned
+connection rewrites the checked-in db.sqlite3 (and it stays in WAL mode);
+`git checkout backend/db.sqlite3` restores the committed copy.
+
+PostgreSQL (DB_ENGINE=django.db.backends.postgresql, psycopg 3):
+DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT set the connection.
+Connections come from psycopg's connection pool (pip install
+"psycopg[pool]"), sized by DB_POOL_MIN_SIZE and DB_POOL_MAX_SIZE, with
+DB_POOL_TIMEOUT seconds to wait for a free connection. The project is
+served over ASGI, where Django's docs advise against persistent
+connections: each request may run its sync code on a different thread,
+so per-thread persistent connections pile up instead of being reused.
+Hence the pool and CONN_MAX_AGE 0 (Django does not combine the two).
+DB_POOL=0 falls back to plain connections; DB_CONN_MAX_AGE then makes
+them persistent (health-checked before reuse), which only suits WSGI
+servers.
+
+    DB_ENGINE=django.db.backends.postgresql DB_NAME=routex \\
+        python -m daphne config.asgi:application
+"""
+import os
+
+SQLITE = 'django.db.backends.sqlite3'
+POSTGRES = 'django.db.backends.postgresql'
+
+_FALSE = ('0', 'false', 'no', 'off')
+
+
+def env_bool(environ, name, default):
+    """A boolean variable; unset or empty (e.g. `DB_POOL=` in .env) means `default`."""
+    value = (environ.get(name) or '').strip().lower()
+    if not value:
+        return default
+    return value not in _FALSE
+
+
+def env_int(environ, name, default):
+    """An integer variable; unset or empty means `default`."""
+    value = (environ.get(name) or '').strip()
+    return int(value) if value else default
+
+
+def sqlite_options(environ):
+    if not env_bool(environ, 'DB_SQLITE_TUNED', True):
+        return {}
+    return {
+        'timeout': env_int(environ, 'DB_SQLITE_TIMEOUT', 20),
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join([
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            f"PRAGMA mmap_size={env_int(environ, 'DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}",
+        ]),
+    }
+
+
+def database_from_env(base_dir, environ=None):
+    """The DATABASES['default'] entry for the profile described by the environment."""
+    environ = os.environ if environ is None else environ
+    engine = environ.get('DB_ENGINE') or SQLITE
+
+    if engine == SQLITE:
+        return {
+            'ENGINE': SQLITE,
+            'NAME': environ.get('DB_NAME') or base_dir / 'db.sqlite3',
+            'OPTIONS': sqlite_options(environ),
+        }
+
+    database = {
+        'ENGINE': engine,
+        'NAME': environ.get('DB_NAME') or 'routex',
+        'USER': environ.get('DB_USER', ''),
+        'PASSWORD': environ.get('DB_PASSWORD', ''),
+        'HOST': environ.get('DB_HOST') or 'localhost',
+        'PORT': environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': env_int(environ, 'DB_CONN_MAX_AGE', 0),
+        'CONN_HEALTH_CHECKS': env_bool(environ, 'DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {},
+    }
+    if engine == POSTGRES and env_bool(environ, 'DB_POOL', True):
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': env_int(environ, 'DB_POOL_MIN_SIZE', 2),
+            'max_size': env_int(environ, 'DB_POOL_MAX_SIZE', 20),
+            'timeout': env_int(environ, 'DB_POOL_TIMEOUT', 10),
+        }
+    return database
@@ -0,0 +1,199 @@
+"""
+Pluggable JSON encoding for REST responses and tracking sockets.
+
+A codec turns Python data into UTF-8 JSON bytes and back. Two backends:
+
+- 'orjson': uses the optional orjson package (Rust). It encodes dicts,
+  lists, datetimes and UUIDs natively and is several times faster than the
+  standard library on large lists.
+- 'stdlib': the json module with DRF's encoder.
+
+'auto' (the default) picks orjson when it is installed and falls back to
+stdlib otherwise, so the dependency stays optional.
+
+Both backends produce the same bytes as DRF's JSONRenderer:
+- compact separators, no ASCII escaping;
+- \\u2028/\\u2029 escaped;
+- datetimes as ISO 8601 with 'Z' for UTC.
+The one exception is floats that need an exponent: orjson writes 1e-7
+where the json module writes 1e-07 (same value once parsed).
+Unlike DRF's encoder, a raw Decimal is written the way a DecimalField
+renders it: a plain-notation string when COERCE_DECIMAL_TO_STRING is on
+(the default), a number otherwise. Views and consumers can therefore hand
+over Decimals and datetimes without converting them first. With orjson,
+NaN and Infinity are written as null instead of raising under STRICT_JSON.
+
+FastJSONRenderer and FastJSONParser plug the codec into DRF through
+REST_FRAMEWORK; TrackingConsumer uses get_codec() for its socket frames.
+"""
+import decimal
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'auto',
+    'TRACKING_BACKEND': None,
+}
+
+_codecs = {}
+
+
+def get_setting(name):
+    return getattr(settings, 'JSON_CODEC', {}).get(name, DEFAULTS[name])
+
+
+def encode_decimal(value):
+    """Decimal as a DecimalField renders it (already quantized by the database)."""
+    if api_settings.COERCE_DECIMAL_TO_STRING:
+        return format(value, 'f')
+    return float(value)
+
+
+# Same strict-JavaScript-subset escaping of U+2028/U+2029 as DRF's JSONRenderer
+
+def _escape_separators(text):
+    # Free for Latin-1 strings, which can't contain either character
+    return text.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+
+def _escape_separators_utf8(data):
+    if b'\xe2\x80' in data:
+        data = data.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return data
+
+
+class StdlibEncoder(encoders.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return encode_decimal(obj)
+        return super().default(obj)
+
+
+class StdlibCodec:
+    name = 'stdlib'
+
+    def __init__(self):
+        self.strict = api_settings.STRICT_JSON
+
+    def dumps(self, data, indent=None):
+        """Encode to UTF-8 bytes."""
+        separators = (',', ':') if indent is None else (',', ': ')
+        text = json.dumps(
+            data, cls=StdlibEncoder, indent=indent, ensure_ascii=False,
+            allow_nan=not self.strict, separators=separators
+        )
+        return _escape_separators(text).encode()
+
+    def dumps_str(self, data):
+        return self.dumps(data).decode()
+
+    def loads(self, data):
+        """Decode bytes or str; raises ValueError on malformed input."""
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode()
+        return json.loads(data, parse_constant=strict_constant if self.strict else None)
+
+
+class OrjsonCodec:
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImproperlyConfigured("JSON_CODEC backend 'orjson' requires the orjson package")
+        self.options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        self._encoder = StdlibEncoder()
+        self._fallback = StdlibCodec()
+
+    def _default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return encode_decimal(obj)
+        # Lazy strings, timedeltas, querysets, ... as DRF encodes them
+        return self._encoder.default(obj)
+
+    def dumps(self, data, indent=None):
+        """Encode to UTF-8 bytes; indents other than 2 and out-of-range ints use stdlib."""
+        if indent not in (None, 2):
+            return self._fallback.dumps(data, indent=indent)
+        options = self.options if indent is None else self.options | orjson.OPT_INDENT_2
+        try:
+            return _escape_separators_utf8(orjson.dumps(data, default=self._default, option=options))
+        except orjson.JSONEncodeError:
+            return self._fallback.dumps(data, indent=indent)
+
+    def dumps_str(self, data):
+        return self.dumps(data).decode()
+
+    def loads(self, data):
+        """Decode bytes or str; raises ValueError on malformed input."""
+        return orjson.loads(data)
+
+
+BACKENDS = {
+    'stdlib': StdlibCodec,
+    'orjson': OrjsonCodec,
+}
+
+
+def available_backends():
+    return [name for name in BACKENDS if name != 'orjson' or orjson is not None]
+
+
+def get_codec(backend=None):
+    """Return the shared codec for `backend` (default: JSON_CODEC['BACKEND'])."""
+    backend = backend or get_setting('BACKEND')
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'stdlib'
+    codec = _codecs.get(backend)
+    if codec is None:
+        if backend not in BACKENDS:
+            raise ImproperlyConfigured(
+                f"Unknown JSON_CODEC backend {backend!r}; use 'auto', 'orjson' or 'stdlib'"
+            )
+        codec = _codecs[backend] = BACKENDS[backend]()
+        logger.debug('JSON codec %s ready', backend)
+    return codec
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding through get_codec(); set `json_backend` on a subclass to pin one."""
+    json_backend = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return get_codec(self.json_backend).dumps(data, indent=indent)
+
+
+class FastJSONParser(BaseParser):
+    """JSONParser decoding through get_codec()."""
+    media_type = 'application/json'
+    renderer_class = FastJSONRenderer
+    json_backend = None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+                body = body.decode(encoding)
+            return get_codec(self.json_backend).loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
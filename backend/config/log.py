@@ -0,0 +1,61 @@
+"""
+Logging helpers referenced from LOGGING in settings.
+
+Log calls pass values as arguments (`logger.debug('... %s', value)`) so
+nothing is formatted unless a handler actually emits the record, and
+structured fields go in `extra`. KeyValueFormatter appends those fields as
+key=value pairs after the message.
+
+Per-event hot paths (one record per GPS ping) mark their records with
+`extra={'sampled': True}`; SampleFilter lets only one in every `every` of
+them through, per logger and message.
+"""
+import itertools
+import logging
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'sampled', 'taskName'}
+
+
+def _quote(value):
+    text = str(value)
+    if not text or any(char in text for char in ' ="'):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+class KeyValueFormatter(logging.Formatter):
+    """`<time> <LEVEL> <logger> <message> key=value ...`"""
+
+    def __init__(self, fmt='%(asctime)s %(levelname)s %(name)s %(message)s', datefmt=None):
+        super().__init__(fmt, datefmt)
+
+    def format(self, record):
+        line = super().format(record)
+        fields = [
+            f'{key}={_quote(value)}'
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and not key.startswith('_')
+        ]
+        if not fields:
+            return line
+        # Keep a traceback (if any) below the fields
+        head, newline, tail = line.partition('\n')
+        return f"{head} {' '.join(fields)}{newline}{tail}"
+
+
+class SampleFilter(logging.Filter):
+    """Pass every `every`-th record marked `sampled`; pass unmarked records unchanged."""
+
+    def __init__(self, every=100):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._counters = {}
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False):
+            return True
+        counter = self._counters.get((record.name, record.msg))
+        if counter is None:
+            counter = self._counters.setdefault((record.name, record.msg), itertools.count())
+        return next(counter) % self.every == 0
@@ -10,12 +10,24 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 
+from config.database import database_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Variables from backend/.env, without overriding the real environment
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    pass
+else:
+    load_dotenv(BASE_DIR / ".env")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -46,9 +58,14 @@ INSTALLED_APPS = [
     "client",
     "track_driver",
     "admin_dashboard",
+    "geocoding",
+    "metrics",
 ]
 
 MIDDLEWARE = [
+    "metrics.middleware.MetricsMiddleware",  # First, so latency covers the whole stack
+    "metrics.profiling.ProfilingMiddleware",
+    "metrics.inspector.QueryInspectorMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # Add CORS middleware (must be before CommonMiddleware)
@@ -83,11 +100,10 @@ ASGI_APPLICATION = "config.asgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Profile from DB_* environment variables (config/database.py): tuned
+# SQLite by default, or PostgreSQL with pooled connections (safe under ASGI).
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": database_from_env(BASE_DIR),
 }
 
 
@@ -143,6 +159,16 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
+    # JSON through config.jsoncodec (orjson when installed, see JSON_CODEC)
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.jsoncodec.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.jsoncodec.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # Simple JWT Settings
@@ -192,3 +218,213 @@ CORS_ALLOW_HEADERS = [
     "x-csrftoken",
     "x-requested-with",
 ]
+
+# Parcel distance computation (client/distance.py)
+# Coordinates are rounded to this many decimal places (~11 m at 4) before
+# being used as a cache key for repeated lanes.
+DISTANCE_COORD_PRECISION = 4
+
+# Optional road-distance scaling as (max_straight_km, factor) bands, e.g.
+# [(5, 1.4), (50, 1.3), (None, 1.2)]. Empty means plain haversine distance,
+# which matches what the frontend shows before booking.
+DISTANCE_ROAD_FACTORS = []
+
+# Geocoding proxy (geocoding/services.py)
+# Set PROVIDER to "geocoding.providers.StubProvider" for offline development.
+GEOCODING = {
+    "PROVIDER": "geocoding.providers.NominatimProvider",
+    "PROVIDER_OPTIONS": {},
+    "LRU_SIZE": 2048,
+    "CACHE_TTL_DAYS": 30,
+    "COORD_PRECISION": 5,
+    # Background reverse-geocoding of stored driver locations
+    # (geocoding/enrichment.py). Pending points are deduplicated by grid cell.
+    "ENRICH_ADDRESSES": True,
+    "ENRICHMENT_QUEUE_SIZE": 10000,
+    "ENRICHMENT_BATCH_SIZE": 50,
+    "ENRICHMENT_BATCH_WAIT": 1.0,
+    "ENRICHMENT_CELL_PRECISION": 4,
+}
+# The test suite never reaches a real geocoding provider
+if sys.argv[1:2] == ["test"]:
+    GEOCODING["PROVIDER"] = "geocoding.providers.StubProvider"
+
+# ETA estimation for in-flight parcels (track_driver/eta.py)
+# Rolling speed uses up to WINDOW_POINTS positions from the last
+# WINDOW_SECONDS; cached ETAs are reused until the driver moves
+# RECOMPUTE_METERS or the value is MAX_AGE_SECONDS old.
+ETA = {
+    "WINDOW_POINTS": 10,
+    "WINDOW_SECONDS": 300,
+    "DEFAULT_SPEED_KMH": 25.0,
+    "MIN_SPEED_KMH": 5.0,
+    "MAX_SPEED_KMH": 120.0,
+    "RECOMPUTE_METERS": 100,
+    "MAX_AGE_SECONDS": 60,
+}
+
+# Geofencing of driver positions (track_driver/geofence.py)
+# AUTO_TRANSITIONS maps (fence, event) to {current_status: new_status}, e.g.
+# {("drop", "enter"): {"in_transit": "out_for_delivery"}}. Without entries,
+# geofence events only carry a suggested_status for the driver app.
+GEOFENCE = {
+    "PICKUP_RADIUS_M": 150,
+    "DROP_RADIUS_M": 150,
+    "EXIT_HYSTERESIS": 1.2,
+    "REFRESH_SECONDS": 60,
+    "AUTO_TRANSITIONS": {},
+}
+
+# Notification delivery outbox (client/outbox.py)
+# Notifications are queued per channel and delivered by worker threads,
+# either inside the ASGI process (RUN_IN_PROCESS) or via
+# `python manage.py run_notification_workers`. Use a shared channel layer
+# (Redis) when running workers out of process; the command refuses to
+# deliver WebSocket notifications through InMemoryChannelLayer.
+NOTIFICATION_OUTBOX = {
+    "CHANNELS": [
+        "client.delivery.WebSocketChannel",
+    ],
+    "BATCH_SIZE": 100,
+    "WORKERS": 2,
+    "POLL_INTERVAL": 1.0,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF_BASE_SECONDS": 5,
+    "BACKOFF_MAX_SECONDS": 3600,
+    "CLAIM_TIMEOUT_SECONDS": 300,
+    "RUN_IN_PROCESS": True,
+}
+
+# Notification retention (client/retention.py)
+# Read notifications older than DAYS move to notifications_archive in
+# BATCH_SIZE transactions. Run `manage.py archive_notifications` from cron,
+# or set SCHEDULE_ENABLED to run it from the ASGI process.
+NOTIFICATION_RETENTION = {
+    "DAYS": 90,
+    "BATCH_SIZE": 500,
+    "PAUSE_SECONDS": 0.05,
+    "SCHEDULE_ENABLED": False,
+    "INTERVAL_HOURS": 24,
+}
+
+# Response cache (client/cache.py)
+# Hot read endpoints are cached under versioned keys that write paths bump
+# (client/cache.py). LocMemCache is per process, so a bump in one process
+# never reaches the others: any deployment with more than one server process
+# must set CACHE_REDIS_URL (e.g. redis://localhost:6379/1) or another shared
+# backend, or clients are served stale payloads until RESPONSE_CACHE_TIMEOUT.
+if os.environ.get("CACHE_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["CACHE_REDIS_URL"],
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "routex-default",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        },
+    }
+RESPONSE_CACHE_ALIAS = "default"
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Tracking event buffer and SSE stream (track_driver/positions.py)
+# The last BUFFER_SIZE parcel events are kept in memory; they are replayed
+# to WebSocket subscribers on join and for Last-Event-ID resume on
+# /sse/tracking/<parcel_id>/.
+TRACKING_STREAM = {
+    "BUFFER_SIZE": 20,
+    "MAX_PARCELS": 10000,
+    "KEEPALIVE_SECONDS": 15,
+}
+
+# Tracking socket outbound queues (track_driver/outbound.py)
+# Per-connection send queue; positions coalesce per (parcel, driver) and
+# the oldest message is dropped beyond MAX_DEPTH.
+TRACKING_OUTBOUND = {
+    "MAX_DEPTH": 50,
+}
+
+# JSON encoding (config/jsoncodec.py)
+# BACKEND is "auto" (orjson when installed, else stdlib), "orjson" or
+# "stdlib"; used by REST responses and request parsing. TRACKING_BACKEND
+# overrides it for tracking socket frames (None follows BACKEND).
+JSON_CODEC = {
+    "BACKEND": "auto",
+    "TRACKING_BACKEND": None,
+}
+
+# Metrics (metrics/)
+# Prometheus text format on /metrics/. Values are per process. Set
+# AUTH_TOKEN to require "Authorization: Bearer <token>" on scrapes. With no
+# token, only DEBUG or INTERNAL_IPS may scrape; others get 403.
+METRICS = {
+    "ENABLED": True,
+    "COUNT_QUERIES": True,
+    "AUTH_TOKEN": "",
+}
+
+# Request profiling (metrics/profiling.py)
+# Profiles requests sent with "X-Profile: <HEADER_TOKEN>", a SAMPLE_RATE
+# fraction of all requests, or what admins switch on at runtime via
+# /metrics/profiling/. Artifacts are written to DIR (default
+# BASE_DIR/profiles) and listed at /metrics/profiles/. With ENABLED off the
+# middleware is removed entirely.
+PROFILING = {
+    "ENABLED": DEBUG,
+    "MODE": "cprofile",  # or "sampling" for flamegraph-ready folded stacks
+    "SAMPLE_RATE": 0.0,
+    "HEADER_TOKEN": "",
+    "MAX_PROFILES": 200,
+}
+
+# N+1 query inspector (metrics/inspector.py)
+# In development, warns (ACTION "log") or fails the request (ACTION
+# "raise") when one request runs the same SQL template THRESHOLD or more
+# times from the same code location. IGNORE holds regexes of templates to
+# skip. Removed entirely when ENABLED is off.
+QUERY_INSPECTOR = {
+    "ENABLED": DEBUG,
+    "THRESHOLD": 5,
+    "ACTION": "log",
+    "IGNORE": [],
+}
+
+# Logging (config/log.py)
+# Application modules log through logging.getLogger(__name__); set a
+# module's level here (e.g. "track_driver.consumers": "DEBUG") to see its
+# debug output. Records marked sampled (one per GPS ping) are thinned to
+# one in "every" by the sample filter. Django's own loggers default to INFO
+# under DEBUG and WARNING otherwise; DJANGO_LOG_LEVEL overrides both.
+DJANGO_LOG_LEVEL = os.environ.get("DJANGO_LOG_LEVEL") or ("INFO" if DEBUG else "WARNING")
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "kv": {"()": "config.log.KeyValueFormatter"},
+    },
+    "filters": {
+        "sample": {"()": "config.log.SampleFilter", "every": 100},
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "kv",
+            "filters": ["sample"],
+        },
+    },
+    "root": {"handlers": ["console"], "level": "WARNING"},
+    "loggers": {
+        # Replaces Django's default handlers so its records aren't printed twice
+        "django": {"handlers": ["console"], "level": DJANGO_LOG_LEVEL, "propagate": False},
+        "authapp": {"level": "INFO"},
+        "client": {"level": "INFO"},
+        "track_driver": {"level": "INFO"},
+        "admin_dashboard": {"level": "INFO"},
+        "geocoding": {"level": "INFO"},
+        "metrics": {"level": "INFO"},
+    },
+}
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from .database import POSTGRES, SQLITE, database_from_env, env_bool, env_int, sqlite_options
+
+BASE_DIR = Path('/srv/routex')
+
+
+class EnvHelperTests(SimpleTestCase):
+    def test_env_bool(self):
+        for value in ('1', 'true', 'YES', ' on ', 'anything'):
+            self.assertIs(env_bool({'FLAG': value}, 'FLAG', False), True, value)
+        for value in ('0', 'false', 'No', ' OFF '):
+            self.assertIs(env_bool({'FLAG': value}, 'FLAG', True), False, value)
+
+    def test_env_bool_unset_or_empty_uses_the_default(self):
+        for environ in ({}, {'FLAG': ''}, {'FLAG': '  '}):
+            self.assertIs(env_bool(environ, 'FLAG', True), True)
+            self.assertIs(env_bool(environ, 'FLAG', False), False)
+
+    def test_env_int(self):
+        self.assertEqual(env_int({'SIZE': '42'}, 'SIZE', 7), 42)
+        self.assertEqual(env_int({'SIZE': ' 42 '}, 'SIZE', 7), 42)
+        for environ in ({}, {'SIZE': ''}, {'SIZE': ' '}):
+            self.assertEqual(env_int(environ, 'SIZE', 7), 7)
+
+    def test_env_int_rejects_garbage(self):
+        with self.assertRaises(ValueError):
+            env_int({'SIZE': 'lots'}, 'SIZE', 7)
+
+
+class SqliteProfileTests(SimpleTestCase):
+    def test_default_is_tuned_sqlite_in_base_dir(self):
+        database = database_from_env(BASE_DIR, {})
+        self.assertEqual(database['ENGINE'], SQLITE)
+        self.assertEqual(database['NAME'], BASE_DIR / 'db.sqlite3')
+        self.assertEqual(database['OPTIONS'], sqlite_options({}))
+
+    def test_tuned_options(self):
+        options = sqlite_options({})
+        self.assertEqual(options['timeout'], 20)
+        self.assertEqual(options['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(options['init_command'].split(';'), [
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            'PRAGMA mmap_size=268435456',
+        ])
+
+    def test_tuning_knobs(self):
+        options = sqlite_options({'DB_SQLITE_TIMEOUT': '5', 'DB_SQLITE_MMAP_SIZE': '0'})
+        self.assertEqual(options['timeout'], 5)
+        self.assertIn('PRAGMA mmap_size=0', options['init_command'])
+
+    def test_untuned(self):
+        self.assertEqual(sqlite_options({'DB_SQLITE_TUNED': '0'}), {})
+        self.assertEqual(database_from_env(BASE_DIR, {'DB_SQLITE_TUNED': 'false'})['OPTIONS'], {})
+
+    def test_empty_values_keep_the_defaults(self):
+        database = database_from_env(BASE_DIR, {
+            'DB_ENGINE': '', 'DB_NAME': '', 'DB_SQLITE_TUNED': '', 'DB_SQLITE_TIMEOUT': '',
+        })
+        self.assertEqual(database['ENGINE'], SQLITE)
+        self.assertEqual(database['NAME'], BASE_DIR / 'db.sqlite3')
+        self.assertEqual(database['OPTIONS'], sqlite_options({}))
+
+    def test_db_name_overrides_the_path(self):
+        self.assertEqual(database_from_env(BASE_DIR, {'DB_NAME': '/tmp/other.sqlite3'})['NAME'], '/tmp/other.sqlite3')
+
+
+class PostgresProfileTests(SimpleTestCase):
+    def environ(self, **values):
+        return {'DB_ENGINE': POSTGRES, **values}
+
+    def test_pool_is_the_default(self):
+        database = database_from_env(BASE_DIR, self.environ())
+        self.assertEqual(database['ENGINE'], POSTGRES)
+        self.assertEqual((database['NAME'], database['HOST']), ('routex', 'localhost'))
+        self.assertEqual(database['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+    def test_pool_forces_conn_max_age_off(self):
+        database = database_from_env(BASE_DIR, self.environ(DB_CONN_MAX_AGE='600', DB_POOL_MAX_SIZE='50'))
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 50)
+
+    def test_without_pool_conn_max_age_applies(self):
+        database = database_from_env(BASE_DIR, self.environ(DB_POOL='0', DB_CONN_MAX_AGE='600'))
+        self.assertNotIn('pool', database['OPTIONS'])
+        self.assertEqual(database['CONN_MAX_AGE'], 600)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+    def test_empty_values_keep_the_defaults(self):
+        database = database_from_env(BASE_DIR, self.environ(
+            DB_POOL='', DB_NAME='', DB_HOST='', DB_CONN_MAX_AGE='', DB_POOL_MIN_SIZE='',
+        ))
+        self.assertEqual((database['NAME'], database['HOST']), ('routex', 'localhost'))
+        self.assertEqual(database['OPTIONS']['pool']['min_size'], 2)
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+    def test_connection_settings(self):
+        database = database_from_env(BASE_DIR, self.environ(
+            DB_NAME='fleet', DB_USER='routex', DB_PASSWORD='secret', DB_HOST='db', DB_PORT='5433',
+        ))
+        self.assertEqual(
+            [database[key] for key in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT')],
+            ['fleet', 'routex', 'secret', 'db', '5433'],
+        )
+
+    def test_other_engines_get_no_pool(self):
+        database = database_from_env(BASE_DIR, {'DB_ENGINE': 'django.db.backends.mysql', 'DB_CONN_MAX_AGE': '60'})
+        self.assertEqual(database['OPTIONS'], {})
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
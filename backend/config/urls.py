@@ -7,4 +7,6 @@ urlpatterns = [
     path('api/client/', include('client.urls')),
     path('api/driver/', include('track_driver.urls')),
     path('api/admin/', include('admin_dashboard.urls')),
+    path('api/geocode/', include('geocoding.urls')),
+    path('metrics/', include('metrics.urls')),
 ]
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import GeocodeCacheEntry
+
+
+@admin.register(GeocodeCacheEntry)
+class GeocodeCacheEntryAdmin(admin.ModelAdmin):
+    """Admin interface for cached geocoding responses."""
+
+    list_display = ['kind', 'key', 'provider', 'created_at']
+    list_filter = ['kind', 'provider']
+    search_fields = ['key']
+    readonly_fields = ['created_at']
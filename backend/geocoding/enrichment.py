@@ -0,0 +1,188 @@
+"""
+Background reverse-geocoding of stored driver locations.
+
+TrackingConsumer persists DriverLocation rows with whatever address the
+driver's client sent, which is often empty. Rather than geocoding on the
+hot path, the consumer hands the new row to AddressEnricher, which:
+
+  * deduplicates pending rows by grid cell (coordinates rounded to
+    ENRICHMENT_CELL_PRECISION), so a driver idling at a junction costs one
+    lookup no matter how many points it produces;
+  * drains cells in batches and resolves them through the cached
+    GeocodingService on the enricher's own thread, so a slow provider
+    never occupies the shared sync thread that the consumers'
+    database_sync_to_async calls run on;
+  * writes addresses back with one UPDATE per cell (on that shared
+    thread, like every other ORM write from the consumers), skipping rows
+    that gained an address in the meantime, and bumps the cached parcel
+    payloads that embed those rows.
+
+Counters are exposed through AddressEnricher.stats().
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from channels.db import database_sync_to_async
+from django.db import close_old_connections
+from django.db.models import Q
+
+from .providers import GeocodingError
+from .services import get_setting, get_geocoding_service, coordinate_key
+
+logger = logging.getLogger(__name__)
+
+
+def format_address(payload):
+    """Pick a short human-readable address out of a provider response."""
+    addr = payload.get('address') or {}
+    parts = [
+        addr.get('road') or addr.get('neighbourhood') or addr.get('suburb'),
+        addr.get('city') or addr.get('town') or addr.get('village'),
+        addr.get('state'),
+    ]
+    address = ', '.join(p for p in parts if p) or payload.get('display_name') or ''
+    return address[:255]
+
+
+class AddressEnricher:
+    """Asyncio queue that fills in DriverLocation.address in the background."""
+
+    def __init__(self, service=None, queue_size=None, batch_size=None,
+                 batch_wait=None, cell_precision=None):
+        self._service = service
+        self.queue_size = queue_size or get_setting('ENRICHMENT_QUEUE_SIZE')
+        self.batch_size = batch_size or get_setting('ENRICHMENT_BATCH_SIZE')
+        self.batch_wait = batch_wait if batch_wait is not None else get_setting('ENRICHMENT_BATCH_WAIT')
+        self.cell_precision = cell_precision if cell_precision is not None else get_setting('ENRICHMENT_CELL_PRECISION')
+
+        self._queue = None
+        self._pending = {}
+        self._worker = None
+        # One thread: lookups stay sequential, which also respects provider rate limits
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='address-enricher')
+        self._started_at = time.monotonic()
+        self._counters = {
+            'enqueued': 0,
+            'deduplicated': 0,
+            'dropped': 0,
+            'batches': 0,
+            'lookups': 0,
+            'lookup_failures': 0,
+            'rows_updated': 0,
+        }
+
+    @property
+    def service(self):
+        if self._service is None:
+            self._service = get_geocoding_service()
+        return self._service
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._pending = {}
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    def enqueue(self, location_id, lat, lng):
+        """Schedule a stored location for address enrichment.
+
+        Never blocks: rows landing in an already-pending cell are merged into
+        it, and new cells are dropped (and counted) when the queue is full.
+        """
+        self._ensure_worker()
+        cell = coordinate_key(lat, lng, self.cell_precision)
+        ids = self._pending.get(cell)
+        if ids is not None:
+            ids.append(location_id)
+            self._counters['deduplicated'] += 1
+            return True
+        try:
+            self._queue.put_nowait(cell)
+        except asyncio.QueueFull:
+            self._counters['dropped'] += 1
+            return False
+        self._pending[cell] = [location_id]
+        self._counters['enqueued'] += 1
+        return True
+
+    async def _run(self):
+        while True:
+            cells = [await self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(cells) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    cells.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = {cell: self._pending.pop(cell, []) for cell in cells}
+            try:
+                await self._process_batch(batch)
+            except Exception:
+                logger.exception('Address enrichment batch failed')
+            finally:
+                for _ in cells:
+                    self._queue.task_done()
+
+    async def _process_batch(self, batch):
+        self._counters['batches'] += 1
+        loop = asyncio.get_running_loop()
+        for cell, location_ids in batch.items():
+            if not location_ids:
+                continue
+            self._counters['lookups'] += 1
+            try:
+                address = await loop.run_in_executor(self._executor, self._lookup_address, cell)
+            except GeocodingError:
+                self._counters['lookup_failures'] += 1
+                continue
+            if address:
+                self._counters['rows_updated'] += await self._store_address(location_ids, address)
+
+    def _lookup_address(self, cell):
+        """Resolve a cell (cache table, then provider) on the enricher's thread."""
+        lat, lng = (float(part) for part in cell.split(','))
+        try:
+            return format_address(self.service.reverse(lat, lng))
+        finally:
+            close_old_connections()
+
+    @database_sync_to_async
+    def _store_address(self, location_ids, address):
+        from client.cache import bump, parcel_scope
+        from track_driver.models import DriverLocation
+
+        rows = DriverLocation.objects.filter(Q(address='') | Q(address__isnull=True), id__in=location_ids)
+        parcel_ids = set(rows.exclude(parcel=None).values_list('parcel_id', flat=True))
+        updated = rows.update(address=address)
+        if parcel_ids:
+            bump(*(parcel_scope(parcel_id) for parcel_id in parcel_ids))
+        return updated
+
+    def stats(self):
+        """Return counters plus queue depth and throughput."""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            **self._counters,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'pending_cells': len(self._pending),
+            'worker_running': self._worker is not None and not self._worker.done(),
+            'rows_per_second': round(self._counters['rows_updated'] / elapsed, 3),
+            'lookups_per_second': round(self._counters['lookups'] / elapsed, 3),
+        }
+
+
+_enricher = None
+
+
+def get_address_enricher():
+    """Return the process-wide AddressEnricher."""
+    global _enricher
+    if _enricher is None:
+        _enricher = AddressEnricher()
+    return _enricher
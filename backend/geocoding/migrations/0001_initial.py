@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('search', 'Search'), ('reverse', 'Reverse')], max_length=10)),
+                ('key', models.CharField(help_text="Normalized query or rounded 'lat,lng' pair", max_length=255)),
+                ('payload', models.JSONField(help_text='Raw provider response')),
+                ('provider', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Geocode Cache Entry',
+                'verbose_name_plural': 'Geocode Cache Entries',
+                'db_table': 'geocode_cache',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='geocode_cache_kind_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class GeocodeCacheEntry(models.Model):
+    """Persistent cache of geocoding provider responses."""
+
+    KIND_CHOICES = [
+        ('search', 'Search'),
+        ('reverse', 'Reverse'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    key = models.CharField(
+        max_length=255,
+        help_text="Normalized query or rounded 'lat,lng' pair"
+    )
+    payload = models.JSONField(help_text="Raw provider response")
+    provider = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'geocode_cache'
+        verbose_name = 'Geocode Cache Entry'
+        verbose_name_plural = 'Geocode Cache Entries'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='geocode_cache_kind_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.key}"
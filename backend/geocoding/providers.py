@@ -0,0 +1,103 @@
+"""
+Geocoding providers.
+
+A provider turns a free-text query or a coordinate pair into the raw
+Nominatim-shaped JSON the frontend already understands. The active provider
+is selected with GEOCODING['PROVIDER'] in settings.
+"""
+import json
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+
+class GeocodingError(Exception):
+    """Raised when a provider cannot complete a lookup."""
+
+
+class BaseGeocodingProvider:
+    """Interface every geocoding provider implements."""
+
+    name = 'base'
+
+    def search(self, query, limit=5):
+        """Return a list of Nominatim-style search results."""
+        raise NotImplementedError
+
+    def reverse(self, lat, lng):
+        """Return a Nominatim-style reverse geocoding result dict."""
+        raise NotImplementedError
+
+
+class NominatimProvider(BaseGeocodingProvider):
+    """Provider backed by the public OpenStreetMap Nominatim API."""
+
+    name = 'nominatim'
+
+    def __init__(self, base_url='https://nominatim.openstreetmap.org',
+                 user_agent='RouteX-ParcelFlow/1.0', timeout=5):
+        self.base_url = base_url.rstrip('/')
+        self.user_agent = user_agent
+        self.timeout = timeout
+
+    def _get(self, path, params):
+        url = f"{self.base_url}/{path}?{urlencode(params)}"
+        request = Request(url, headers={'User-Agent': self.user_agent})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except (URLError, OSError, ValueError) as e:
+            raise GeocodingError(f"Nominatim request failed: {e}") from e
+
+    def search(self, query, limit=5):
+        return self._get('search', {
+            'format': 'json',
+            'q': query,
+            'limit': limit,
+            'addressdetails': 1,
+        })
+
+    def reverse(self, lat, lng):
+        return self._get('reverse', {
+            'format': 'json',
+            'lat': lat,
+            'lon': lng,
+            'zoom': 18,
+            'addressdetails': 1,
+        })
+
+
+class StubProvider(BaseGeocodingProvider):
+    """Offline provider returning deterministic results.
+
+    Used for tests and local development without network access. `calls`
+    records every lookup that reached the provider, which makes cache and
+    coalescing behaviour easy to assert on.
+    """
+
+    name = 'stub'
+
+    def __init__(self, **kwargs):
+        self.calls = []
+
+    def search(self, query, limit=5):
+        self.calls.append(('search', query, limit))
+        return [
+            {
+                'place_id': index,
+                'lat': f"{18.5 + index * 0.01:.7f}",
+                'lon': f"{73.8 + index * 0.01:.7f}",
+                'display_name': f"{query} {index}",
+                'address': {'road': query, 'city': 'Stubville'},
+            }
+            for index in range(limit)
+        ]
+
+    def reverse(self, lat, lng):
+        self.calls.append(('reverse', lat, lng))
+        return {
+            'lat': f"{lat:.7f}",
+            'lon': f"{lng:.7f}",
+            'display_name': f"Stub Road, Stubville ({lat:.5f}, {lng:.5f})",
+            'address': {'road': 'Stub Road', 'city': 'Stubville'},
+        }
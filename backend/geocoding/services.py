@@ -0,0 +1,191 @@
+"""
+Geocoding service with a two-level cache in front of the provider.
+
+Lookups go through an in-process LRU, then the geocode_cache table, and only
+then the configured provider. Concurrent identical lookups are coalesced so
+only one of them reaches the provider; the others wait for its result.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import GeocodeCacheEntry
+
+DEFAULTS = {
+    'PROVIDER': 'geocoding.providers.NominatimProvider',
+    'PROVIDER_OPTIONS': {},
+    'LRU_SIZE': 2048,
+    'CACHE_TTL_DAYS': 30,
+    'COORD_PRECISION': 5,
+    'ENRICH_ADDRESSES': True,
+    'ENRICHMENT_QUEUE_SIZE': 10000,
+    'ENRICHMENT_BATCH_SIZE': 50,
+    'ENRICHMENT_BATCH_WAIT': 1.0,
+    'ENRICHMENT_CELL_PRECISION': 4,
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def get_setting(name):
+    return getattr(settings, 'GEOCODING', {}).get(name, DEFAULTS[name])
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def normalize_query(query):
+    """Collapse whitespace and case so equivalent searches share a key."""
+    return _WHITESPACE_RE.sub(' ', query.strip().lower())
+
+
+def search_key(query, limit):
+    """Cache key for a search: the normalized query plus '|limit'.
+
+    Queries too long for the key column are replaced by their SHA-256 digest,
+    so truncation can never drop the limit or merge different long queries.
+    """
+    normalized = normalize_query(query)
+    suffix = f"|{int(limit)}"
+    if len(normalized) + len(suffix) > GeocodeCacheEntry._meta.get_field('key').max_length:
+        normalized = 'sha256:' + hashlib.sha256(normalized.encode()).hexdigest()
+    return normalized + suffix
+
+
+def coordinate_key(lat, lng, precision=None):
+    """Round a coordinate pair to a cache key ('lat,lng')."""
+    if precision is None:
+        precision = get_setting('COORD_PRECISION')
+    return f"{round(float(lat), precision):.{precision}f},{round(float(lng), precision):.{precision}f}"
+
+
+class GeocodingService:
+    """Cached, coalescing front for a geocoding provider."""
+
+    def __init__(self, provider=None, lru_size=None, ttl_days=None):
+        if provider is None:
+            provider_class = import_string(get_setting('PROVIDER'))
+            provider = provider_class(**get_setting('PROVIDER_OPTIONS'))
+        self.provider = provider
+        self.lru = LRUCache(lru_size or get_setting('LRU_SIZE'))
+        self.ttl = timedelta(days=ttl_days if ttl_days is not None else get_setting('CACHE_TTL_DAYS'))
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def search(self, query, limit=5):
+        return self._lookup('search', search_key(query, limit), lambda: self.provider.search(query, limit))
+
+    def reverse(self, lat, lng):
+        key = coordinate_key(lat, lng)
+        rounded_lat, rounded_lng = (float(part) for part in key.split(','))
+        return self._lookup('reverse', key, lambda: self.provider.reverse(rounded_lat, rounded_lng))
+
+    def _lookup(self, kind, key, fetch):
+        cache_key = (kind, key)
+        payload = self.lru.get(cache_key)
+        if payload is not None:
+            return payload
+
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[cache_key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            payload = self._load_persistent(kind, key)
+            if payload is None:
+                payload = fetch()
+                self._store_persistent(kind, key, payload)
+            self.lru.set(cache_key, payload)
+            future.set_result(payload)
+            return payload
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+
+    def _load_persistent(self, kind, key):
+        entry = GeocodeCacheEntry.objects.filter(
+            kind=kind,
+            key=key,
+            created_at__gte=timezone.now() - self.ttl
+        ).only('payload').first()
+        return entry.payload if entry else None
+
+    def _store_persistent(self, kind, key, payload):
+        try:
+            GeocodeCacheEntry.objects.update_or_create(
+                kind=kind,
+                key=key,
+                defaults={
+                    'payload': payload,
+                    'provider': self.provider.name,
+                    'created_at': timezone.now(),
+                }
+            )
+        except IntegrityError:
+            # Another process stored the same lookup first; its row is as good as ours.
+            pass
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_geocoding_service():
+    """Return the process-wide GeocodingService."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GeocodingService()
+    return _service
+
+
+def set_geocoding_service(service):
+    """Replace the process-wide service (e.g. with one wrapping StubProvider)."""
+    global _service
+    _service = service
@@ -0,0 +1,272 @@
+import threading
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from client.cache import get_versions, parcel_scope
+from client.models import Parcel
+from track_driver.models import DriverLocation
+
+from .enrichment import AddressEnricher
+from .models import GeocodeCacheEntry
+from .providers import GeocodingError, StubProvider
+from .services import GeocodingService, search_key, set_geocoding_service
+
+User = get_user_model()
+
+
+class BlockingProvider(StubProvider):
+    """StubProvider whose searches wait until `release` is set."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def search(self, query, limit=5):
+        self.entered.set()
+        self.release.wait(5)
+        return super().search(query, limit)
+
+
+class FailingProvider(StubProvider):
+    """StubProvider whose reverse lookups raise `error`."""
+
+    def __init__(self, error, **kwargs):
+        super().__init__(**kwargs)
+        self.error = error
+
+    def reverse(self, lat, lng):
+        self.calls.append(('reverse', lat, lng))
+        raise self.error
+
+
+class GeocodingServiceCacheTests(TestCase):
+    def setUp(self):
+        self.provider = StubProvider()
+        self.service = GeocodingService(provider=self.provider)
+
+    def test_lru_hit_skips_database_and_provider(self):
+        first = self.service.search('Main Street', 3)
+        GeocodeCacheEntry.objects.all().delete()
+
+        with self.assertNumQueries(0):
+            second = self.service.search('Main Street', 3)
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.provider.calls, [('search', 'Main Street', 3)])
+
+    def test_equivalent_queries_share_a_key(self):
+        self.service.search('Main Street', 3)
+        self.service.search('  main   STREET ', 3)
+        self.assertEqual(len(self.provider.calls), 1)
+
+    def test_long_queries_keep_the_limit_in_their_key(self):
+        base = 'main street ' * 30
+        short_key = search_key('Main Street', 3)
+        long_key = search_key(base, 3)
+
+        self.assertEqual(short_key, 'main street|3')
+        self.assertLessEqual(len(long_key), 255)
+        self.assertTrue(long_key.endswith('|3'))
+        self.assertEqual(search_key(base.upper(), 3), long_key)
+        self.assertNotEqual(search_key(base, 5), long_key)
+        self.assertNotEqual(search_key(base + 'east', 3), long_key)
+
+    def test_long_queries_with_different_limits_are_cached_separately(self):
+        query = 'Main Street ' * 30
+        self.assertEqual(len(self.service.search(query, 3)), 3)
+        self.assertEqual(len(self.service.search(query, 5)), 5)
+        self.assertEqual(len(self.provider.calls), 2)
+        self.assertEqual(GeocodeCacheEntry.objects.filter(kind='search').count(), 2)
+
+    def test_database_cache_hit_survives_a_new_service(self):
+        first = self.service.reverse(18.520432, 73.856743)
+
+        provider = StubProvider()
+        second = GeocodingService(provider=provider).reverse(18.520432, 73.856743)
+
+        self.assertEqual(second, first)
+        self.assertEqual(provider.calls, [])
+        self.assertEqual(GeocodeCacheEntry.objects.filter(kind='reverse').count(), 1)
+
+    def test_reverse_rounds_to_the_cache_precision(self):
+        self.service.reverse(18.520431, 73.856741)
+        self.service.reverse(18.520434, 73.856744)
+        self.assertEqual(self.provider.calls, [('reverse', 18.52043, 73.85674)])
+
+    def test_expired_database_entry_is_refetched(self):
+        self.service.search('Main Street', 3)
+
+        provider = StubProvider()
+        GeocodingService(provider=provider, ttl_days=0).search('Main Street', 3)
+
+        self.assertEqual(len(provider.calls), 1)
+
+
+class GeocodingServiceCoalescingTests(TransactionTestCase):
+    def test_concurrent_identical_lookups_reach_the_provider_once(self):
+        provider = BlockingProvider()
+        service = GeocodingService(provider=provider)
+        results = []
+        errors = []
+
+        def lookup():
+            try:
+                results.append(service.search('Main Street', 3))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(provider.entered.wait(5))
+        provider.release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(len(provider.calls), 1)
+
+
+class GeocodeViewTests(TestCase):
+    def setUp(self):
+        self.provider = StubProvider()
+        set_geocoding_service(GeocodingService(provider=self.provider))
+        self.user = User.objects.create_user(
+            email='geo@test.com',
+            full_name='Geo Client',
+            phone_number='9000000001',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        set_geocoding_service(None)
+
+    def test_search_requires_authentication(self):
+        response = APIClient().get('/api/geocode/search/', {'q': 'Main Street'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_short_search_returns_empty_without_lookup(self):
+        response = self.client.get('/api/geocode/search/', {'q': ' ab '})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+        self.assertEqual(self.provider.calls, [])
+
+    def test_search_limit_must_be_an_integer(self):
+        response = self.client.get('/api/geocode/search/', {'q': 'Main Street', 'limit': 'many'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_limit_is_clamped(self):
+        response = self.client.get('/api/geocode/search/', {'q': 'Main Street', 'limit': 50})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 10)
+        self.assertEqual(self.provider.calls, [('search', 'Main Street', 10)])
+
+    def test_reverse_requires_numeric_coordinates(self):
+        for params in ({}, {'lat': '18.5'}, {'lat': 'north', 'lng': '73.8'}):
+            response = self.client.get('/api/geocode/reverse/', params)
+            self.assertEqual(response.status_code, 400, params)
+        self.assertEqual(self.provider.calls, [])
+
+    def test_reverse_rejects_out_of_range_coordinates(self):
+        response = self.client.get('/api/geocode/reverse/', {'lat': 91, 'lng': 73.8})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/geocode/reverse/', {'lat': 18.5, 'lng': -181})
+        self.assertEqual(response.status_code, 400)
+
+    def test_reverse_returns_provider_payload(self):
+        response = self.client.get('/api/geocode/reverse/', {'lat': 18.5204, 'lng': 73.8567})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['address']['city'], 'Stubville')
+
+
+class AddressEnricherTests(TransactionTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.driver = User.objects.create_user(
+            email='driver@test.com', full_name='Geo Driver', phone_number='9000000002',
+            password='testpass123', role='driver'
+        )
+        client = User.objects.create_user(
+            email='client@test.com', full_name='Geo Client', phone_number='9000000003', password='testpass123'
+        )
+        self.parcel = Parcel.objects.create(
+            client=client, tracking_number='GEO000001', from_location='Shivajinagar', to_location='Kothrud',
+            weight=1, height=1, width=1, breadth=1, price=100
+        )
+
+    def location(self, lat=18.52043, lng=73.85674, address=''):
+        return DriverLocation.objects.create(
+            driver=self.driver, parcel=self.parcel, latitude=lat, longitude=lng, address=address
+        )
+
+    def enrich(self, provider, locations):
+        enricher = AddressEnricher(service=GeocodingService(provider=provider), batch_wait=0)
+
+        async def run():
+            for location in locations:
+                enricher.enqueue(location.id, float(location.latitude), float(location.longitude))
+            await enricher._queue.join()
+
+        async_to_sync(run)()
+        return enricher.stats()
+
+    def test_test_settings_use_the_stub_provider(self):
+        self.assertIsInstance(GeocodingService().provider, StubProvider)
+
+    def test_one_lookup_per_cell_updates_every_row(self):
+        provider = StubProvider()
+        first, second = self.location(), self.location(18.52041, 73.85671)
+        version = get_versions([parcel_scope(self.parcel.id)])
+
+        stats = self.enrich(provider, [first, second])
+
+        self.assertEqual(len(provider.calls), 1)
+        self.assertEqual((stats['deduplicated'], stats['lookups'], stats['rows_updated']), (1, 1, 2))
+        self.assertEqual(
+            set(DriverLocation.objects.values_list('address', flat=True)), {'Stub Road, Stubville'}
+        )
+        self.assertNotEqual(get_versions([parcel_scope(self.parcel.id)]), version)
+
+    def test_address_is_written_once(self):
+        provider = StubProvider()
+        location = self.location()
+        self.enrich(provider, [location])
+        DriverLocation.objects.filter(pk=location.pk).update(address='Set by the driver')
+
+        stats = self.enrich(provider, [location])
+
+        self.assertEqual(stats['rows_updated'], 0)
+        self.assertEqual(DriverLocation.objects.get(pk=location.pk).address, 'Set by the driver')
+
+    def test_location_with_an_address_is_not_overwritten(self):
+        version = get_versions([parcel_scope(self.parcel.id)])
+        location = self.location(address='Baner Road')
+
+        stats = self.enrich(StubProvider(), [location])
+
+        self.assertEqual(stats['rows_updated'], 0)
+        self.assertEqual(DriverLocation.objects.get(pk=location.pk).address, 'Baner Road')
+        self.assertEqual(get_versions([parcel_scope(self.parcel.id)]), version)
+
+    def test_provider_errors_are_swallowed(self):
+        location = self.location()
+
+        with self.assertLogs('geocoding.enrichment', 'ERROR'):
+            stats = self.enrich(FailingProvider(RuntimeError('boom')), [location])
+        self.assertEqual(stats['rows_updated'], 0)
+
+        stats = self.enrich(FailingProvider(GeocodingError('unavailable')), [location])
+        self.assertEqual((stats['lookups'], stats['lookup_failures'], stats['rows_updated']), (1, 1, 0))
+        self.assertEqual(DriverLocation.objects.get(pk=location.pk).address, '')
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import GeocodeSearchView, ReverseGeocodeView, EnrichmentStatsView
+
+app_name = 'geocoding'
+
+urlpatterns = [
+    path('search/', GeocodeSearchView.as_view(), name='geocode-search'),
+    path('reverse/', ReverseGeocodeView.as_view(), name='geocode-reverse'),
+    path('enrichment/stats/', EnrichmentStatsView.as_view(), name='geocode-enrichment-stats'),
+]
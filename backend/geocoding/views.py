@@ -0,0 +1,75 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .providers import GeocodingError
+from .services import get_geocoding_service
+from .enrichment import get_address_enricher
+
+
+class GeocodeSearchView(APIView):
+    """
+    GET /api/geocode/search/?q=<query>&limit=<n>
+    Forward geocoding through the cached backend provider.
+    Returns the same JSON shape as Nominatim's /search endpoint.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if len(query) < 3:
+            return Response([], status=status.HTTP_200_OK)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 5)), 1), 10)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = get_geocoding_service().search(query, limit)
+        except GeocodingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class ReverseGeocodeView(APIView):
+    """
+    GET /api/geocode/reverse/?lat=<lat>&lng=<lng>
+    Reverse geocoding through the cached backend provider.
+    Returns the same JSON shape as Nominatim's /reverse endpoint.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params['lat'])
+            lng = float(request.query_params['lng'])
+        except (KeyError, ValueError):
+            return Response({'error': 'lat and lng are required numeric parameters'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return Response({'error': 'Coordinates out of range'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = get_geocoding_service().reverse(lat, lng)
+        except GeocodingError as e:
+            return Response({'error': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class EnrichmentStatsView(APIView):
+    """
+    GET /api/geocode/enrichment/stats/
+    Throughput and queue-depth counters for background address enrichment.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_address_enricher().stats(), status=status.HTTP_200_OK)
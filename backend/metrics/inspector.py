@@ -0,0 +1,156 @@
+"""
+Development/test query inspector for N+1 patterns.
+
+Every statement is reduced to a template (literals and placeholders become
+`?`, IN lists become `IN (...)`) and attributed to the innermost frame of
+project code that issued it, e.g. a serializer method or a loop in a view.
+A template executed THRESHOLD or more times from the same place within one
+request is almost always a relation walked per row; the inspector reports
+the template, the count and that code location, and either logs a warning
+or raises NPlusOneError (ACTION 'log' or 'raise').
+
+QueryInspectorMiddleware does this per request and is removed at startup
+unless QUERY_INSPECTOR['ENABLED'] (default: DEBUG). In tests and scripts
+use the context manager directly:
+
+    with inspect_queries(action='raise'):
+        client.get('/api/admin/parcel-requests/')
+"""
+import logging
+import re
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD': 5,
+    'ACTION': 'log',
+    'IGNORE': [],
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+_TRANSACTION = re.compile(r'^(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT|ROLLBACK)\b', re.IGNORECASE)
+
+_THIS_DIR = str(Path(__file__).resolve().parent)
+
+
+class NPlusOneError(Exception):
+    """Raised when a request repeats a query template past the threshold."""
+
+
+def get_setting(name):
+    return getattr(settings, 'QUERY_INSPECTOR', {}).get(name, DEFAULTS[name])
+
+
+def normalize(sql):
+    """Reduce a statement to a template shared by all its executions."""
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _project_root():
+    return str(settings.BASE_DIR)
+
+
+def _is_project_file(filename):
+    return (
+        filename.startswith(_project_root())
+        and 'site-packages' not in filename
+        and not filename.startswith(_THIS_DIR)
+    )
+
+
+def query_origin(depth=3):
+    """The innermost `depth` project frames of the current stack, innermost first."""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < depth:
+        filename = frame.f_code.co_filename
+        if _is_project_file(filename):
+            relative = Path(filename).relative_to(_project_root())
+            frames.append(f'{relative}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return tuple(frames)
+
+
+class QueryInspector:
+    """execute_wrapper grouping statements by (template, origin)."""
+
+    def __init__(self, ignore=()):
+        self.ignore = [re.compile(pattern) for pattern in ignore]
+        self.count = 0
+        self.groups = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if not _TRANSACTION.match(sql):
+            template = normalize(sql)
+            if not any(pattern.search(template) for pattern in self.ignore):
+                key = (template, query_origin())
+                group = self.groups.get(key)
+                if group is None:
+                    group = self.groups[key] = {'template': template, 'origin': key[1], 'count': 0, 'sql': sql}
+                group['count'] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        """Groups executed at least `threshold` times, most frequent first."""
+        return sorted(
+            (group for group in self.groups.values() if group['count'] >= threshold),
+            key=lambda group: -group['count']
+        )
+
+
+def describe(group):
+    origin = '\n    '.join(group['origin']) or '<outside project code>'
+    return f"{group['count']}x {group['template'][:300]}\n  from {origin}"
+
+
+def report(repeated, label, action):
+    """Log or raise for repeated query groups."""
+    if not repeated:
+        return
+    message = f'Repeated queries in {label}:\n' + '\n'.join(describe(group) for group in repeated)
+    if action == 'raise':
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def inspect_queries(threshold=None, action=None, label='block'):
+    """Inspect queries on the default connection inside the block; report on exit."""
+    inspector = QueryInspector(get_setting('IGNORE'))
+    with connection.execute_wrapper(inspector):
+        yield inspector
+    report(inspector.repeated(threshold or get_setting('THRESHOLD')), label, action or get_setting('ACTION'))
+
+
+class QueryInspectorMiddleware:
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = get_setting('THRESHOLD')
+        self.action = get_setting('ACTION')
+        self.ignore = get_setting('IGNORE')
+
+    def __call__(self, request):
+        inspector = QueryInspector(self.ignore)
+        with connection.execute_wrapper(inspector):
+            response = self.get_response(request)
+        report(inspector.repeated(self.threshold), f'{request.method} {request.path}', self.action)
+        return response
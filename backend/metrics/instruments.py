@@ -0,0 +1,94 @@
+"""
+The application's metrics.
+
+Modules record into these objects directly, e.g.
+`LOCATION_UPDATES.inc()` or `with GROUP_SEND_SECONDS.time(group='parcel'):`.
+Values that other modules already keep (outbound queue totals, channel
+layer queues) are read through callbacks when /metrics is scraped.
+"""
+from .registry import Counter, Gauge, Histogram
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'routex_http_request_duration_seconds',
+    'HTTP request latency by view.',
+    ('view', 'method'),
+)
+HTTP_REQUESTS = Counter(
+    'routex_http_requests_total',
+    'HTTP responses by view and status code.',
+    ('view', 'method', 'status'),
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    'routex_http_request_db_queries',
+    'Database queries executed per HTTP request.',
+    ('view',),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+
+WS_CONNECTIONS = Gauge(
+    'routex_ws_connections',
+    'Open WebSocket and SSE connections by consumer and user role.',
+    ('consumer', 'role'),
+)
+LOCATION_UPDATES = Counter(
+    'routex_tracking_location_updates_total',
+    'Driver location updates received over the tracking socket.',
+)
+GROUP_SEND_SECONDS = Histogram(
+    'routex_channel_layer_group_send_seconds',
+    'Channel layer group_send latency by group kind.',
+    ('group',),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+LOCATION_FLUSH_SECONDS = Histogram(
+    'routex_tracking_location_flush_seconds',
+    'Latency of persisting a driver location to the database.',
+)
+
+
+def _outbound_totals(name):
+    def read():
+        from track_driver.outbound import outbound_totals
+        return outbound_totals()[name]
+    return read
+
+
+OUTBOUND_SENT = Counter(
+    'routex_tracking_outbound_sent_total',
+    'Messages sent from tracking socket outbound queues.',
+    callback=_outbound_totals('sent'),
+)
+OUTBOUND_COALESCED = Counter(
+    'routex_tracking_outbound_coalesced_total',
+    'Queued positions replaced by a newer one before being sent.',
+    callback=_outbound_totals('coalesced'),
+)
+OUTBOUND_DROPPED = Counter(
+    'routex_tracking_outbound_dropped_total',
+    'Messages dropped because an outbound queue was full.',
+    callback=_outbound_totals('dropped'),
+)
+
+
+def _channel_queues():
+    """Per-channel queues of the in-memory layer; other backends don't expose them."""
+    from channels.layers import get_channel_layer
+    layer = get_channel_layer()
+    return getattr(layer, 'channels', None) or {}
+
+
+CHANNEL_LAYER_QUEUE_DEPTH = Gauge(
+    'routex_channel_layer_queue_depth',
+    'Messages waiting in channel layer queues (in-memory layer only).',
+    callback=lambda: sum(queue.qsize() for queue in list(_channel_queues().values())),
+)
+CHANNEL_LAYER_MAX_QUEUE_DEPTH = Gauge(
+    'routex_channel_layer_max_queue_depth',
+    'Deepest single channel queue (in-memory layer only).',
+    callback=lambda: max((queue.qsize() for queue in list(_channel_queues().values())), default=0),
+)
+CHANNEL_LAYER_CHANNELS = Gauge(
+    'routex_channel_layer_channels',
+    'Channels with a queue in the channel layer (in-memory layer only).',
+    callback=lambda: len(_channel_queues()),
+)
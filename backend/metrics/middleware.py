@@ -0,0 +1,68 @@
+"""
+Per-request latency, status and query-count metrics.
+
+Requests are labelled by the resolved URL name (route pattern when the
+URL has no name), so label cardinality stays bounded no matter which ids
+appear in paths. Queries are counted with a connection execute_wrapper,
+which adds one function call per query and works with DEBUG off.
+"""
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .instruments import HTTP_REQUEST_QUERIES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS
+
+DEFAULTS = {
+    'ENABLED': True,
+    'COUNT_QUERIES': True,
+    'AUTH_TOKEN': '',
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_setting('ENABLED')
+        self.count_queries = get_setting('COUNT_QUERIES')
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        if self.count_queries:
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                response = self.get_response(request)
+        else:
+            counter = None
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = view_label(request)
+        HTTP_REQUEST_SECONDS.observe(elapsed, view=view, method=request.method)
+        HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        if counter is not None:
+            HTTP_REQUEST_QUERIES.observe(counter.count, view=view)
+        return response
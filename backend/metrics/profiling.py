@@ -0,0 +1,291 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when one of these holds:
+
+- it sends `X-Profile: <HEADER_TOKEN>` (with no token configured, any
+  value works, but only when DEBUG is on);
+- a random draw falls under SAMPLE_RATE;
+- an admin switched on runtime profiling through /metrics/profiling/.
+  The rate and expiry are kept in the cache and re-read at most every
+  TOGGLE_REFRESH_SECONDS, so all processes sharing the cache pick it up.
+
+A profiled request is run under cProfile (MODE 'cprofile') or a stack
+sampler (MODE 'sampling', every SAMPLE_INTERVAL seconds), and every SQL
+statement it executes is recorded with its duration. Artifacts go to DIR
+as <id>.json (request, timings, SQL log) plus <id>.prof (pstats; open with
+snakeviz or `python -m pstats`) or <id>.folded (collapsed stacks for
+flamegraph.pl or speedscope). Only the newest MAX_PROFILES are kept. The
+response carries the profile id in X-Profile-Id.
+
+With ENABLED off the middleware removes itself at startup, so requests pay
+nothing; with it on, an unprofiled request costs a header lookup, a random
+draw and a timestamp comparison.
+"""
+import cProfile
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+
+from .middleware import view_label
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MODE': 'cprofile',
+    'SAMPLE_RATE': 0.0,
+    'SAMPLE_INTERVAL': 0.005,
+    'HEADER_TOKEN': '',
+    'DIR': None,
+    'MAX_PROFILES': 200,
+    'MAX_QUERIES': 1000,
+    'TOGGLE_REFRESH_SECONDS': 5,
+    'EXCLUDE_PATHS': ['/metrics/', '/static/'],
+}
+
+TOGGLE_CACHE_KEY = 'routex:profiling:toggle'
+PROFILE_ID_RE = re.compile(r'^\d{13}-[0-9a-f]{8}$')
+ARTIFACT_KINDS = {'cprofile': 'prof', 'sampling': 'folded'}
+
+_toggle = {'rate': 0.0, 'until': 0.0, 'checked': 0.0}
+
+
+def get_setting(name):
+    return getattr(settings, 'PROFILING', {}).get(name, DEFAULTS[name])
+
+
+def profile_dir():
+    return Path(get_setting('DIR') or Path(settings.BASE_DIR) / 'profiles')
+
+
+# Runtime toggle
+
+def set_runtime_profiling(sample_rate, minutes):
+    """Profile `sample_rate` of requests for the next `minutes` minutes in every process."""
+    value = {'sample_rate': sample_rate, 'until': time.time() + minutes * 60}
+    cache.set(TOGGLE_CACHE_KEY, value, timeout=int(minutes * 60) + 1)
+    _toggle['checked'] = 0.0
+    return value
+
+
+def clear_runtime_profiling():
+    cache.delete(TOGGLE_CACHE_KEY)
+    _toggle['checked'] = 0.0
+
+
+def get_runtime_profiling():
+    value = cache.get(TOGGLE_CACHE_KEY)
+    if not value or value['until'] <= time.time():
+        return None
+    return value
+
+
+def runtime_sample_rate():
+    now = time.time()
+    if now - _toggle['checked'] >= get_setting('TOGGLE_REFRESH_SECONDS'):
+        value = get_runtime_profiling() or {'sample_rate': 0.0, 'until': 0.0}
+        _toggle.update(rate=value['sample_rate'], until=value['until'], checked=now)
+    return _toggle['rate'] if _toggle['until'] > now else 0.0
+
+
+# Capture
+
+class SQLRecorder:
+    """execute_wrapper keeping each statement with its duration."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self.total_ms = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'sql': sql,
+                    'params': repr(params)[:500],
+                    'many': many,
+                    'ms': round(elapsed_ms, 3),
+                })
+
+
+class StackSampler:
+    """Sample one thread's Python stack from a background thread into folded-stack counts."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})')
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+# Storage
+
+def save_profile(metadata, profiler=None, sampler=None):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = metadata['id']
+    if profiler is not None:
+        profiler.dump_stats(directory / f'{profile_id}.prof')
+    if sampler is not None:
+        (directory / f'{profile_id}.folded').write_text(sampler.folded())
+    (directory / f'{profile_id}.json').write_text(json.dumps(metadata, indent=2))
+    prune_profiles(directory)
+
+
+def prune_profiles(directory):
+    keep = get_setting('MAX_PROFILES')
+    for path in sorted(directory.glob('*.json'), reverse=True)[keep:]:
+        for artifact in directory.glob(f'{path.stem}.*'):
+            artifact.unlink(missing_ok=True)
+
+
+def list_profiles():
+    """Newest first, without the SQL log."""
+    profiles = []
+    for path in sorted(profile_dir().glob('*.json'), reverse=True):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        data.pop('queries', None)
+        profiles.append(data)
+    return profiles
+
+
+def load_profile(profile_id):
+    """Return a profile's metadata, or None for an unknown or malformed id."""
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    path = profile_dir() / f'{profile_id}.json'
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def artifact_path(profile_id, kind):
+    """Path of a profile's 'json', 'prof' or 'folded' file, or None if it doesn't exist."""
+    if not PROFILE_ID_RE.match(profile_id) or kind not in ('json', 'prof', 'folded'):
+        return None
+    path = profile_dir() / f'{profile_id}.{kind}'
+    return path if path.exists() else None
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.mode = get_setting('MODE')
+        self.sample_rate = get_setting('SAMPLE_RATE')
+        self.header_token = get_setting('HEADER_TOKEN')
+        self.exclude_paths = tuple(get_setting('EXCLUDE_PATHS'))
+
+    def __call__(self, request):
+        reason = self.profile_reason(request)
+        if reason is None:
+            return self.get_response(request)
+        return self.profile(request, reason)
+
+    def profile_reason(self, request):
+        if request.path.startswith(self.exclude_paths):
+            return None
+        header = request.headers.get('X-Profile')
+        if header:
+            if self.header_token:
+                if constant_time_compare(header, self.header_token):
+                    return 'header'
+            elif settings.DEBUG:
+                return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        rate = runtime_sample_rate()
+        if rate and random.random() < rate:
+            return 'toggle'
+        return None
+
+    def profile(self, request, reason):
+        mode = self.mode
+        profiler = sampler = None
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active in this process (Python 3.12+ allows only one)
+                profiler, mode = None, 'sampling'
+        if mode == 'sampling':
+            sampler = StackSampler(threading.get_ident(), get_setting('SAMPLE_INTERVAL'))
+            sampler.start()
+
+        recorder = SQLRecorder(get_setting('MAX_QUERIES'))
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        profile_id = f'{int(started_at * 1000)}-{uuid.uuid4().hex[:8]}'
+        save_profile({
+            'id': profile_id,
+            'created_at': started_at,
+            'reason': reason,
+            'mode': mode,
+            'artifact': ARTIFACT_KINDS[mode],
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': view_label(request),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 3),
+            'query_count': recorder.count,
+            'query_ms': round(recorder.total_ms, 3),
+            'queries': recorder.queries,
+        }, profiler=profiler, sampler=sampler)
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,12 @@
+from django.urls import path
+from .views import MetricsView, ProfilingToggleView, ProfileListView, ProfileDetailView, ProfileDownloadView
+
+app_name = 'metrics'
+
+urlpatterns = [
+    path('', MetricsView.as_view(), name='metrics'),
+    path('profiling/', ProfilingToggleView.as_view(), name='profiling'),
+    path('profiles/', ProfileListView.as_view(), name='profiles'),
+    path('profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='profile-detail'),
+    path('profiles/<str:profile_id>/download/', ProfileDownloadView.as_view(), name='profile-download'),
+]
@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import instruments  # noqa: F401  (registers the metrics)
+from . import profiling
+from .middleware import get_setting
+from .registry import render
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint; requires `Authorization: Bearer <AUTH_TOKEN>` when a token is set.
+    Without a token, scrapes are only served under DEBUG or from INTERNAL_IPS.
+    """
+
+    def get(self, request):
+        token = get_setting('AUTH_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not constant_time_compare(supplied, f'Bearer {token}'):
+                return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+        elif not settings.DEBUG and request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+            return HttpResponse('Forbidden', status=403, content_type='text/plain')
+        return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+class ProfilingToggleView(APIView):
+    """
+    GET/PUT/DELETE /metrics/profiling/
+    Show, switch on ({"sample_rate": 0.1, "minutes": 10}) or switch off runtime request profiling.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'enabled': profiling.get_setting('ENABLED'),
+            'mode': profiling.get_setting('MODE'),
+            'sample_rate': profiling.get_setting('SAMPLE_RATE'),
+            'runtime': profiling.get_runtime_profiling(),
+        })
+
+    def put(self, request):
+        if not profiling.get_setting('ENABLED'):
+            return Response(
+                {'error': "Profiling middleware is disabled (PROFILING['ENABLED'])"},
+                status=status.HTTP_409_CONFLICT
+            )
+        try:
+            sample_rate = float(request.data.get('sample_rate', 1.0))
+            minutes = float(request.data.get('minutes', 10))
+        except (TypeError, ValueError):
+            return Response({'error': 'sample_rate and minutes must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < sample_rate <= 1 or not 0 < minutes <= 24 * 60:
+            return Response(
+                {'error': 'sample_rate must be in (0, 1] and minutes in (0, 1440]'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'runtime': profiling.set_runtime_profiling(sample_rate, minutes)})
+
+    def delete(self, request):
+        profiling.clear_runtime_profiling()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ProfileListView(APIView):
+    """
+    GET /metrics/profiles/
+    Stored request profiles, newest first.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(profiling.list_profiles())
+
+
+class ProfileDetailView(APIView):
+    """
+    GET /metrics/profiles/<id>/
+    One profile's request details and SQL log.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        profile = profiling.load_profile(profile_id)
+        if profile is None:
+            raise Http404
+        return Response(profile)
+
+
+class ProfileDownloadView(APIView):
+    """
+    GET /metrics/profiles/<id>/download/?kind=prof|folded|json
+    Download a profile artifact; defaults to the profiler output.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        profile = profiling.load_profile(profile_id)
+        if profile is None:
+            raise Http404
+        path = profiling.artifact_path(profile_id, request.query_params.get('kind', profile['artifact']))
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
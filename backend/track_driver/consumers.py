@@ -1,29 +1,52 @@
+import asyncio
 import json
+import logging
+from channels.generic.http import AsyncHttpConsumer
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from channels.exceptions import StopConsumer
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from .models import DriverLocation, DriverAssignment
 from client.models import Parcel
+from client.cache import bump, parcel_scope
+from config.jsoncodec import get_codec, get_setting as get_json_setting
+from geocoding.enrichment import get_address_enricher
+from geocoding.services import get_setting as get_geocoding_setting
+from metrics.instruments import GROUP_SEND_SECONDS, LOCATION_FLUSH_SECONDS, LOCATION_UPDATES, WS_CONNECTIONS
+from .eta import get_eta_engine
+from .geofence import get_geofence_engine, load_driver_fences
+from .positions import get_position_buffer, get_setting as get_stream_setting
+from .outbound import OutboundQueue
+from . import services
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+def tracking_codec(backend=None):
+    """JSON codec for tracking frames: `backend`, else JSON_CODEC['TRACKING_BACKEND'], else ['BACKEND']."""
+    return get_codec(backend or get_json_setting('TRACKING_BACKEND'))
 
 
 class TrackingConsumer(AsyncWebsocketConsumer):
     """WebSocket consumer for real-time driver tracking."""
     
+    # config.jsoncodec backend for frames; None follows JSON_CODEC
+    json_backend = None
+    
     async def connect(self):
         """Handle WebSocket connection."""
         self.user = self.scope.get('user')
+        self.codec = tracking_codec(self.json_backend)
         
         # Check if user is authenticated
         if not self.user or not self.user.is_authenticated:
-            print("[DEBUG] WebSocket connection rejected: User not authenticated")
+            logger.debug('Tracking socket rejected: not authenticated')
             await self.close()
             return
         
-        print(f"[DEBUG] WebSocket connection from user: {self.user.email} (ID: {self.user.id})")
-        
         # Get driver_id and parcel_id from query parameters
         query_string = self.scope.get('query_string', b'').decode()
         params = dict(param.split('=') for param in query_string.split('&') if '=' in param)
@@ -37,11 +60,11 @@ class TrackingConsumer(AsyncWebsocketConsumer):
         
         if is_admin:
             # Admin can view all parcels (read-only)
-            print(f"[DEBUG] Admin connected: {self.user.email}")
             self.role = 'admin'
             self.driver_id = None
             # Admin doesn't need driver group
         elif is_driver:
+            self.role = 'driver'
             # Join driver group for location updates
             self.driver_group_name = f'driver_{self.user_id}'
             await self.channel_layer.group_add(
@@ -51,7 +74,6 @@ class TrackingConsumer(AsyncWebsocketConsumer):
             self.driver_id = self.user_id
         else:
             # Client tracking mode - only subscribe to parcels
-            print(f"[DEBUG] Client connected: {self.user.email}")
             self.role = 'client'
             self.driver_id = None
         
@@ -73,10 +95,20 @@ class TrackingConsumer(AsyncWebsocketConsumer):
         self.update_count = 0
         
         await self.accept()
+        WS_CONNECTIONS.inc(consumer='tracking', role=self.role)
+        logger.debug('Tracking socket connected', extra={'user_id': self.user.id, 'role': self.role, 'parcel_id': self.parcel_id})
+        
+        # Channel-layer events are queued and coalesced per connection, never sent inline
+        self.outbound = OutboundQueue(self.send, encode=self.encode_json)
+        self.outbound.start()
+        
+        # Render the map immediately from the in-memory buffer
+        if self.parcel_id:
+            await self.send_recent_events(self.parcel_id)
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        print(f"[DEBUG] WebSocket disconnection from {self.user.email if hasattr(self, 'user') else 'unknown user'} (code: {close_code})")
+        logger.debug('Tracking socket disconnected', extra={'user_id': getattr(self.scope.get('user'), 'id', None), 'code': close_code})
         
         # Leave driver group if driver
         if hasattr(self, 'driver_group_name'):
@@ -91,20 +123,36 @@ class TrackingConsumer(AsyncWebsocketConsumer):
                 self.parcel_group_name,
                 self.channel_name
             )
+        
+        if hasattr(self, 'outbound'):
+            WS_CONNECTIONS.dec(consumer='tracking', role=self.role)
+            await self.outbound.stop()
+            stats = self.outbound.stats()
+            if stats['coalesced'] or stats['dropped']:
+                logger.info('Tracking socket outbound queue was saturated', extra={'user_id': self.user.id, **stats})
+    
+    def encode_json(self, content):
+        return self.codec.dumps_str(content)
+    
+    def decode_json(self, text_data):
+        return self.codec.loads(text_data)
+    
+    async def send_json(self, content, close=False):
+        await self.send(text_data=self.encode_json(content), close=close)
     
     async def receive(self, text_data):
         """Handle incoming WebSocket messages."""
         try:
-            data = json.loads(text_data)
+            data = self.decode_json(text_data)
             message_type = data.get('type', 'location_update')
             
             # Only drivers can send location updates
             if message_type == 'location_update':
                 if not hasattr(self, 'role') or self.role != 'driver' or not self.driver_id:
-                    await self.send(text_data=json.dumps({
+                    await self.send_json({
                         'type': 'error',
                         'message': 'Only assigned drivers can send location updates'
-                    }))
+                    })
                     return
                 await self.handle_location_update(data)
             elif message_type == 'subscribe_parcel':
@@ -112,17 +160,18 @@ class TrackingConsumer(AsyncWebsocketConsumer):
             elif message_type == 'unsubscribe_parcel':
                 await self.handle_unsubscribe_parcel(data)
         except json.JSONDecodeError as e:
-            print(f"[ERROR] JSON decode error from {self.user.email}: {e}")
-            await self.send(text_data=json.dumps({
+            # Both codecs raise it (orjson.JSONDecodeError is a subclass)
+            logger.warning('Invalid JSON on tracking socket from user %s: %s', self.user.id, e)
+            await self.send_json({
                 'type': 'error',
                 'message': 'Invalid JSON format'
-            }))
+            })
         except Exception as e:
-            print(f"[ERROR] Unexpected error in receive() from {self.user.email}: {e}")
-            await self.send(text_data=json.dumps({
+            logger.exception('Unexpected error handling tracking message from user %s', self.user.id)
+            await self.send_json({
                 'type': 'error',
                 'message': str(e)
-            }))
+            })
     
     async def handle_location_update(self, data):
         """Handle location update from driver."""
@@ -132,17 +181,25 @@ class TrackingConsumer(AsyncWebsocketConsumer):
         parcel_id = data.get('parcel_id', self.parcel_id)
         
         if not lat or not lng:
-            print(f"[ERROR] Invalid location update - missing lat/lng from {self.user.email}")
-            await self.send(text_data=json.dumps({
+            logger.warning('Location update without lat/lng from user %s', self.user.id)
+            await self.send_json({
                 'type': 'error',
                 'message': 'Latitude and longitude are required'
-            }))
+            })
             return
         
-        print(f"[DEBUG] Location update from {self.user.email}: lat={lat}, lng={lng}, parcel_id={parcel_id}, update_count={self.update_count + 1}")
-        
         # Increment update count
         self.update_count += 1
+        LOCATION_UPDATES.inc()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Location update', extra={
+                'sampled': True,
+                'driver_id': self.user_id,
+                'parcel_id': parcel_id,
+                'lat': lat,
+                'lng': lng,
+                'update_count': self.update_count,
+            })
         
         # Create location payload matching frontend Location type
         location_payload = {
@@ -153,92 +210,143 @@ class TrackingConsumer(AsyncWebsocketConsumer):
         
         # Save to database every 5th update
         if self.update_count % 5 == 0:
-            await self.save_location_to_db(
-                self.user.id,
-                parcel_id,
-                lat,
-                lng,
-                address
-            )
+            with LOCATION_FLUSH_SECONDS.time():
+                location_id = await self.save_location_to_db(
+                    self.user.id,
+                    parcel_id,
+                    lat,
+                    lng,
+                    address
+                )
+            # Fill in missing addresses off the hot path
+            if location_id and not address and get_geocoding_setting('ENRICH_ADDRESSES'):
+                get_address_enricher().enqueue(location_id, lat, lng)
         
-        # Get all parcels assigned to this driver for broadcasting
+        # Feed the ETA engine before computing per-parcel estimates
+        eta_engine = get_eta_engine()
+        eta_engine.observe(self.user_id, lat, lng)
+        
+        # Geofence checks run against a cached per-driver fence list
+        await self.process_geofences(lat, lng)
+        
+        # Get all parcels assigned to this driver (with drop points) for broadcasting
         assigned_parcels = await self.get_assigned_parcels(self.user.id)
         
         # Broadcast to parcel groups for all assigned parcels
-        for p_id in assigned_parcels:
-            await self.channel_layer.group_send(
-                f'parcel_{p_id}',
-                {
-                    'type': 'driver_location',
-                    'driver_id': self.user_id,
-                    'lat': float(lat),
-                    'lng': float(lng),
-                    'address': address,
-                    'timestamp': timezone.now().isoformat(),
-                    'parcel_id': p_id
-                }
-            )
+        for p_id, (drop_lat, drop_lng, pickup) in assigned_parcels.items():
+            await self.broadcast_to_parcel(p_id, {
+                'type': 'driver_location',
+                'driver_id': self.user_id,
+                'lat': float(lat),
+                'lng': float(lng),
+                'address': address,
+                'timestamp': timezone.now().isoformat(),
+                'parcel_id': p_id,
+                'eta': eta_engine.eta_for_parcel(p_id, self.user_id, lat, lng, drop_lat, drop_lng, pickup)
+            })
         
         # If specific parcel_id provided, also broadcast to that group
         if parcel_id and str(parcel_id) not in [str(p) for p in assigned_parcels]:
-            await self.channel_layer.group_send(
-                f'parcel_{parcel_id}',
-                {
-                    'type': 'driver_location',
-                    'driver_id': self.user_id,
-                    'lat': float(lat),
-                    'lng': float(lng),
-                    'address': address,
-                    'timestamp': timezone.now().isoformat(),
-                    'parcel_id': parcel_id
-                }
-            )
+            await self.broadcast_to_parcel(parcel_id, {
+                'type': 'driver_location',
+                'driver_id': self.user_id,
+                'lat': float(lat),
+                'lng': float(lng),
+                'address': address,
+                'timestamp': timezone.now().isoformat(),
+                'parcel_id': parcel_id,
+                'eta': None
+            })
         
         # Also send to driver group (for driver's own updates)
         if hasattr(self, 'driver_group_name'):
-            await self.channel_layer.group_send(
-                self.driver_group_name,
-                {
-                    'type': 'driver_location',
-                    'driver_id': self.user_id,
-                    'lat': float(lat),
-                    'lng': float(lng),
-                    'address': address,
-                    'timestamp': timezone.now().isoformat(),
-                    'parcel_id': parcel_id
-                }
+            with GROUP_SEND_SECONDS.time(group='driver'):
+                await self.channel_layer.group_send(
+                    self.driver_group_name,
+                    {
+                        'type': 'driver_location',
+                        'driver_id': self.user_id,
+                        'lat': float(lat),
+                        'lng': float(lng),
+                        'address': address,
+                        'timestamp': timezone.now().isoformat(),
+                        'parcel_id': parcel_id,
+                        'eta': eta_engine.get_cached(int(parcel_id)) if str(parcel_id).isdigit() else None
+                    }
+                )
+    
+    async def broadcast_to_parcel(self, parcel_id, event):
+        """Record an event in the parcel's ring buffer and send it to the parcel group."""
+        if str(parcel_id).isdigit():
+            event['event_id'] = get_position_buffer().record(parcel_id, event)
+        with GROUP_SEND_SECONDS.time(group='parcel'):
+            await self.channel_layer.group_send(f'parcel_{parcel_id}', event)
+    
+    async def process_geofences(self, lat, lng):
+        """Emit geofence enter/exit events and apply configured automatic transitions."""
+        engine = get_geofence_engine()
+        if engine.needs_refresh(self.user.id):
+            fences = await database_sync_to_async(load_driver_fences)(self.user.id)
+            engine.set_fences(self.user.id, fences)
+        
+        for event in engine.check(self.user.id, lat, lng):
+            event['applied'] = False
+            if event['auto_status']:
+                event['applied'] = await self.apply_geofence_transition(
+                    event['parcel_id'],
+                    event['auto_status'],
+                    event
+                )
+            
+            await self.send_json({'type': 'geofence_event', **event})
+            with GROUP_SEND_SECONDS.time(group='parcel'):
+                await self.channel_layer.group_send(
+                    f"parcel_{event['parcel_id']}",
+                    {'type': 'geofence_event', 'driver_id': self.user_id, **event}
+                )
+    
+    @database_sync_to_async
+    def apply_geofence_transition(self, parcel_id, new_status, event):
+        """Apply an automatic status transition triggered by a geofence event."""
+        try:
+            assignment = DriverAssignment.objects.select_related('parcel', 'parcel__client').get(
+                parcel_id=parcel_id,
+                driver_id=self.user.id
+            )
+            services.update_parcel_status(
+                assignment,
+                new_status,
+                actor=self.user,
+                notes=f"Automatic transition on {event['fence']} geofence {event['event']}"
             )
+            return True
+        except (DriverAssignment.DoesNotExist, ValueError) as e:
+            logger.warning('Geofence transition for parcel %s failed: %s', parcel_id, e)
+            return False
     
     @database_sync_to_async
     def get_assigned_parcels(self, driver_id):
-        """Get all parcel IDs assigned to this driver."""
+        """Get this driver's active parcels as {parcel_id: (drop_lat, drop_lng, pickup)}.
+        
+        pickup is the (lat, lng) still to visit for parcels not yet picked up,
+        else None. Delivered parcels are announced once by
+        services.update_parcel_status.
+        """
         try:
             assignments = DriverAssignment.objects.filter(
                 driver_id=driver_id,
                 parcel__current_status__in=['assigned', 'picked_up', 'in_transit', 'out_for_delivery']
-            ).values_list('parcel_id', flat=True)
-            
-            # Check if any parcel has been delivered and send tracking_ended
-            delivered_parcels = DriverAssignment.objects.filter(
-                driver_id=driver_id,
-                parcel__current_status='delivered'
-            ).values_list('parcel_id', flat=True)
-            
-            # Send tracking_ended message for delivered parcels
-            for parcel_id in delivered_parcels:
-                self.channel_layer.group_send(
-                    f'parcel_{parcel_id}',
-                    {
-                        'type': 'tracking_ended',
-                        'parcel_id': parcel_id,
-                        'message': 'Parcel has been delivered. Tracking has ended.'
-                    }
-                )
-            
-            return list(assignments)
-        except Exception as e:
-            print(f"Error getting assigned parcels: {e}")
-            return []
+            ).values_list(
+                'parcel_id', 'parcel__current_status', 'parcel__drop_lat', 'parcel__drop_lng',
+                'parcel__pickup_lat', 'parcel__pickup_lng'
+            )
+            return {
+                p_id: (drop_lat, drop_lng, (pickup_lat, pickup_lng) if status == 'assigned' else None)
+                for p_id, status, drop_lat, drop_lng, pickup_lat, pickup_lng in assignments
+            }
+        except Exception:
+            logger.exception('Failed to load assigned parcels for driver %s', driver_id)
+            return {}
     
     async def handle_subscribe_parcel(self, data):
         """Handle subscription to a parcel's location updates."""
@@ -249,10 +357,10 @@ class TrackingConsumer(AsyncWebsocketConsumer):
             has_access = await self.verify_parcel_access(self.user.id, parcel_id, is_driver)
             
             if not has_access:
-                await self.send(text_data=json.dumps({
+                await self.send_json({
                     'type': 'error',
                     'message': 'You do not have access to track this parcel'
-                }))
+                })
                 return
             
             parcel_group_name = f'parcel_{parcel_id}'
@@ -262,10 +370,20 @@ class TrackingConsumer(AsyncWebsocketConsumer):
             )
             if not hasattr(self, 'parcel_group_name'):
                 self.parcel_group_name = parcel_group_name
-            await self.send(text_data=json.dumps({
+            await self.send_json({
                 'type': 'subscribed',
                 'parcel_id': parcel_id
-            }))
+            })
+            await self.send_recent_events(parcel_id)
+    
+    async def send_recent_events(self, parcel_id):
+        """Replay the parcel's buffered positions (oldest first) without touching the DB."""
+        if not str(parcel_id).isdigit():
+            return
+        for _, event in get_position_buffer().recent(parcel_id):
+            if event['type'] == 'driver_location':
+                # Queued without a coalescing key so the whole trail is delivered
+                self.outbound.put(self.location_message(event), droppable=True)
     
     async def handle_unsubscribe_parcel(self, data):
         """Handle unsubscription from a parcel's location updates."""
@@ -276,30 +394,56 @@ class TrackingConsumer(AsyncWebsocketConsumer):
                 parcel_group_name,
                 self.channel_name
             )
-            await self.send(text_data=json.dumps({
+            await self.send_json({
                 'type': 'unsubscribed',
                 'parcel_id': parcel_id
-            }))
+            })
     
     async def driver_location(self, event):
-        """Send driver location update to WebSocket (handler for channel layer)."""
-        await self.send(text_data=json.dumps({
+        """Queue driver location update for the WebSocket (handler for channel layer).
+        
+        Only the freshest position per (parcel, driver) is kept while the client lags.
+        """
+        self.outbound.put(
+            self.location_message(event),
+            key=('driver_location', str(event.get('parcel_id')), event['driver_id']),
+            droppable=True
+        )
+    
+    def location_message(self, event):
+        return {
             'type': 'driver_location',
             'driver_id': event['driver_id'],
             'lat': event['lat'],
             'lng': event['lng'],
             'address': event['address'],
             'timestamp': event['timestamp'],
-            'parcel_id': event.get('parcel_id')
-        }))
+            'parcel_id': event.get('parcel_id'),
+            'eta': event.get('eta')
+        }
+    
+    async def geofence_event(self, event):
+        """Send geofence event to WebSocket (handler for channel layer)."""
+        # The originating driver already received this event directly
+        if event.get('driver_id') == getattr(self, 'user_id', None):
+            return
+        self.outbound.put({
+            'type': 'geofence_event',
+            'parcel_id': event['parcel_id'],
+            'fence': event['fence'],
+            'event': event['event'],
+            'distance_m': event['distance_m'],
+            'suggested_status': event['suggested_status'],
+            'applied': event['applied']
+        })
     
     async def tracking_ended(self, event):
-        """Send tracking_ended message to WebSocket (handler for channel layer)."""
-        await self.send(text_data=json.dumps({
+        """Queue tracking_ended message for the WebSocket (handler for channel layer)."""
+        self.outbound.put({
             'type': 'tracking_ended',
             'parcel_id': event['parcel_id'],
             'message': event['message']
-        }))
+        })
     
     @database_sync_to_async
     def is_admin(self, user_id):
@@ -341,7 +485,7 @@ class TrackingConsumer(AsyncWebsocketConsumer):
     
     @database_sync_to_async
     def save_location_to_db(self, driver_id, parcel_id, lat, lng, address):
-        """Save driver location to database."""
+        """Save driver location to database and return the new row's id."""
         try:
             driver = User.objects.get(id=driver_id)
             parcel = None
@@ -351,14 +495,146 @@ class TrackingConsumer(AsyncWebsocketConsumer):
                 except Parcel.DoesNotExist:
                     pass
             
-            DriverLocation.objects.create(
+            location = DriverLocation.objects.create(
                 driver=driver,
                 parcel=parcel,
                 latitude=lat,
                 longitude=lng,
                 address=address or ''
             )
-        except Exception as e:
+            if parcel:
+                # The parcel detail payload embeds the last driver location
+                bump(parcel_scope(parcel.id))
+            return location.id
+        except Exception:
             # Log error but don't break the WebSocket connection
-            print(f"Error saving location to DB: {e}")
+            logger.exception('Failed to save location for driver %s', driver_id)
+            return None
+
+
 
+class TrackingStreamConsumer(AsyncHttpConsumer):
+    """
+    Server-Sent Events stream for a single parcel.
+    
+    GET /sse/tracking/<parcel_id>/?token=<JWT> streams the parcel group's
+    driver_location and tracking_ended events. Reconnects send
+    Last-Event-ID (or ?last_event_id=) and receive the events they missed
+    from the parcel's ring buffer.
+    """
+    
+    # config.jsoncodec backend for event data; None follows JSON_CODEC
+    json_backend = None
+    
+    async def http_request(self, message):
+        """Run handle() once the request is read, but keep the consumer alive to stream."""
+        if 'body' in message:
+            self.body.append(message['body'])
+        if not message.get('more_body'):
+            await self.handle(b''.join(self.body))
+    
+    async def handle(self, body):
+        self.user = self.scope.get('user')
+        self.codec = tracking_codec(self.json_backend)
+        self.parcel_id = int(self.scope['url_route']['kwargs']['parcel_id'])
+        
+        if not self.user or not self.user.is_authenticated:
+            await self.reject(401, b'Authentication required')
+            return
+        if not await self.can_track_parcel(self.user, self.parcel_id):
+            await self.reject(403, b'You do not have access to track this parcel')
+            return
+        
+        await self.send_headers(headers=[
+            (b'Content-Type', b'text/event-stream'),
+            (b'Cache-Control', b'no-cache'),
+            (b'X-Accel-Buffering', b'no'),
+            *self.cors_headers(),
+        ])
+        
+        # Join before replaying so nothing falls between the two; duplicates are skipped by id
+        self.parcel_group_name = f'parcel_{self.parcel_id}'
+        await self.channel_layer.group_add(self.parcel_group_name, self.channel_name)
+        WS_CONNECTIONS.inc(consumer='tracking_sse', role=self.user.role)
+        
+        self.last_event_id = self.requested_last_event_id()
+        await self.send_body(b'retry: 3000\n\n', more_body=True)
+        if self.last_event_id is not None:
+            for event_id, event in get_position_buffer().since(self.parcel_id, self.last_event_id):
+                await self.send_event(event, event_id)
+        
+        self.keepalive_task = asyncio.ensure_future(self.keepalive())
+    
+    async def reject(self, status, message):
+        await self.send_response(status, message, headers=[
+            (b'Content-Type', b'text/plain'),
+            *self.cors_headers(),
+        ])
+        raise StopConsumer()
+    
+    def cors_headers(self):
+        """EventSource is cross-origin in development; mirror the REST CORS allow-list."""
+        origin = dict(self.scope.get('headers', [])).get(b'origin', b'')
+        if origin and origin.decode() in getattr(settings, 'CORS_ALLOWED_ORIGINS', []):
+            return [(b'Access-Control-Allow-Origin', origin), (b'Vary', b'Origin')]
+        return []
+    
+    def requested_last_event_id(self):
+        value = dict(self.scope.get('headers', [])).get(b'last-event-id', b'').decode()
+        if not value:
+            query_string = self.scope.get('query_string', b'').decode()
+            params = dict(param.split('=', 1) for param in query_string.split('&') if '=' in param)
+            value = params.get('last_event_id', '')
+        return int(value) if value.isdigit() else None
+    
+    async def keepalive(self):
+        """Send a comment line periodically so proxies don't time the stream out."""
+        interval = get_stream_setting('KEEPALIVE_SECONDS')
+        while True:
+            await asyncio.sleep(interval)
+            await self.send_body(b': keepalive\n\n', more_body=True)
+    
+    async def send_event(self, event, event_id=None):
+        event_id = event_id if event_id is not None else event.get('event_id')
+        if event_id is not None:
+            if self.last_event_id is not None and event_id <= self.last_event_id:
+                return
+            self.last_event_id = event_id
+        
+        payload = {key: value for key, value in event.items() if key != 'event_id'}
+        chunk = f"event: {event['type']}\n"
+        if event_id is not None:
+            chunk += f'id: {event_id}\n'
+        await self.send_body(chunk.encode() + b'data: ' + self.codec.dumps(payload) + b'\n\n', more_body=True)
+    
+    async def driver_location(self, event):
+        await self.send_event(event)
+    
+    async def tracking_ended(self, event):
+        """Send the final event and close the stream."""
+        await self.send_event(event)
+        await self.send_body(b'')
+        await self.disconnect()
+        raise StopConsumer()
+    
+    async def geofence_event(self, event):
+        # Geofence events are only delivered over the WebSocket
+        pass
+    
+    async def disconnect(self):
+        if getattr(self, 'keepalive_task', None):
+            self.keepalive_task.cancel()
+            self.keepalive_task = None
+        if hasattr(self, 'parcel_group_name'):
+            WS_CONNECTIONS.dec(consumer='tracking_sse', role=self.user.role)
+            await self.channel_layer.group_discard(self.parcel_group_name, self.channel_name)
+            del self.parcel_group_name
+    
+    @database_sync_to_async
+    def can_track_parcel(self, user, parcel_id):
+        """Admins may watch any parcel, drivers their assigned parcels, clients their own."""
+        if user.role == 'admin':
+            return Parcel.objects.filter(id=parcel_id).exists()
+        if DriverAssignment.objects.filter(driver_id=user.id, parcel_id=parcel_id).exists():
+            return True
+        return Parcel.objects.filter(id=parcel_id, client_id=user.id).exists()
@@ -0,0 +1,135 @@
+"""
+ETA estimation for in-flight parcels.
+
+Each driver keeps a short rolling window of recent positions fed from the
+location pipeline; its rolling speed is the distance covered across the
+window divided by the time it spans. A parcel's ETA is the remaining road
+distance to its drop point divided by that speed. Until the parcel is
+picked up, the remaining distance runs through its pickup point
+(driver -> pickup -> drop, each leg road-factored on its own); without
+pickup coordinates there is no ETA.
+
+ETAs are cached per parcel together with the position they were computed
+from, and are only recomputed once the driver has moved more than
+RECOMPUTE_METERS or the cached value is older than MAX_AGE_SECONDS.
+"""
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from client.distance import haversine_km, road_factor
+
+DEFAULTS = {
+    'WINDOW_POINTS': 10,
+    'WINDOW_SECONDS': 300,
+    'DEFAULT_SPEED_KMH': 25.0,
+    'MIN_SPEED_KMH': 5.0,
+    'MAX_SPEED_KMH': 120.0,
+    'RECOMPUTE_METERS': 100,
+    'MAX_AGE_SECONDS': 60,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'ETA', {}).get(name, DEFAULTS[name])
+
+
+def road_km(lat1, lng1, lat2, lng2):
+    """Estimated road distance between two points."""
+    straight_km = haversine_km(lat1, lng1, lat2, lng2)
+    return straight_km * road_factor(straight_km)
+
+
+class EtaEngine:
+    """Rolling-speed ETA estimator with a per-parcel cache."""
+
+    def __init__(self):
+        self._tracks = {}
+        self._cache = {}
+
+    def observe(self, driver_id, lat, lng, at=None):
+        """Record a driver position."""
+        track = self._tracks.get(driver_id)
+        if track is None:
+            track = self._tracks[driver_id] = deque(maxlen=get_setting('WINDOW_POINTS'))
+        track.append((at if at is not None else time.time(), float(lat), float(lng)))
+
+    def speed_kmh(self, driver_id):
+        """Rolling speed over the driver's recent window, clamped to sane bounds."""
+        track = self._tracks.get(driver_id)
+        if not track or len(track) < 2:
+            return get_setting('DEFAULT_SPEED_KMH')
+
+        newest = track[-1][0]
+        points = [p for p in track if newest - p[0] <= get_setting('WINDOW_SECONDS')]
+        elapsed = points[-1][0] - points[0][0]
+        if len(points) < 2 or elapsed <= 0:
+            return get_setting('DEFAULT_SPEED_KMH')
+
+        distance = 0.0
+        for (_, lat1, lng1), (_, lat2, lng2) in zip(points, points[1:]):
+            distance += haversine_km(lat1, lng1, lat2, lng2)
+
+        speed = distance / (elapsed / 3600.0)
+        return min(max(speed, get_setting('MIN_SPEED_KMH')), get_setting('MAX_SPEED_KMH'))
+
+    def eta_for_parcel(self, parcel_id, driver_id, lat, lng, drop_lat, drop_lng, pickup=None):
+        """Return the ETA payload for a parcel, reusing the cached one if still fresh.
+
+        `pickup` is the (lat, lng) of a pickup still ahead of the driver, or
+        None once the parcel is picked up.
+        """
+        if drop_lat is None or drop_lng is None:
+            return None
+        if pickup is not None and (pickup[0] is None or pickup[1] is None):
+            return None
+
+        lat = float(lat)
+        lng = float(lng)
+        now = time.time()
+        cached = self._cache.get(parcel_id)
+        if cached is not None:
+            cached_lat, cached_lng, computed_at, via_pickup, payload = cached
+            moved_m = haversine_km(cached_lat, cached_lng, lat, lng) * 1000
+            if (via_pickup == (pickup is not None) and moved_m < get_setting('RECOMPUTE_METERS')
+                    and now - computed_at < get_setting('MAX_AGE_SECONDS')):
+                return payload
+
+        if pickup is None:
+            remaining_km = road_km(lat, lng, drop_lat, drop_lng)
+        else:
+            pickup_lat, pickup_lng = pickup
+            remaining_km = road_km(lat, lng, pickup_lat, pickup_lng) + road_km(pickup_lat, pickup_lng, drop_lat, drop_lng)
+        speed = self.speed_kmh(driver_id)
+        seconds = int(remaining_km / speed * 3600)
+        payload = {
+            'eta': (timezone.now() + timedelta(seconds=seconds)).isoformat(),
+            'eta_seconds': seconds,
+            'remaining_km': round(remaining_km, 2),
+            'speed_kmh': round(speed, 1),
+            'via_pickup': pickup is not None,
+        }
+        self._cache[parcel_id] = (lat, lng, now, pickup is not None, payload)
+        return payload
+
+    def get_cached(self, parcel_id):
+        """Return the last computed ETA payload for a parcel, if any."""
+        cached = self._cache.get(parcel_id)
+        return cached[-1] if cached else None
+
+    def forget_parcel(self, parcel_id):
+        self._cache.pop(parcel_id, None)
+
+
+_engine = None
+
+
+def get_eta_engine():
+    """Return the process-wide EtaEngine."""
+    global _engine
+    if _engine is None:
+        _engine = EtaEngine()
+    return _engine
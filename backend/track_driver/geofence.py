@@ -0,0 +1,168 @@
+"""
+Geofencing for driver positions.
+
+For every driver the engine keeps a precomputed list of circular fences
+around the pickup and drop points of their active parcels. Checking a ping
+is plain arithmetic over that list (an equirectangular distance against a
+squared radius), with no database access. Fence lists are rebuilt lazily
+after invalidate_driver() (called whenever a driver's parcels change status
+or assignment) or once they are older than REFRESH_SECONDS.
+
+check() returns enter/exit events. Exits use a slightly larger radius than
+entries so GPS jitter at the boundary does not produce event storms.
+"""
+import math
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+DEFAULTS = {
+    'PICKUP_RADIUS_M': 150,
+    'DROP_RADIUS_M': 150,
+    'EXIT_HYSTERESIS': 1.2,
+    'REFRESH_SECONDS': 60,
+    # {(fence_kind, event): {current_status: new_status}} applied automatically
+    'AUTO_TRANSITIONS': {},
+}
+
+# Status a driver is expected to move to after entering a fence
+SUGGESTED_TRANSITIONS = {
+    ('pickup', 'enter'): {'assigned': 'picked_up'},
+    ('pickup', 'exit'): {'picked_up': 'in_transit'},
+    ('drop', 'enter'): {'in_transit': 'out_for_delivery', 'out_for_delivery': 'delivered'},
+}
+
+# Which fence is live for a parcel in a given status
+PICKUP_STATUSES = {'assigned', 'picked_up'}
+DROP_STATUSES = {'picked_up', 'in_transit', 'out_for_delivery'}
+
+METERS_PER_DEGREE_LAT = 110574.0
+METERS_PER_DEGREE_LNG = 111320.0
+
+
+def get_setting(name):
+    return getattr(settings, 'GEOFENCE', {}).get(name, DEFAULTS[name])
+
+
+@dataclass(frozen=True)
+class Fence:
+    parcel_id: int
+    kind: str
+    status: str
+    lat: float
+    lng: float
+    enter_radius_sq: float
+    exit_radius_sq: float
+    lng_scale: float
+
+    @classmethod
+    def build(cls, parcel_id, kind, status, lat, lng, radius_m):
+        lat = float(lat)
+        exit_radius = radius_m * get_setting('EXIT_HYSTERESIS')
+        return cls(
+            parcel_id=parcel_id,
+            kind=kind,
+            status=status,
+            lat=lat,
+            lng=float(lng),
+            enter_radius_sq=radius_m * radius_m,
+            exit_radius_sq=exit_radius * exit_radius,
+            lng_scale=METERS_PER_DEGREE_LNG * math.cos(math.radians(lat)),
+        )
+
+    def distance_sq(self, lat, lng):
+        dy = (lat - self.lat) * METERS_PER_DEGREE_LAT
+        dx = (lng - self.lng) * self.lng_scale
+        return dx * dx + dy * dy
+
+
+def load_driver_fences(driver_id):
+    """Build the fence list for a driver's active parcels (one query)."""
+    from .models import DriverAssignment
+
+    rows = DriverAssignment.objects.filter(
+        driver_id=driver_id,
+        parcel__current_status__in=PICKUP_STATUSES | DROP_STATUSES
+    ).values_list(
+        'parcel_id', 'parcel__current_status',
+        'parcel__pickup_lat', 'parcel__pickup_lng',
+        'parcel__drop_lat', 'parcel__drop_lng',
+    )
+
+    fences = []
+    for parcel_id, status, pickup_lat, pickup_lng, drop_lat, drop_lng in rows:
+        if status in PICKUP_STATUSES and pickup_lat is not None and pickup_lng is not None:
+            fences.append(Fence.build(parcel_id, 'pickup', status, pickup_lat, pickup_lng,
+                                      get_setting('PICKUP_RADIUS_M')))
+        if status in DROP_STATUSES and drop_lat is not None and drop_lng is not None:
+            fences.append(Fence.build(parcel_id, 'drop', status, drop_lat, drop_lng,
+                                      get_setting('DROP_RADIUS_M')))
+    return fences
+
+
+class GeofenceEngine:
+    """Per-driver fence lists and inside/outside state."""
+
+    def __init__(self):
+        self._fences = {}
+        self._inside = {}
+
+    def needs_refresh(self, driver_id):
+        entry = self._fences.get(driver_id)
+        return entry is None or time.monotonic() - entry[0] > get_setting('REFRESH_SECONDS')
+
+    def set_fences(self, driver_id, fences):
+        self._fences[driver_id] = (time.monotonic(), fences)
+        live = {(f.parcel_id, f.kind) for f in fences}
+        inside = self._inside.get(driver_id)
+        if inside:
+            inside &= live
+
+    def invalidate_driver(self, driver_id):
+        self._fences.pop(driver_id, None)
+
+    def check(self, driver_id, lat, lng):
+        """Return enter/exit events for a driver position."""
+        entry = self._fences.get(driver_id)
+        if not entry:
+            return []
+
+        lat = float(lat)
+        lng = float(lng)
+        inside = self._inside.setdefault(driver_id, set())
+        events = []
+        for fence in entry[1]:
+            key = (fence.parcel_id, fence.kind)
+            distance_sq = fence.distance_sq(lat, lng)
+            if key in inside:
+                if distance_sq > fence.exit_radius_sq:
+                    inside.discard(key)
+                    events.append(self._event(fence, 'exit', distance_sq))
+            elif distance_sq <= fence.enter_radius_sq:
+                inside.add(key)
+                events.append(self._event(fence, 'enter', distance_sq))
+        return events
+
+    def _event(self, fence, event, distance_sq):
+        transition_key = (fence.kind, event)
+        return {
+            'parcel_id': fence.parcel_id,
+            'fence': fence.kind,
+            'event': event,
+            'status': fence.status,
+            'distance_m': round(math.sqrt(distance_sq), 1),
+            'suggested_status': SUGGESTED_TRANSITIONS.get(transition_key, {}).get(fence.status),
+            'auto_status': get_setting('AUTO_TRANSITIONS').get(transition_key, {}).get(fence.status),
+        }
+
+
+_engine = None
+
+
+def get_geofence_engine():
+    """Return the process-wide GeofenceEngine."""
+    global _engine
+    if _engine is None:
+        _engine = GeofenceEngine()
+    return _engine
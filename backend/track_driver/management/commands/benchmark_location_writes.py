@@ -0,0 +1,204 @@
+"""
+Concurrent DriverLocation write benchmark for the active database profile.
+
+Writer threads insert driver locations the way the tracking consumer's
+periodic flush does: one autocommit INSERT each, from a thread pool. Reader
+threads meanwhile fetch each parcel's latest location, the query behind
+the tracking endpoints. Writers share one database, so this measures how the
+profile from config.database copes with write contention. Compare with
+stock SQLite:
+
+    python manage.py benchmark_location_writes --writers 16 --readers 4
+    DB_SQLITE_TUNED=0 python manage.py benchmark_location_writes --writers 16 --readers 4
+    DB_ENGINE=django.db.backends.postgresql DB_NAME=routex \\
+        python manage.py benchmark_location_writes --writers 16 --readers 4
+
+Reports write/read throughput, latency percentiles and failed writes
+("database is locked" and the like). Uses the fleet helpers of
+loadtest_tracking and removes its data afterwards.
+"""
+import json
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from track_driver.management.commands.loadtest_tracking import (
+    BASE_LAT, BASE_LNG, Command as LoadTestCommand, percentile,
+)
+from track_driver.models import DriverLocation
+
+
+def latency_summary(latencies):
+    latencies = sorted(latencies)
+    return {
+        name: round(percentile(latencies, pct), 3) if latencies else None
+        for name, pct in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent driver location writes (with readers) on the configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Writer threads (one driver and parcel each)')
+        parser.add_argument('--readers', type=int, default=2, help='Reader threads polling latest locations')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run for')
+        parser.add_argument('--hz', type=float, default=0.0,
+                            help='Writes per second per writer (0: as fast as possible)')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--max-p95-ms', type=float, default=None,
+                            help='Fail if p95 write latency exceeds this many milliseconds')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the generated users and locations')
+
+    def handle(self, *args, **options):
+        fleet_helper = LoadTestCommand()
+        fleet_helper.cleanup()
+        try:
+            fleet = fleet_helper.create_fleet(options['writers'])
+            result = self.run_threads(fleet, options)
+        finally:
+            if not options['keep_data']:
+                fleet_helper.cleanup()
+
+        report = self.build_report(result, options)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+        if options['max_p95_ms'] is not None and (report['writes']['latency_ms']['p95'] or 0) > options['max_p95_ms']:
+            raise CommandError(
+                f"p95 write latency {report['writes']['latency_ms']['p95']}ms exceeds budget {options['max_p95_ms']}ms"
+            )
+
+    def run_threads(self, fleet, options):
+        rng = random.Random(options['seed'])
+        interval = 1.0 / options['hz'] if options['hz'] else 0.0
+        parcel_ids = [driver['parcel_id'] for driver in fleet]
+        barrier = threading.Barrier(len(fleet) + options['readers'] + 1)
+        lock = threading.Lock()
+        results = {'write_ms': [], 'read_ms': [], 'errors': {}}
+
+        def record(key, latencies):
+            with lock:
+                results[key].extend(latencies)
+
+        def write(driver, heading):
+            latencies = []
+            errors = {}
+            try:
+                barrier.wait()
+                deadline = time.perf_counter() + options['duration']
+                step = 0
+                while time.perf_counter() < deadline:
+                    step += 1
+                    started = time.perf_counter()
+                    try:
+                        DriverLocation.objects.create(
+                            driver_id=int(driver['driver_id']),
+                            parcel_id=driver['parcel_id'],
+                            latitude=Decimal(f'{BASE_LAT + heading[0] * step * 1e-5:.7f}'),
+                            longitude=Decimal(f'{BASE_LNG + heading[1] * step * 1e-5:.7f}'),
+                            address='',
+                        )
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    except DatabaseError as e:
+                        errors[str(e)] = errors.get(str(e), 0) + 1
+                    if interval:
+                        time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+            finally:
+                connection.close()
+                record('write_ms', latencies)
+                with lock:
+                    for message, count in errors.items():
+                        results['errors'][message] = results['errors'].get(message, 0) + count
+
+        def read(seed):
+            reader_rng = random.Random(seed)
+            latencies = []
+            try:
+                barrier.wait()
+                deadline = time.perf_counter() + options['duration']
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    DriverLocation.objects.filter(parcel_id=reader_rng.choice(parcel_ids)).order_by('-timestamp').first()
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+                record('read_ms', latencies)
+
+        threads = [
+            threading.Thread(target=write, args=(driver, (rng.uniform(-1, 1), rng.uniform(-1, 1))))
+            for driver in fleet
+        ]
+        threads += [threading.Thread(target=read, args=(rng.random(),)) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def database_profile(self):
+        settings_dict = connection.settings_dict
+        profile = {
+            'vendor': connection.vendor,
+            'name': str(settings_dict['NAME']),
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'conn_health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+            'pool': bool(settings_dict['OPTIONS'].get('pool')),
+        }
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size'):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    profile[pragma] = cursor.fetchone()[0]
+            profile['transaction_mode'] = connection.transaction_mode
+        return profile
+
+    def build_report(self, result, options):
+        elapsed = result['elapsed'] or 1e-9
+        writes = len(result['write_ms'])
+        failed = sum(result['errors'].values())
+        return {
+            'database': self.database_profile(),
+            'writers': options['writers'],
+            'readers': options['readers'],
+            'hz': options['hz'] or None,
+            'duration_s': round(elapsed, 3),
+            'writes': {
+                'count': writes,
+                'per_second': round(writes / elapsed, 2),
+                'failed': failed,
+                'errors': result['errors'],
+                'latency_ms': latency_summary(result['write_ms']),
+            },
+            'reads': {
+                'count': len(result['read_ms']),
+                'per_second': round(len(result['read_ms']) / elapsed, 2),
+                'latency_ms': latency_summary(result['read_ms']),
+            },
+        }
+
+    def print_report(self, report):
+        database = report['database']
+        details = ', '.join(f'{key}={value}' for key, value in database.items() if key not in ('vendor', 'name'))
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['writers']} writer(s), {report['readers']} reader(s) for {report['duration_s']}s "
+            f"on {database['vendor']} ({details})"
+        ))
+        for kind in ('writes', 'reads'):
+            stats = report[kind]
+            latency = ' '.join(f'{name}={value}' for name, value in stats['latency_ms'].items())
+            self.stdout.write(f"  {kind + ':':<8} {stats['count']} ({stats['per_second']}/s)  latency ms: {latency}")
+        if report['writes']['failed']:
+            self.stdout.write(self.style.ERROR(f"  failed writes: {report['writes']['failed']}"))
+            for message, count in report['writes']['errors'].items():
+                self.stdout.write(self.style.ERROR(f'    {count}x {message}'))
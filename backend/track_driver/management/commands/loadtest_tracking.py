@@ -0,0 +1,273 @@
+"""
+Load generator for the tracking WebSocket.
+
+Runs the real TrackingConsumer in-process through channels'
+WebsocketCommunicator: N drivers ping at --hz and M watchers per parcel
+listen, all on one event loop. Reports end-to-end broadcast latency
+percentiles (driver send -> watcher receive), message rates and the
+DriverLocation write rate. Needs only the configured database, so it runs
+locally and in CI; use --in-memory to force the in-memory channel layer
+even when CHANNEL_LAYERS points at Redis. Background address enrichment is
+off for the run (the simulated pings carry no address, so it would call the
+real geocoding provider) unless --enrich-addresses is given.
+
+    python manage.py loadtest_tracking --drivers 50 --watchers 2 --hz 1 --duration 30
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from decimal import Decimal
+
+from channels.layers import DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer, channel_layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from client.models import Parcel
+from track_driver.middleware import JWTAuthMiddlewareStack
+from track_driver.models import DriverAssignment, DriverLocation
+from track_driver.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+EMAIL_DOMAIN = 'loadtest.local'
+BASE_LAT = 12.9716
+BASE_LNG = 77.5946
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Load-test the tracking WebSocket with simulated drivers and watchers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drivers', type=int, default=10, help='Simulated drivers (one parcel each)')
+        parser.add_argument('--watchers', type=int, default=2, help='Watching sockets per parcel')
+        parser.add_argument('--hz', type=float, default=1.0, help='Pings per second per driver')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to send pings for')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for start jitter and routes')
+        parser.add_argument('--in-memory', action='store_true',
+                            help='Use a fresh InMemoryChannelLayer instead of CHANNEL_LAYERS')
+        parser.add_argument('--max-p95-ms', type=float, default=None,
+                            help='Fail if p95 broadcast latency exceeds this many milliseconds')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the generated users and parcels')
+        parser.add_argument('--verbose-consumers', action='store_true',
+                            help='Log the tracking consumer at DEBUG level during the run')
+        parser.add_argument('--enrich-addresses', action='store_true',
+                            help='Keep background address enrichment on (calls the configured geocoding provider)')
+
+    def handle(self, *args, **options):
+        if options['in_memory']:
+            channel_layers.set(DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer(capacity=1000))
+
+        self.cleanup()
+        try:
+            fleet = self.create_fleet(options['drivers'])
+            writes_before = DriverLocation.objects.filter(driver__email__endswith=EMAIL_DOMAIN).count()
+            consumer_logger = logging.getLogger('track_driver.consumers')
+            previous_level = consumer_logger.level
+            if options['verbose_consumers']:
+                consumer_logger.setLevel(logging.DEBUG)
+            geocoding = {**getattr(settings, 'GEOCODING', {}), 'ENRICH_ADDRESSES': options['enrich_addresses']}
+            try:
+                with override_settings(GEOCODING=geocoding):
+                    result = asyncio.run(self.run_load(fleet, options))
+            finally:
+                consumer_logger.setLevel(previous_level)
+            writes = DriverLocation.objects.filter(driver__email__endswith=EMAIL_DOMAIN).count() - writes_before
+        finally:
+            if not options['keep_data']:
+                self.cleanup()
+
+        report = self.build_report(result, writes, options)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+        if options['max_p95_ms'] is not None and (report['latency_ms']['p95'] or 0) > options['max_p95_ms']:
+            raise CommandError(
+                f"p95 latency {report['latency_ms']['p95']}ms exceeds budget {options['max_p95_ms']}ms"
+            )
+
+    def cleanup(self):
+        User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+
+    def create_fleet(self, count):
+        """Create one driver, one client and one in-transit parcel per simulated driver.
+
+        Relies on bulk_create setting primary keys (SQLite and PostgreSQL do).
+        """
+        password = make_password(None)
+        drivers = User.objects.bulk_create([
+            User(email=f'driver{i}@{EMAIL_DOMAIN}', full_name=f'Load Driver {i}',
+                 phone_number=f'001{i:09d}', role='driver', password=password)
+            for i in range(count)
+        ])
+        clients = User.objects.bulk_create([
+            User(email=f'client{i}@{EMAIL_DOMAIN}', full_name=f'Load Client {i}',
+                 phone_number=f'002{i:09d}', role='client', password=password)
+            for i in range(count)
+        ])
+        parcels = Parcel.objects.bulk_create([
+            Parcel(
+                client=clients[i],
+                tracking_number=f'LOADTEST{i:08d}',
+                from_location='Load test pickup',
+                to_location='Load test drop',
+                pickup_lat=Decimal(str(BASE_LAT)),
+                pickup_lng=Decimal(str(BASE_LNG)),
+                drop_lat=Decimal(str(BASE_LAT + 0.05)),
+                drop_lng=Decimal(str(BASE_LNG + 0.05)),
+                weight=Decimal('1.00'), height=Decimal('10.00'),
+                width=Decimal('10.00'), breadth=Decimal('10.00'),
+                price=Decimal('100.00'),
+                current_status='in_transit',
+            )
+            for i in range(count)
+        ])
+
+        fleet = []
+        assignments = []
+        for driver, parcel in zip(drivers, parcels):
+            assignments.append(DriverAssignment(parcel=parcel, driver=driver))
+            fleet.append({
+                'driver_id': str(driver.id),
+                'driver_token': str(AccessToken.for_user(driver)),
+                'client_token': str(AccessToken.for_user(parcel.client)),
+                'parcel_id': parcel.id,
+            })
+        DriverAssignment.objects.bulk_create(assignments)
+        return fleet
+
+    async def run_load(self, fleet, options):
+        application = JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+        rng = random.Random(options['seed'])
+        interval = 1.0 / options['hz']
+        sent_at = {}
+        latencies = []
+        stats = {'pings': 0, 'received': 0, 'unmatched': 0}
+        # A receive timeout cancels the communicator's application, so listeners
+        # wait with a timeout longer than the run and are cancelled at the end
+        receive_timeout = options['duration'] + 60
+
+        async def connect(token, parcel_id):
+            communicator = WebsocketCommunicator(
+                application, f'/ws/tracking/?parcel_id={parcel_id}&token={token}'
+            )
+            connected, _ = await communicator.connect(timeout=10)
+            if not connected:
+                raise CommandError(f'Socket for parcel {parcel_id} was rejected')
+            return communicator
+
+        async def drain(communicator):
+            while True:
+                await communicator.receive_from(timeout=receive_timeout)
+
+        async def watch(communicator):
+            while True:
+                message = json.loads(await communicator.receive_from(timeout=receive_timeout))
+                if message.get('type') != 'driver_location':
+                    continue
+                sent = sent_at.get((message['driver_id'], message['lat'], message['lng']))
+                if sent is None:
+                    stats['unmatched'] += 1
+                    continue
+                stats['received'] += 1
+                latencies.append((time.perf_counter() - sent) * 1000)
+
+        async def drive(communicator, driver):
+            await asyncio.sleep(rng.random() * interval)
+            heading = rng.uniform(-1, 1), rng.uniform(-1, 1)
+            step = 0
+            deadline = time.perf_counter() + options['duration']
+            while time.perf_counter() < deadline:
+                step += 1
+                lat = round(BASE_LAT + heading[0] * step * 1e-5, 7)
+                lng = round(BASE_LNG + heading[1] * step * 1e-5, 7)
+                sent_at[(driver['driver_id'], lat, lng)] = time.perf_counter()
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'location_update',
+                    'lat': lat,
+                    'lng': lng,
+                    'parcel_id': driver['parcel_id'],
+                }))
+                stats['pings'] += 1
+                await asyncio.sleep(interval)
+
+        watchers = [
+            await connect(driver['client_token'], driver['parcel_id'])
+            for driver in fleet
+            for _ in range(options['watchers'])
+        ]
+        driver_sockets = [(await connect(driver['driver_token'], driver['parcel_id']), driver) for driver in fleet]
+
+        listeners = [asyncio.ensure_future(watch(c)) for c in watchers]
+        listeners += [asyncio.ensure_future(drain(c)) for c, _ in driver_sockets]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(c, driver) for c, driver in driver_sockets))
+        elapsed = time.perf_counter() - started
+        # Let in-flight broadcasts arrive before stopping the listeners
+        await asyncio.sleep(1.0)
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+        for communicator in watchers + [c for c, _ in driver_sockets]:
+            await communicator.disconnect()
+
+        return {'elapsed': elapsed, 'latencies': sorted(latencies), **stats}
+
+    def build_report(self, result, writes, options):
+        elapsed = result['elapsed'] or 1e-9
+        latencies = result['latencies']
+        expected = result['pings'] * options['watchers']
+        return {
+            'drivers': options['drivers'],
+            'watchers_per_parcel': options['watchers'],
+            'hz': options['hz'],
+            'duration_s': round(elapsed, 3),
+            'pings_sent': result['pings'],
+            'messages_received': result['received'],
+            'unmatched_messages': result['unmatched'],
+            'delivery_ratio': round(result['received'] / expected, 4) if expected else None,
+            'pings_per_second': round(result['pings'] / elapsed, 2),
+            'messages_per_second': round(result['received'] / elapsed, 2),
+            'db_writes': writes,
+            'db_writes_per_second': round(writes / elapsed, 2),
+            'latency_ms': {
+                name: round(percentile(latencies, pct), 3) if latencies else None
+                for name, pct in (('p50', 50), ('p90', 90), ('p95', 95), ('p99', 99), ('max', 100))
+            },
+        }
+
+    def print_report(self, report):
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['drivers']} driver(s) x {report['watchers_per_parcel']} watcher(s) "
+            f"at {report['hz']} Hz for {report['duration_s']}s"
+        ))
+        self.stdout.write(f"  pings sent:        {report['pings_sent']} ({report['pings_per_second']}/s)")
+        self.stdout.write(
+            f"  messages received: {report['messages_received']} ({report['messages_per_second']}/s, "
+            f"delivery ratio {report['delivery_ratio']})"
+        )
+        self.stdout.write(f"  DB writes:         {report['db_writes']} ({report['db_writes_per_second']}/s)")
+        latency = report['latency_ms']
+        self.stdout.write(
+            f"  latency ms:        p50={latency['p50']} p90={latency['p90']} "
+            f"p95={latency['p95']} p99={latency['p99']} max={latency['max']}"
+        )
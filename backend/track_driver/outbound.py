@@ -0,0 +1,135 @@
+"""
+Per-connection outbound queues for tracking sockets.
+
+Channel-layer handlers only enqueue; a single sender task per socket
+drains the queue. driver_location messages are keyed by (parcel, driver),
+so while a slow client is still receiving, newer positions replace the
+queued one instead of piling up (latest value wins). The queue is bounded
+at MAX_DEPTH; when full, the oldest pending droppable message (a position)
+is dropped. Control and terminal events such as geofence_event and
+tracking_ended are never dropped: with no position left to evict they
+are queued beyond the bound, and a new position is dropped instead. Handlers
+therefore never wait on a client, the socket's channel-layer inbox keeps
+draining and the event loop is not stalled by slow watchers.
+
+Messages are serialized only when actually sent, so coalesced or dropped
+messages cost nothing. The encoder is the socket's JSON codec
+(config.jsoncodec), stdlib json.dumps by default.
+"""
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from itertools import count
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_DEPTH': 50,
+}
+
+# Process-wide totals across all sockets
+_totals = {'sent': 0, 'coalesced': 0, 'dropped': 0, 'connections': 0}
+
+
+def get_setting(name):
+    return getattr(settings, 'TRACKING_OUTBOUND', {}).get(name, DEFAULTS[name])
+
+
+class OutboundQueue:
+    """Bounded, coalescing send queue drained by one task."""
+
+    def __init__(self, send, max_depth=None, encode=json.dumps):
+        self._send = send
+        self._encode = encode
+        self.max_depth = max_depth or get_setting('MAX_DEPTH')
+        self._pending = OrderedDict()
+        # Keys of droppable pending messages, oldest first
+        self._droppable = OrderedDict()
+        self._ready = asyncio.Event()
+        self._sequence = count()
+        self._task = None
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+        _totals['connections'] += 1
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        _totals['connections'] -= 1
+
+    def put(self, message, key=None, droppable=False):
+        """Queue a message; a message with the key of a pending one replaces it in place.
+
+        Only droppable messages are evicted when the queue is full.
+        """
+        if key is not None and key in self._pending:
+            self._pending[key] = message
+            self.coalesced += 1
+            _totals['coalesced'] += 1
+            return
+
+        if len(self._pending) >= self.max_depth:
+            if self._droppable:
+                oldest, _ = self._droppable.popitem(last=False)
+                del self._pending[oldest]
+                self._count_dropped()
+            elif droppable:
+                # Only control events are pending; they outrank a position
+                self._count_dropped()
+                return
+            # A control event goes over the bound rather than be lost
+
+        key = key if key is not None else ('seq', next(self._sequence))
+        self._pending[key] = message
+        if droppable:
+            self._droppable[key] = None
+        self._ready.set()
+
+    def _count_dropped(self):
+        self.dropped += 1
+        _totals['dropped'] += 1
+
+    def depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        return {
+            'depth': len(self._pending),
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+        }
+
+    async def _run(self):
+        while True:
+            await self._ready.wait()
+            while self._pending:
+                key, message = self._pending.popitem(last=False)
+                self._droppable.pop(key, None)
+                try:
+                    await self._send(text_data=self._encode(message))
+                except Exception as e:
+                    # The socket is gone; disconnect() will stop the queue
+                    logger.warning('Outbound send failed: %s', e)
+                    return
+                self.sent += 1
+                _totals['sent'] += 1
+            self._ready.clear()
+
+
+def outbound_totals():
+    """Return process-wide send/coalesce/drop counters and open queue count."""
+    return dict(_totals)
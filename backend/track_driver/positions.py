@@ -0,0 +1,88 @@
+"""
+Recent tracking events per parcel.
+
+Every event broadcast to a `parcel_<id>` group is also recorded in a small
+ring buffer (BUFFER_SIZE entries per parcel) under a monotonically
+increasing event id. WebSocket subscribers get the buffered positions as
+soon as they join a parcel, and the SSE stream uses the ids for
+`Last-Event-ID` resume, so neither needs a database query to catch up.
+
+Event ids are millisecond timestamps bumped to stay strictly increasing, so
+ids handed out before a server restart still order correctly afterwards.
+The buffer lives in the process that receives the driver's pings, which
+with the in-memory channel layer is the only process.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+DEFAULTS = {
+    'BUFFER_SIZE': 20,
+    'MAX_PARCELS': 10000,
+    'KEEPALIVE_SECONDS': 15,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'TRACKING_STREAM', {}).get(name, DEFAULTS[name])
+
+
+class PositionBuffer:
+    """Bounded ring buffer of recent events for each active parcel."""
+
+    def __init__(self, size=None, max_parcels=None):
+        self.size = size or get_setting('BUFFER_SIZE')
+        self.max_parcels = max_parcels or get_setting('MAX_PARCELS')
+        self._parcels = OrderedDict()
+        self._last_id = {}
+        self._lock = threading.Lock()
+
+    def record(self, parcel_id, event):
+        """Store `event` for a parcel and return its event id."""
+        parcel_id = int(parcel_id)
+        with self._lock:
+            event_id = max(int(time.time() * 1000), self._last_id.get(parcel_id, 0) + 1)
+            self._last_id[parcel_id] = event_id
+
+            events = self._parcels.get(parcel_id)
+            if events is None:
+                events = self._parcels[parcel_id] = deque(maxlen=self.size)
+                # Drop the least recently updated parcel once over the cap
+                if len(self._parcels) > self.max_parcels:
+                    evicted, _ = self._parcels.popitem(last=False)
+                    self._last_id.pop(evicted, None)
+            else:
+                self._parcels.move_to_end(parcel_id)
+            events.append((event_id, event))
+        return event_id
+
+    def recent(self, parcel_id):
+        """Return the buffered (event_id, event) pairs for a parcel, oldest first."""
+        with self._lock:
+            return list(self._parcels.get(int(parcel_id), ()))
+
+    def since(self, parcel_id, last_event_id):
+        """Return buffered events newer than `last_event_id`.
+
+        If the client is further behind than the buffer reaches, everything
+        buffered is returned.
+        """
+        return [(event_id, event) for event_id, event in self.recent(parcel_id) if event_id > last_event_id]
+
+    def forget(self, parcel_id):
+        with self._lock:
+            self._parcels.pop(int(parcel_id), None)
+            self._last_id.pop(int(parcel_id), None)
+
+
+_buffer = None
+
+
+def get_position_buffer():
+    """Return the process-wide PositionBuffer."""
+    global _buffer
+    if _buffer is None:
+        _buffer = PositionBuffer()
+    return _buffer
@@ -1,7 +1,16 @@
 from django.urls import re_path
 from . import consumers
+from .middleware import JWTAuthMiddlewareStack
 
 websocket_urlpatterns = [
     re_path(r'ws/tracking/$', consumers.TrackingConsumer.as_asgi()),
 ]
 
+# EventSource can't send headers, so the stream authenticates with ?token= like the sockets
+http_urlpatterns = [
+    re_path(
+        r'sse/tracking/(?P<parcel_id>\d+)/$',
+        JWTAuthMiddlewareStack(consumers.TrackingStreamConsumer.as_asgi())
+    ),
+]
+
@@ -0,0 +1,109 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.utils import timezone
+from client.cache import bump, parcel_scope
+from client.models import ParcelStatusHistory
+from client.notifications import create_notification
+from .models import DriverAssignment
+
+logger = logging.getLogger(__name__)
+
+# Status transitions a driver is allowed to make
+VALID_TRANSITIONS = {
+    'assigned': ['picked_up'],
+    'picked_up': ['in_transit'],
+    'in_transit': ['out_for_delivery', 'delivered'],
+    'out_for_delivery': ['delivered'],
+}
+
+STATUS_MESSAGES = {
+    'picked_up': 'Your parcel has been picked up by the driver',
+    'in_transit': 'Your parcel is in transit',
+    'out_for_delivery': 'Your parcel is out for delivery',
+    'delivered': 'Your parcel has been delivered successfully',
+}
+
+
+def validate_transition(old_status, new_status):
+    """Raise ValueError if a driver may not move a parcel from old_status to new_status."""
+    if old_status not in VALID_TRANSITIONS:
+        raise ValueError(f'Cannot update status from {old_status}')
+    if new_status not in VALID_TRANSITIONS[old_status]:
+        raise ValueError(
+            f'Invalid status transition from {old_status} to {new_status}. '
+            f'Valid transitions: {", ".join(VALID_TRANSITIONS[old_status])}'
+        )
+
+
+def announce_tracking_ended(parcel_id):
+    """Tell the parcel's watchers, once and after commit, that tracking is over."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    def send():
+        from .eta import get_eta_engine
+        from .positions import get_position_buffer
+
+        get_eta_engine().forget_parcel(parcel_id)
+        # Not buffered: a delivered parcel's trail has nothing left to replay
+        get_position_buffer().forget(parcel_id)
+        try:
+            async_to_sync(channel_layer.group_send)(f'parcel_{parcel_id}', {
+                'type': 'tracking_ended',
+                'parcel_id': parcel_id,
+                'message': 'Parcel has been delivered. Tracking has ended.',
+            })
+        except Exception as e:
+            logger.warning('Failed to announce end of tracking for parcel %s: %s', parcel_id, e)
+
+    transaction.on_commit(send)
+
+
+def update_parcel_status(assignment: DriverAssignment, new_status, actor=None, notes=None):
+    """Apply a driver status transition with its history, timestamps and notification."""
+    parcel = assignment.parcel
+    old_status = parcel.current_status
+    validate_transition(old_status, new_status)
+
+    parcel.current_status = new_status
+    parcel.save(update_fields=['current_status', 'updated_at'])
+
+    ParcelStatusHistory.objects.create(
+        parcel=parcel,
+        status=new_status,
+        location=parcel.to_location if new_status == 'delivered' else parcel.from_location,
+        notes=notes or f'Status changed from {old_status} to {new_status} by driver',
+        created_by=actor
+    )
+
+    # Update assignment timestamps
+    if new_status == 'picked_up' and not assignment.started_at:
+        assignment.started_at = timezone.now()
+        assignment.save(update_fields=['started_at'])
+    elif new_status == 'delivered' and not assignment.completed_at:
+        assignment.completed_at = timezone.now()
+        assignment.save(update_fields=['completed_at'])
+
+    bump(parcel_scope(parcel.id))
+    if new_status == 'delivered':
+        announce_tracking_ended(parcel.id)
+
+    # Create notification for client when status changes
+    if new_status in STATUS_MESSAGES:
+        create_notification(
+            client=parcel.client,
+            parcel=parcel,
+            notification_type='status_update',
+            title='Parcel Status Update',
+            message=f"{STATUS_MESSAGES[new_status]}. Tracking: {parcel.tracking_number}"
+        )
+
+    # Active parcels changed, so the driver's geofences must be rebuilt
+    from .geofence import get_geofence_engine
+    get_geofence_engine().invalidate_driver(assignment.driver_id)
+
+    return parcel
@@ -1,3 +1,649 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import DEFAULT_CHANNEL_LAYER, channel_layers, get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework_simplejwt.tokens import AccessToken
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from client.distance import haversine_km
+from client.models import Parcel
+
+from .eta import EtaEngine, get_eta_engine, road_km
+from .geofence import METERS_PER_DEGREE_LAT, Fence, GeofenceEngine
+from .models import DriverAssignment
+from .outbound import OutboundQueue, outbound_totals
+from .consumers import TrackingConsumer
+from .positions import PositionBuffer, get_position_buffer
+from .routing import http_urlpatterns
+from .services import update_parcel_status
+
+User = get_user_model()
+
+# Pune: roughly 1.1 km per 0.01 degree of latitude
+LAT = 18.52
+LNG = 73.85
+DROP = (18.60, 73.85)
+PICKUP = (18.48, 73.85)
+
+
+@override_settings(ETA={}, DISTANCE_ROAD_FACTORS=[])
+class EtaEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.engine = EtaEngine()
+
+    def drive(self, points, driver_id=1):
+        """Observe (seconds, lat) points along the same meridian."""
+        for at, lat in points:
+            self.engine.observe(driver_id, lat, LNG, at=at)
+
+    def test_default_speed_until_two_points(self):
+        self.assertEqual(self.engine.speed_kmh(1), 25.0)
+        self.drive([(0, LAT)])
+        self.assertEqual(self.engine.speed_kmh(1), 25.0)
+
+    def test_rolling_speed_over_the_window(self):
+        self.drive([(0, LAT), (60, LAT + 0.01), (120, LAT + 0.02)])
+        expected = haversine_km(LAT, LNG, LAT + 0.02, LNG) / (120 / 3600)
+        self.assertAlmostEqual(self.engine.speed_kmh(1), expected)
+
+    def test_a_stop_is_smoothed_by_the_window(self):
+        self.drive([(0, LAT), (60, LAT + 0.01), (120, LAT + 0.02), (180, LAT + 0.02)])
+        moving = haversine_km(LAT, LNG, LAT + 0.02, LNG) / (180 / 3600)
+        self.assertAlmostEqual(self.engine.speed_kmh(1), moving)
+
+    def test_points_older_than_the_window_are_ignored(self):
+        self.drive([(0, LAT - 0.5), (1000, LAT), (1060, LAT + 0.01)])
+        expected = haversine_km(LAT, LNG, LAT + 0.01, LNG) / (60 / 3600)
+        self.assertAlmostEqual(self.engine.speed_kmh(1), expected)
+
+    @override_settings(ETA={'WINDOW_POINTS': 3})
+    def test_window_keeps_the_latest_points(self):
+        engine = EtaEngine()
+        for at, lat in [(0, LAT - 0.5), (60, LAT), (120, LAT + 0.01), (180, LAT + 0.02)]:
+            engine.observe(1, lat, LNG, at=at)
+        expected = haversine_km(LAT, LNG, LAT + 0.02, LNG) / (120 / 3600)
+        self.assertAlmostEqual(engine.speed_kmh(1), expected)
+
+    def test_speed_is_clamped(self):
+        self.drive([(0, LAT), (240, LAT + 0.0001)])
+        self.assertEqual(self.engine.speed_kmh(1), 5.0)
+        self.drive([(0, LAT), (1, LAT + 1)], driver_id=2)
+        self.assertEqual(self.engine.speed_kmh(2), 120.0)
+
+    def test_eta_to_drop(self):
+        payload = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        remaining = haversine_km(LAT, LNG, *DROP)
+        self.assertEqual(payload['remaining_km'], round(remaining, 2))
+        self.assertEqual(payload['eta_seconds'], int(remaining / 25.0 * 3600))
+        self.assertFalse(payload['via_pickup'])
+        self.assertEqual(self.engine.get_cached(10), payload)
+
+    def test_no_eta_without_drop_point(self):
+        self.assertIsNone(self.engine.eta_for_parcel(10, 1, LAT, LNG, None, DROP[1]))
+
+    def test_eta_includes_the_pickup_leg(self):
+        payload = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP, pickup=PICKUP)
+        remaining = road_km(LAT, LNG, *PICKUP) + road_km(*PICKUP, *DROP)
+        self.assertTrue(payload['via_pickup'])
+        self.assertEqual(payload['remaining_km'], round(remaining, 2))
+        self.assertGreater(remaining, haversine_km(LAT, LNG, *DROP))
+
+    def test_no_eta_without_pickup_coordinates(self):
+        self.assertIsNone(self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP, pickup=(None, None)))
+
+    @override_settings(DISTANCE_ROAD_FACTORS=[(5, 1.4), (None, 1.2)])
+    def test_each_leg_gets_its_own_road_factor(self):
+        payload = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP, pickup=PICKUP)
+        first = haversine_km(LAT, LNG, *PICKUP)
+        second = haversine_km(*PICKUP, *DROP)
+        self.assertLess(first, 5)
+        self.assertEqual(payload['remaining_km'], round(first * 1.4 + second * 1.2, 2))
+
+    def test_cached_eta_is_reused_for_small_moves(self):
+        first = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        # About 55 m further
+        second = self.engine.eta_for_parcel(10, 1, LAT + 0.0005, LNG, *DROP)
+        self.assertIs(second, first)
+
+    def test_eta_is_recomputed_after_a_real_move(self):
+        first = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        second = self.engine.eta_for_parcel(10, 1, LAT + 0.01, LNG, *DROP)
+        self.assertIsNot(second, first)
+        self.assertLess(second['remaining_km'], first['remaining_km'])
+
+    def test_eta_is_recomputed_when_stale(self):
+        with mock.patch('track_driver.eta.time.time', return_value=1000.0):
+            first = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        with mock.patch('track_driver.eta.time.time', return_value=1061.0):
+            second = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        self.assertIsNot(second, first)
+
+    def test_eta_is_recomputed_once_picked_up(self):
+        self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP, pickup=PICKUP)
+        payload = self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        self.assertFalse(payload['via_pickup'])
+
+    def test_forget_parcel(self):
+        self.engine.eta_for_parcel(10, 1, LAT, LNG, *DROP)
+        self.engine.forget_parcel(10)
+        self.assertIsNone(self.engine.get_cached(10))
+
+
+def north_of(lat, meters):
+    return lat + meters / METERS_PER_DEGREE_LAT
+
+
+@override_settings(GEOFENCE={})
+class GeofenceEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.engine = GeofenceEngine()
+        self.pickup = Fence.build(10, 'pickup', 'assigned', LAT, LNG, 150)
+        self.engine.set_fences(1, [self.pickup])
+
+    def events_at(self, meters, driver_id=1):
+        return [(e['fence'], e['event']) for e in self.engine.check(driver_id, north_of(LAT, meters), LNG)]
+
+    def test_enter_is_reported_once(self):
+        self.assertEqual(self.events_at(300), [])
+        self.assertEqual(self.events_at(140), [('pickup', 'enter')])
+        self.assertEqual(self.events_at(20), [])
+
+    def test_jitter_between_the_radii_does_not_exit(self):
+        self.events_at(100)
+        for meters in (160, 145, 175, 155, 179):
+            self.assertEqual(self.events_at(meters), [], meters)
+        self.assertEqual(self.events_at(185), [('pickup', 'exit')])
+
+    def test_reentry_needs_the_enter_radius(self):
+        self.events_at(100)
+        self.events_at(200)
+        self.assertEqual(self.events_at(170), [])
+        self.assertEqual(self.events_at(149), [('pickup', 'enter')])
+
+    def test_exit_radius_follows_the_hysteresis_setting(self):
+        with override_settings(GEOFENCE={'EXIT_HYSTERESIS': 1.5}):
+            self.engine.set_fences(1, [Fence.build(10, 'pickup', 'assigned', LAT, LNG, 150)])
+        self.events_at(100)
+        self.assertEqual(self.events_at(220), [])
+        self.assertEqual(self.events_at(230), [('pickup', 'exit')])
+
+    def test_event_payload(self):
+        event = self.engine.check(1, north_of(LAT, 100), LNG)[0]
+        self.assertEqual(event['parcel_id'], 10)
+        self.assertAlmostEqual(event['distance_m'], 100, delta=0.5)
+        self.assertEqual(event['suggested_status'], 'picked_up')
+        self.assertIsNone(event['auto_status'])
+
+    def test_auto_transitions(self):
+        with override_settings(GEOFENCE={'AUTO_TRANSITIONS': {('pickup', 'enter'): {'assigned': 'picked_up'}}}):
+            event = self.engine.check(1, north_of(LAT, 100), LNG)[0]
+        self.assertEqual(event['auto_status'], 'picked_up')
+
+    def test_drivers_are_independent(self):
+        self.engine.set_fences(2, [self.pickup])
+        self.events_at(100, driver_id=1)
+        self.assertEqual(self.events_at(100, driver_id=2), [('pickup', 'enter')])
+
+    def test_replaced_fences_forget_inside_state(self):
+        self.events_at(100)
+        drop = Fence.build(10, 'drop', 'picked_up', north_of(LAT, 5000), LNG, 150)
+        self.engine.set_fences(1, [drop])
+        self.engine.set_fences(1, [self.pickup, drop])
+        self.assertEqual(self.events_at(100), [('pickup', 'enter')])
+
+    def test_unknown_driver_has_no_events(self):
+        self.assertEqual(self.events_at(0, driver_id=99), [])
+
+    def test_invalidation_and_refresh(self):
+        self.assertFalse(self.engine.needs_refresh(1))
+        self.engine.invalidate_driver(1)
+        self.assertTrue(self.engine.needs_refresh(1))
+        self.engine.set_fences(1, [self.pickup])
+        with mock.patch('track_driver.geofence.time.monotonic', return_value=10 ** 9):
+            self.assertTrue(self.engine.needs_refresh(1))
+
+
+def location(parcel_id, lat):
+    """A driver_location event as broadcast to the parcel group."""
+    return {
+        'type': 'driver_location', 'driver_id': '7', 'parcel_id': parcel_id, 'lat': lat, 'lng': LNG,
+        'address': '', 'timestamp': '2026-01-01T00:00:00+00:00', 'eta': None,
+    }
+
+
+class OutboundQueueTests(SimpleTestCase):
+    def setUp(self):
+        self.sent = []
+
+    async def send(self, text_data):
+        self.sent.append(json.loads(text_data))
+
+    def queue(self, max_depth=3):
+        return OutboundQueue(self.send, max_depth=max_depth)
+
+    def pending(self, queue):
+        return list(queue._pending.values())
+
+    def test_same_key_replaces_in_place(self):
+        queue = self.queue()
+        queue.put(location(1, 1.0), key=('driver_location', '1', 7), droppable=True)
+        queue.put({'type': 'geofence_event'})
+        queue.put(location(1, 2.0), key=('driver_location', '1', 7), droppable=True)
+
+        self.assertEqual(self.pending(queue), [location(1, 2.0), {'type': 'geofence_event'}])
+        self.assertEqual(queue.stats()['coalesced'], 1)
+
+    def test_unkeyed_messages_are_all_kept(self):
+        queue = self.queue()
+        queue.put(location(1, 1.0), droppable=True)
+        queue.put(location(1, 2.0), droppable=True)
+        self.assertEqual(queue.depth(), 2)
+
+    def test_full_queue_drops_the_oldest_position(self):
+        queue = self.queue()
+        queue.put({'type': 'geofence_event'})
+        queue.put(location(1, 1.0), key='a', droppable=True)
+        queue.put(location(2, 1.0), key='b', droppable=True)
+        queue.put(location(3, 1.0), key='c', droppable=True)
+
+        self.assertEqual(self.pending(queue), [{'type': 'geofence_event'}, location(2, 1.0), location(3, 1.0)])
+        self.assertEqual(queue.stats()['dropped'], 1)
+
+    def test_control_events_evict_positions_not_each_other(self):
+        queue = self.queue()
+        queue.put({'type': 'geofence_event'})
+        queue.put(location(1, 1.0), key='a', droppable=True)
+        queue.put({'type': 'tracking_ended', 'parcel_id': 1})
+        queue.put({'type': 'tracking_ended', 'parcel_id': 2})
+
+        self.assertEqual(self.pending(queue), [
+            {'type': 'geofence_event'},
+            {'type': 'tracking_ended', 'parcel_id': 1},
+            {'type': 'tracking_ended', 'parcel_id': 2},
+        ])
+
+    def test_control_events_go_over_the_bound(self):
+        queue = self.queue(max_depth=2)
+        for parcel_id in range(4):
+            queue.put({'type': 'tracking_ended', 'parcel_id': parcel_id})
+        self.assertEqual(queue.depth(), 4)
+        self.assertEqual(queue.stats()['dropped'], 0)
+
+    def test_position_is_dropped_when_only_control_events_are_pending(self):
+        queue = self.queue(max_depth=2)
+        queue.put({'type': 'geofence_event'})
+        queue.put({'type': 'tracking_ended', 'parcel_id': 1})
+        queue.put(location(1, 1.0), key='a', droppable=True)
+
+        self.assertEqual(queue.depth(), 2)
+        self.assertEqual(queue.stats()['dropped'], 1)
+
+    def test_sender_drains_in_order(self):
+        async def scenario():
+            queue = self.queue()
+            before = outbound_totals()
+            queue.start()
+            queue.put(location(1, 1.0), key='a', droppable=True)
+            queue.put({'type': 'tracking_ended', 'parcel_id': 1})
+            await asyncio.sleep(0.01)
+            queue.put(location(1, 2.0), key='a', droppable=True)
+            await asyncio.sleep(0.01)
+            await queue.stop()
+            return queue, before, outbound_totals()
+
+        queue, before, after = asyncio.run(scenario())
+        self.assertEqual(self.sent, [location(1, 1.0), {'type': 'tracking_ended', 'parcel_id': 1}, location(1, 2.0)])
+        self.assertEqual(queue.stats(), {'depth': 0, 'sent': 3, 'coalesced': 0, 'dropped': 0})
+        self.assertEqual(after['sent'] - before['sent'], 3)
+        self.assertEqual(after['connections'], before['connections'])
+
+    def test_only_sent_messages_are_encoded(self):
+        encode = mock.Mock(side_effect=json.dumps)
+
+        async def scenario():
+            queue = OutboundQueue(self.send, max_depth=1, encode=encode)
+            for lat in (1.0, 2.0, 3.0):
+                queue.put(location(1, lat), key='a', droppable=True)
+            queue.start()
+            await asyncio.sleep(0.01)
+            await queue.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(encode.call_count, 1)
+        self.assertEqual(self.sent, [location(1, 3.0)])
+
+    def test_failed_send_stops_the_sender(self):
+        async def broken(text_data):
+            raise ConnectionError('socket closed')
+
+        async def scenario():
+            queue = OutboundQueue(broken, max_depth=3)
+            queue.start()
+            queue.put({'type': 'geofence_event'})
+            queue.put({'type': 'tracking_ended', 'parcel_id': 1})
+            await asyncio.sleep(0.01)
+            done = queue._task.done()
+            await queue.stop()
+            return queue, done
+
+        with self.assertLogs('track_driver.outbound', 'WARNING'):
+            queue, done = asyncio.run(scenario())
+        self.assertTrue(done)
+        self.assertEqual(queue.stats()['sent'], 0)
+
+
+class TrackingEndedTests(TestCase):
+    def setUp(self):
+        client = User.objects.create_user(
+            email='client@test.com', full_name='Test Client', phone_number='9000000001', password='testpass123'
+        )
+        driver = User.objects.create_user(
+            email='driver@test.com', full_name='Test Driver', phone_number='9000000002',
+            password='testpass123', role='driver'
+        )
+        self.parcel = Parcel.objects.create(
+            client=client, tracking_number='TST000001', from_location='Shivajinagar', to_location='Kothrud',
+            drop_lat=DROP[0], drop_lng=DROP[1], weight=1, height=1, width=1, breadth=1, price=100,
+            current_status='in_transit'
+        )
+        self.assignment = DriverAssignment.objects.create(parcel=self.parcel, driver=driver)
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(f'parcel_{self.parcel.id}', self.channel)
+
+    def tearDown(self):
+        async_to_sync(self.layer.group_discard)(f'parcel_{self.parcel.id}', self.channel)
+
+    def receive(self):
+        async def receive():
+            return await asyncio.wait_for(self.layer.receive(self.channel), 0.2)
+        try:
+            return async_to_sync(receive)()
+        except asyncio.TimeoutError:
+            return None
+
+    def test_delivery_announces_once_after_commit(self):
+        buffer = get_position_buffer()
+        buffer.record(self.parcel.id, location(self.parcel.id, LAT))
+        get_eta_engine().eta_for_parcel(self.parcel.id, 1, LAT, LNG, *DROP)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            update_parcel_status(self.assignment, 'delivered')
+            self.assertIsNone(self.receive())
+        self.assertTrue(callbacks)
+
+        message = self.receive()
+        self.assertEqual(message['type'], 'tracking_ended')
+        self.assertEqual(message['parcel_id'], self.parcel.id)
+        self.assertIsNone(self.receive())
+        self.assertEqual(buffer.recent(self.parcel.id), [])
+        self.assertIsNone(get_eta_engine().get_cached(self.parcel.id))
+
+    def test_other_transitions_do_not_announce(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            update_parcel_status(self.assignment, 'out_for_delivery')
+        self.assertIsNone(self.receive())
+
+
+class PositionBufferTests(SimpleTestCase):
+    def setUp(self):
+        self.buffer = PositionBuffer(size=3, max_parcels=2)
+
+    def test_keeps_the_newest_events_per_parcel_in_order(self):
+        ids = [self.buffer.record(1, location(1, lat)) for lat in (1.0, 2.0, 3.0, 4.0)]
+        self.buffer.record(2, location(2, 9.0))
+
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual([event['lat'] for _, event in self.buffer.recent(1)], [2.0, 3.0, 4.0])
+        self.assertEqual([event_id for event_id, _ in self.buffer.recent(1)], ids[1:])
+        self.assertEqual([event['lat'] for _, event in self.buffer.recent(2)], [9.0])
+
+    def test_since_returns_only_newer_events(self):
+        ids = [self.buffer.record(1, location(1, lat)) for lat in (1.0, 2.0, 3.0)]
+        self.assertEqual([event['lat'] for _, event in self.buffer.since(1, ids[0])], [2.0, 3.0])
+        self.assertEqual(self.buffer.since(1, ids[-1]), [])
+        # Further behind than the buffer reaches: everything buffered
+        self.assertEqual(len(self.buffer.since(1, 0)), 3)
+
+    def test_least_recently_updated_parcel_is_evicted(self):
+        self.buffer.record(1, location(1, 1.0))
+        self.buffer.record(2, location(2, 1.0))
+        self.buffer.record(1, location(1, 2.0))
+        self.buffer.record(3, location(3, 1.0))
+
+        self.assertEqual(self.buffer.recent(2), [])
+        self.assertEqual(len(self.buffer.recent(1)), 2)
+
+    def test_forget(self):
+        self.buffer.record(1, location(1, 1.0))
+        self.buffer.forget(1)
+        self.assertEqual(self.buffer.recent(1), [])
+
+
+class PositionReplayTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(
+            email='client@test.com', full_name='Test Client', phone_number='9000000001', password='testpass123'
+        )
+        self.parcels = [
+            Parcel.objects.create(
+                client=self.client_user, tracking_number=f'TST00000{index}', from_location='Shivajinagar',
+                to_location='Kothrud', drop_lat=DROP[0], drop_lng=DROP[1], weight=1, height=1, width=1,
+                breadth=1, price=100, current_status='in_transit'
+            )
+            for index in (1, 2)
+        ]
+        self.buffer = get_position_buffer()
+        for parcel in self.parcels:
+            self.addCleanup(self.buffer.forget, parcel.id)
+
+    async def connect(self, parcel):
+        communicator = WebsocketCommunicator(TrackingConsumer.as_asgi(), f'/ws/tracking/?parcel_id={parcel.id}')
+        communicator.scope['user'] = self.client_user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def replayed(self, communicator):
+        messages = []
+        while not await communicator.receive_nothing():
+            messages.append(await communicator.receive_json_from())
+        return messages
+
+    async def test_new_watcher_receives_the_parcel_trail_in_order(self):
+        first, second = self.parcels
+        for lat in (18.50, 18.51, 18.52):
+            self.buffer.record(first.id, location(first.id, lat))
+        self.buffer.record(second.id, location(second.id, 18.70))
+
+        communicator = await self.connect(first)
+        messages = await self.replayed(communicator)
+
+        self.assertEqual([message['type'] for message in messages], ['driver_location'] * 3)
+        self.assertEqual([message['lat'] for message in messages], [18.50, 18.51, 18.52])
+        self.assertEqual({message['parcel_id'] for message in messages}, {first.id})
+        await communicator.disconnect()
+
+    async def test_subscribe_replays_only_the_new_parcel(self):
+        first, second = self.parcels
+        self.buffer.record(first.id, location(first.id, 18.50))
+        communicator = await self.connect(first)
+        await self.replayed(communicator)
+
+        self.buffer.record(second.id, location(second.id, 18.70))
+        self.buffer.record(second.id, location(second.id, 18.71))
+        await communicator.send_json_to({'type': 'subscribe_parcel', 'parcel_id': second.id})
+        messages = await self.replayed(communicator)
+
+        self.assertEqual(messages[0], {'type': 'subscribed', 'parcel_id': second.id})
+        self.assertEqual([(message['parcel_id'], message['lat']) for message in messages[1:]], [
+            (second.id, 18.70), (second.id, 18.71),
+        ])
+        await communicator.disconnect()
+
+    async def test_empty_buffer_sends_nothing(self):
+        communicator = await self.connect(self.parcels[0])
+        self.assertEqual(await self.replayed(communicator), [])
+        await communicator.disconnect()
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=['http://localhost:5173'], TRACKING_STREAM={'KEEPALIVE_SECONDS': 60})
+class TrackingStreamTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(
+            email='client@test.com', full_name='Test Client', phone_number='9000000001', password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            email='other@test.com', full_name='Other Client', phone_number='9000000003', password='testpass123'
+        )
+        self.parcel = Parcel.objects.create(
+            client=self.client_user, tracking_number='TST000001', from_location='Shivajinagar',
+            to_location='Kothrud', drop_lat=DROP[0], drop_lng=DROP[1], weight=1, height=1, width=1, breadth=1,
+            price=100, current_status='in_transit'
+        )
+        self.buffer = get_position_buffer()
+        self.addCleanup(self.buffer.forget, self.parcel.id)
+        self.application = URLRouter(http_urlpatterns)
+
+    def record(self, lat, parcel_id=None):
+        event = location(parcel_id or self.parcel.id, lat)
+        event['event_id'] = self.buffer.record(parcel_id or self.parcel.id, event)
+        return event
+
+    async def open(self, user=None, headers=(), query=''):
+        token = AccessToken.for_user(user or self.client_user) if user is not False else ''
+        communicator = HttpCommunicator(
+            self.application, 'GET', f'/sse/tracking/{self.parcel.id}/?token={token}{query}', headers=list(headers)
+        )
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(1)
+        return communicator, start
+
+    async def close(self, communicator):
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(1)
+
+    async def chunk(self, communicator):
+        return (await communicator.receive_output(1))['body'].decode()
+
+    async def events(self, communicator, count):
+        """Return the next `count` events as (id, type, data) tuples, skipping the retry hint."""
+        events = []
+        while len(events) < count:
+            body = await self.chunk(communicator)
+            if body.startswith('event: '):
+                fields = dict(line.split(': ', 1) for line in body.strip().split('\n'))
+                events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+        return events
+
+    async def test_unauthenticated_request_is_rejected(self):
+        communicator, start = await self.open(user=False)
+        self.assertEqual(start['status'], 401)
+
+    async def test_foreign_parcel_is_rejected(self):
+        communicator, start = await self.open(user=self.other_user)
+        self.assertEqual(start['status'], 403)
+
+    async def test_stream_headers_and_cors(self):
+        communicator, start = await self.open(headers=[(b'origin', b'http://localhost:5173')])
+        headers = dict(start['headers'])
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(headers[b'Content-Type'], b'text/event-stream')
+        self.assertEqual(headers[b'Cache-Control'], b'no-cache')
+        self.assertEqual(headers[b'Access-Control-Allow-Origin'], b'http://localhost:5173')
+        self.assertEqual(await self.chunk(communicator), 'retry: 3000\n\n')
+        await self.close(communicator)
+
+        communicator, start = await self.open(headers=[(b'origin', b'http://evil.example')])
+        self.assertNotIn(b'Access-Control-Allow-Origin', dict(start['headers']))
+        await self.close(communicator)
+
+    async def test_last_event_id_resumes_from_the_buffer_in_order(self):
+        first, second, third = self.record(18.52), self.record(18.53), self.record(18.54)
+        self.record(18.60, parcel_id=self.parcel.id + 1)
+        self.addCleanup(self.buffer.forget, self.parcel.id + 1)
+
+        communicator, _ = await self.open(headers=[(b'last-event-id', str(first['event_id']).encode())])
+        events = await self.events(communicator, 2)
+
+        self.assertEqual([event_id for event_id, _, _ in events], [second['event_id'], third['event_id']])
+        self.assertEqual([data['lat'] for _, _, data in events], [18.53, 18.54])
+        self.assertNotIn('event_id', events[0][2])
+        await self.close(communicator)
+
+    async def test_query_parameter_resume(self):
+        first, second = self.record(18.52), self.record(18.53)
+        communicator, _ = await self.open(query=f"&last_event_id={first['event_id']}")
+        self.assertEqual([event_id for event_id, _, _ in await self.events(communicator, 1)], [second['event_id']])
+        await self.close(communicator)
+
+    async def test_live_events_already_replayed_are_skipped(self):
+        first, second = self.record(18.52), self.record(18.53)
+        communicator, _ = await self.open(headers=[(b'last-event-id', str(first['event_id']).encode())])
+        await self.events(communicator, 1)
+
+        layer = get_channel_layer()
+        group = f'parcel_{self.parcel.id}'
+        await layer.group_send(group, second)
+        await layer.group_send(group, first)
+        third = self.record(18.54)
+        await layer.group_send(group, third)
+
+        self.assertEqual([event_id for event_id, _, _ in await self.events(communicator, 1)], [third['event_id']])
+        self.assertTrue(await communicator.receive_nothing())
+        await self.close(communicator)
+
+    async def test_tracking_ended_closes_the_stream(self):
+        communicator, _ = await self.open()
+        await self.chunk(communicator)
+        await get_channel_layer().group_send(f'parcel_{self.parcel.id}', {
+            'type': 'tracking_ended', 'parcel_id': self.parcel.id, 'message': 'Delivered',
+        })
+
+        body = await self.chunk(communicator)
+        self.assertTrue(body.startswith('event: tracking_ended\n'))
+        self.assertEqual(await communicator.receive_output(1), {
+            'type': 'http.response.body', 'body': b'', 'more_body': False,
+        })
+
+    @override_settings(TRACKING_STREAM={'KEEPALIVE_SECONDS': 0.05})
+    async def test_keepalive_comments(self):
+        communicator, _ = await self.open()
+        await self.chunk(communicator)
+        self.assertEqual(await self.chunk(communicator), ': keepalive\n\n')
+        self.assertEqual(await self.chunk(communicator), ': keepalive\n\n')
+        await self.close(communicator)
+
+
+class LoadtestCommandTests(TransactionTestCase):
+    def setUp(self):
+        # --in-memory installs a fresh layer; let later tests build theirs from settings
+        self.addCleanup(channel_layers.backends.pop, DEFAULT_CHANNEL_LAYER, None)
+
+    def test_in_memory_smoke_run(self):
+        out = io.StringIO()
+        with mock.patch('geocoding.enrichment.AddressEnricher.enqueue') as enqueue:
+            call_command(
+                'loadtest_tracking', '--drivers', '2', '--duration', '1', '--hz', '10', '--in-memory', '--json',
+                stdout=out
+            )
+
+        report = json.loads(out.getvalue())
+        self.assertLessEqual({
+            'drivers', 'watchers_per_parcel', 'pings_sent', 'messages_received', 'delivery_ratio',
+            'db_writes', 'latency_ms',
+        }, set(report))
+        self.assertEqual(report['drivers'], 2)
+        self.assertGreater(report['pings_sent'], 0)
+        self.assertEqual(report['delivery_ratio'], 1.0)
+        # Every 5th ping is stored; none of them may reach the geocoding provider
+        self.assertGreater(report['db_writes'], 0)
+        enqueue.assert_not_called()
+        self.assertFalse(User.objects.filter(email__endswith='@loadtest.local').exists())
@@ -8,7 +8,9 @@ from django.db.models import Q
 from django.utils import timezone
 
 from client.models import Parcel
+from client.projection import get_projection
 from .models import DriverAssignment
+from . import services
 from .serializers import (
     DriverTaskSerializer,
     ParcelStatusUpdateSerializer,
@@ -26,27 +28,13 @@ class DriverTasksView(APIView):
     
     def get(self, request):
         """Get all assigned parcels for the driver (including delivered ones)."""
-        print(f"[DEBUG] Driver tasks requested by user: {request.user.email} (ID: {request.user.id})")
-        
-        # Get all driver assignments for the current user
-        assignments = DriverAssignment.objects.filter(
-            driver=request.user
-        ).select_related('parcel', 'parcel__client')
-        
-        print(f"[DEBUG] Found {assignments.count()} driver assignments for user {request.user.email}")
-        for assignment in assignments:
-            print(f"[DEBUG] Assignment ID: {assignment.id}, Parcel: {assignment.parcel.tracking_number}, Status: {assignment.parcel.current_status}")
-        
-        # Get ALL parcels from assignments (including delivered ones)
+        # Get ALL parcels from the driver's assignments (including delivered ones)
         # Frontend will handle filtering by status for active/completed tabs
         parcels = Parcel.objects.filter(
-            id__in=[assignment.parcel.id for assignment in assignments]
+            driver_assignment__driver=request.user
         ).select_related('client').order_by('-created_at')
         
-        print(f"[DEBUG] Returning {parcels.count()} total parcels (including delivered)")
-        
-        serializer = DriverTaskSerializer(parcels, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(get_projection(DriverTaskSerializer).data(parcels), status=status.HTTP_200_OK)
 
 
 class ParcelStatusUpdateView(APIView):
@@ -76,65 +64,15 @@ class ParcelStatusUpdateView(APIView):
         )
         
         if serializer.is_valid():
-            old_status = parcel.current_status
             new_status = serializer.validated_data.get('current_status')
             
-            # Validate status transition
-            valid_transitions = {
-                'assigned': ['picked_up'],
-                'picked_up': ['in_transit'],
-                'in_transit': ['out_for_delivery', 'delivered'],
-                'out_for_delivery': ['delivered'],
-            }
-            
-            if old_status not in valid_transitions:
+            try:
+                services.update_parcel_status(assignment, new_status, actor=request.user)
+            except ValueError as e:
                 return Response({
-                    'error': f'Cannot update status from {old_status}'
+                    'error': str(e)
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            if new_status not in valid_transitions.get(old_status, []):
-                return Response({
-                    'error': f'Invalid status transition from {old_status} to {new_status}. '
-                            f'Valid transitions: {", ".join(valid_transitions.get(old_status, []))}'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            serializer.save()
-            
-            # Create status history entry
-            from client.models import ParcelStatusHistory
-            ParcelStatusHistory.objects.create(
-                parcel=parcel,
-                status=parcel.current_status,
-                location=parcel.to_location if parcel.current_status == 'delivered' else parcel.from_location,
-                notes=f'Status changed from {old_status} to {parcel.current_status} by driver',
-                created_by=request.user
-            )
-            
-            # Update assignment timestamps
-            if parcel.current_status == 'picked_up' and not assignment.started_at:
-                assignment.started_at = timezone.now()
-                assignment.save()
-            elif parcel.current_status == 'delivered' and not assignment.completed_at:
-                assignment.completed_at = timezone.now()
-                assignment.save()
-            
-            # Create notification for client when status changes
-            from client.models import Notification
-            status_messages = {
-                'picked_up': 'Your parcel has been picked up by the driver',
-                'in_transit': 'Your parcel is in transit',
-                'out_for_delivery': 'Your parcel is out for delivery',
-                'delivered': 'Your parcel has been delivered successfully'
-            }
-            if parcel.current_status in status_messages:
-                Notification.objects.create(
-                    client=parcel.client,
-                    parcel=parcel,
-                    notification_type='status_update',
-                    title='Parcel Status Update',
-                    message=f"{status_messages[parcel.current_status]}. Tracking: {parcel.tracking_number}"
-                )
-            
             return Response({
                 'message': f'Parcel status updated to {parcel.current_status}',
                 'parcel_id': parcel.id,
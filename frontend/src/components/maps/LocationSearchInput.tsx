@@ -1,6 +1,7 @@
 import { useState, useEffect, useRef } from 'react';
 import { cn } from '@/lib/utils';
 import { Location } from '@/data/mockData';
+import { geocodeAPI } from '@/lib/api';
 
 interface LocationSearchInputProps {
   value: Location | null;
@@ -60,7 +61,7 @@ export function LocationSearchInput({
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, []);
 
-  // Search locations using Nominatim API
+  // Search locations using the backend geocoding proxy
   const searchLocations = async (query: string) => {
     if (!query.trim() || query.length < 3) {
       setSearchResults([]);
@@ -70,20 +71,9 @@ export function LocationSearchInput({
     setIsSearching(true);
 
     try {
-      const response = await fetch(
-        `https://nominatim.openstreetmap.org/search?format=json&q=${encodeURIComponent(query)}&limit=5&addressdetails=1`,
-        {
-          headers: {
-            'User-Agent': 'RouteX-ParcelFlow/1.0',
-          },
-        }
-      );
-
-      if (response.ok) {
-        const data: SearchResult[] = await response.json();
-        setSearchResults(data);
-        setShowResults(true);
-      }
+      const { data } = await geocodeAPI.search(query, 5);
+      setSearchResults(data as SearchResult[]);
+      setShowResults(true);
     } catch (error) {
       console.error('Location search error:', error);
     } finally {
@@ -137,17 +127,10 @@ export function LocationSearchInput({
 
         try {
           // Reverse geocode to get address with higher zoom for more accuracy
-          const response = await fetch(
-            `https://nominatim.openstreetmap.org/reverse?format=json&lat=${lat}&lon=${lng}&zoom=18&addressdetails=1`,
-            {
-              headers: {
-                'User-Agent': 'RouteX-ParcelFlow/1.0',
-              },
-            }
-          );
+          const response = await geocodeAPI.reverse(lat, lng);
 
-          if (response.ok) {
-            const data = await response.json();
+          if (response.status === 200) {
+            const data = response.data;
             console.log('Reverse geocode result:', data);
 
             // Build a more accurate address
@@ -2,6 +2,7 @@ import { useEffect, useRef, useCallback } from 'react';
 import L from 'leaflet';
 import 'leaflet-routing-machine';
 import { Location } from '@/data/mockData';
+import { geocodeAPI } from '@/lib/api';
 
 interface MarkerData {
   id: string;
@@ -26,29 +27,15 @@ interface MapContainerProps {
 
 /**
  * Reverse geocoding utility: Convert coordinates to human-readable address
- * Uses OpenStreetMap Nominatim API (free, no API key required)
+ * Uses the backend geocoding proxy (cached OpenStreetMap Nominatim)
  * @param lat - Latitude
  * @param lng - Longitude
  * @returns Formatted address string
  */
 const reverseGeocode = async (lat: number, lng: number): Promise<string> => {
   try {
-    // Use Nominatim reverse geocoding API
-    // Respect usage policy: https://operations.osmfoundation.org/policies/nominatim/
-    const response = await fetch(
-      `https://nominatim.openstreetmap.org/reverse?format=json&lat=${lat}&lon=${lng}&zoom=18&addressdetails=1`,
-      {
-        headers: {
-          'User-Agent': 'RouteX-ParcelFlow/1.0', // Required by Nominatim
-        },
-      }
-    );
-
-    if (!response.ok) {
-      throw new Error('Geocoding failed');
-    }
-
-    const data = await response.json();
+    // Goes through the backend geocoding proxy, which caches Nominatim results
+    const { data } = await geocodeAPI.reverse(lat, lng);
 
     if (data.error) {
       throw new Error(data.error);
@@ -138,6 +138,8 @@ export const clientAPI = {
   markNotificationAsRead: (notificationId: number) => 
     api.patch(`/client/notifications/${notificationId}/mark-read/`),
   markAllNotificationsAsRead: () => api.post('/client/notifications/mark-all-read/'),
+  markNotificationsAsRead: (ids: number[]) =>
+    api.post('/client/notifications/mark-read/', { ids }),
 
   // Pricing Rules
   getPricingRules: () => api.get('/client/pricing-rules/'),
@@ -165,3 +167,9 @@ export const driverAPI = {
   // Client Contact
   getClientContact: (parcelId: number) => api.get(`/driver/parcel/${parcelId}/client-contact/`),
 };
+
+// Geocoding API endpoints (cached backend proxy in front of Nominatim)
+export const geocodeAPI = {
+  search: (q: string, limit = 5) => api.get('/geocode/search/', { params: { q, limit } }),
+  reverse: (lat: number, lng: number) => api.get('/geocode/reverse/', { params: { lat, lng } }),
+};
@@ -11,6 +11,14 @@ export interface DriverLocation {
   timestamp?: string;
 }
 
+// Estimated arrival computed by the backend ETA engine
+export interface ParcelEta {
+  eta: string;
+  eta_seconds: number;
+  remaining_km: number;
+  speed_kmh: number;
+}
+
 // WebSocket message types
 export type MessageType = 
   | 'location_update'
@@ -19,6 +27,7 @@ export type MessageType =
   | 'subscribed'
   | 'unsubscribed'
   | 'tracking_ended'
+  | 'geofence_event'
   | 'error';
 
 // Outgoing message: Driver -> Server (location update)
@@ -39,6 +48,7 @@ export interface DriverLocationMessage {
   address: string;
   timestamp: string;
   parcel_id?: number;
+  eta?: ParcelEta | null;
 }
 
 // Subscribe/unsubscribe messages
@@ -74,12 +84,24 @@ export interface TrackingEndedMessage {
   message: string;
 }
 
+// Driver entered or left a parcel's pickup/drop geofence
+export interface GeofenceEventMessage {
+  type: 'geofence_event';
+  parcel_id: number;
+  fence: 'pickup' | 'drop';
+  event: 'enter' | 'exit';
+  distance_m: number;
+  suggested_status: string | null;
+  applied: boolean;
+}
+
 // Union type for all incoming messages
 export type IncomingMessage = 
   | DriverLocationMessage
   | SubscribedMessage
   | UnsubscribedMessage
   | TrackingEndedMessage
+  | GeofenceEventMessage
   | ErrorMessage;
 
 // Union type for all outgoing messages